@@ -0,0 +1,184 @@
+"""
+In-memory index of the members of address lists, used to check list membership
+without querying the database for every request.
+
+Some address lists hold hundreds of thousands of addresses, and are checked for
+every allow list stamp issuance and every human points award. Each process
+keeps the members of the lists it checks as a sorted array of 20-byte
+addresses (about 20 bytes per member), searched with a binary search. The
+few members that are not valid hex addresses are kept in a set.
+
+A version token per list, stored in the django cache, is bumped whenever the
+list or its members change. An index is rebuilt when the version it was built
+from does not match the current one, or when it is older than
+`ADDRESS_LIST_INDEX_MAX_AGE` (this bounds the staleness if the cache is not
+reachable).
+"""
+
+import threading
+import time
+import uuid
+from typing import Dict, FrozenSet, Iterable, Optional, Set
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+import api_logging as logging
+
+from .models import AddressListMember
+
+log = logging.getLogger(__name__)
+
+ADDRESS_SIZE = 20
+
+
+def _version_cache_key(name: str) -> str:
+    return f"account:address_list_index:{name}:version"
+
+
+def _address_to_bytes(address: str) -> Optional[bytes]:
+    address = address.lower()
+    if len(address) != 2 + 2 * ADDRESS_SIZE or not address.startswith("0x"):
+        return None
+    try:
+        return bytes.fromhex(address[2:])
+    except ValueError:
+        return None
+
+
+class AddressListIndex:
+    def __init__(self, name: str, addresses: Iterable[str], version: Optional[str]):
+        self.name = name
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+        members = set()
+        others = set()
+        for address in addresses:
+            member = _address_to_bytes(address)
+            if member is None:
+                others.add(address.lower())
+            else:
+                members.add(member)
+
+        self._members = b"".join(sorted(members))
+        self._size = len(members)
+        self._others: FrozenSet[str] = frozenset(others)
+
+    @classmethod
+    def load(cls, name: str, version: Optional[str]) -> "AddressListIndex":
+        # A list that does not exist (yet) has no members
+        addresses = (
+            AddressListMember.objects.filter(list__name=name)
+            .values_list("address", flat=True)
+            .iterator(chunk_size=10000)
+        )
+        index = cls(name, addresses, version)
+        log.info(
+            "Loaded address list index. name=%s version=%s members=%s",
+            name,
+            version,
+            len(index),
+        )
+        return index
+
+    def __len__(self):
+        return self._size + len(self._others)
+
+    def __contains__(self, address: str) -> bool:
+        member = _address_to_bytes(address)
+        if member is None:
+            return address.lower() in self._others
+
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            offset = middle * ADDRESS_SIZE
+            if self._members[offset : offset + ADDRESS_SIZE] < member:
+                low = middle + 1
+            else:
+                high = middle
+        offset = low * ADDRESS_SIZE
+        return self._members[offset : offset + ADDRESS_SIZE] == member
+
+    def members(self, addresses: Iterable[str]) -> Set[str]:
+        """
+        Return the (lowercase) addresses that are members of the list
+        """
+        return {address.lower() for address in addresses if address in self}
+
+
+_address_list_indexes: Dict[str, AddressListIndex] = {}
+_address_list_indexes_lock = threading.Lock()
+
+
+def _get_current_version(name: str) -> Optional[str]:
+    key = _version_cache_key(name)
+    try:
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            version = cache.get(key)
+        return version
+    except Exception:
+        log.exception("Failed to read the address list index version. name=%s", name)
+        return None
+
+
+def get_address_list_index(name: str) -> AddressListIndex:
+    """
+    Return the index of the address list `name` in this process, rebuilding it
+    if the list has changed since it was loaded.
+    """
+    version = _get_current_version(name)
+    with _address_list_indexes_lock:
+        index = _address_list_indexes.get(name)
+        if (
+            index is None
+            or index.version != version
+            or time.monotonic() - index.loaded_at > settings.ADDRESS_LIST_INDEX_MAX_AGE
+        ):
+            index = AddressListIndex.load(name, version)
+            _address_list_indexes[name] = index
+
+    return index
+
+
+def is_address_list_member(name: str, address: str) -> bool:
+    return address in get_address_list_index(name)
+
+
+def get_address_list_members(name: str, addresses: Iterable[str]) -> Set[str]:
+    """
+    Return the (lowercase) addresses that are members of the address list `name`
+    """
+    return get_address_list_index(name).members(addresses)
+
+
+def _set_new_version(name: str):
+    try:
+        cache.set(_version_cache_key(name), uuid.uuid4().hex, timeout=None)
+    except Exception:
+        log.exception("Failed to bump the address list index version. name=%s", name)
+
+
+def bump_address_list_index_version(name: str):
+    """
+    Signal all processes to rebuild their index of the address list `name`.
+
+    The version is bumped right away, so that this process sees its own
+    changes, and again when the transaction commits, as other processes may
+    have rebuilt their index before the changes were visible to them.
+    """
+    _set_new_version(name)
+    transaction.on_commit(lambda: _set_new_version(name))
+
+
+def reset_address_list_indexes():
+    """
+    Drop the address list indexes of this process, they will be rebuilt on the
+    next check.
+    """
+    with _address_list_indexes_lock:
+        _address_list_indexes.clear()
@@ -21,6 +21,7 @@ from rest_framework_api_key.admin import APIKeyAdmin
 from scorer.scorer_admin import ScorerModelAdmin
 from scorer_weighted.models import Scorer
 
+from .address_list_index import bump_address_list_index_version
 from .models import (
     Account,
     AccountAPIKey,
@@ -909,6 +910,10 @@ class AddressListAdmin(ScorerModelAdmin):
     def address_count(self, obj):
         return obj.addresses.count()
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        bump_address_list_index_version(form.instance.name)
+
     def get_urls(self):
         return [
             path("import-csv/", self.import_csv),
@@ -930,6 +935,7 @@ class AddressListAdmin(ScorerModelAdmin):
                 except Exception:
                     duplicate_count += 1
                     continue
+            bump_address_list_index_version(address_list.name)
 
             self.message_user(
                 request,
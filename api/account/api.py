@@ -16,11 +16,10 @@ from ninja_jwt.schema import RefreshToken
 from siwe import SiweMessage, siwe
 
 import api_logging as logging
+from account.address_list_index import is_address_list_member
 from account.models import (
     Account,
     AccountAPIKey,
-    AddressList,
-    AddressListMember,
     Community,
     CustomCredentialRuleset,
     Customization,
@@ -820,10 +819,4 @@ def get_account_customization(request, dashboard_path: str):
 
 
 def handle_check_allow_list(list: str, address: str):
-    try:
-        is_member = AddressListMember.objects.filter(
-            list__name=list, address=address
-        ).exists()
-        return {"is_member": is_member}
-    except AddressList.DoesNotExist:
-        return {"is_member": False}
+    return {"is_member": is_address_list_member(list, address)}
@@ -13,6 +13,8 @@ from django.contrib import admin
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.deconstruct import deconstructible
 from rest_framework_api_key.models import AbstractAPIKey
 
@@ -496,6 +498,17 @@ class AddressListMember(models.Model):
         unique_together = ["address", "list"]
 
 
+@receiver(post_save, sender=AddressList)
+@receiver(post_delete, sender=AddressList)
+def address_list_changed(sender, instance, **kwargs):
+    # Changes to the members are signalled by their writers (see
+    # AddressListAdmin), instead of once per member
+    # pylint: disable=import-outside-toplevel
+    from .address_list_index import bump_address_list_index_version
+
+    bump_address_list_index_version(instance.name)
+
+
 class Customization(models.Model):
     class CustomizationLogoBackgroundType(models.TextChoices):
         DOTS = "DOTS"
@@ -0,0 +1,73 @@
+import pytest
+
+from account.address_list_index import (
+    AddressListIndex,
+    get_address_list_index,
+    get_address_list_members,
+    is_address_list_member,
+)
+from account.models import AddressList
+
+pytestmark = pytest.mark.django_db
+
+members = [f"0x{i * 7919:040x}" for i in range(1, 50)]
+
+
+@pytest.fixture
+def address_list():
+    address_list = AddressList.objects.create(name="TestList")
+    address_list.addresses.bulk_create(
+        address_list.addresses.model(address=address, list=address_list)
+        for address in members
+    )
+    return address_list
+
+
+def test_membership():
+    index = AddressListIndex("TestList", members + ["0xNotAnAddress"], "v1")
+
+    assert len(index) == len(members) + 1
+    assert all(address in index for address in members)
+    assert members[10].upper().replace("0X", "0x") in index
+    assert "0xnotanaddress" in index
+    assert f"0x{0:040x}" not in index
+    assert f"0x{1:040x}" not in index
+    assert "0x123" not in index
+
+
+def test_empty_list():
+    index = AddressListIndex("TestList", [], "v1")
+
+    assert len(index) == 0
+    assert members[0] not in index
+
+
+def test_batch_membership(address_list, django_assert_num_queries):
+    get_address_list_index("TestList")
+
+    # Non members are checked in memory
+    with django_assert_num_queries(0):
+        assert get_address_list_members(
+            "TestList", [members[0].upper().replace("0X", "0x"), f"0x{1:040x}"]
+        ) == {members[0]}
+
+
+def test_missing_list_has_no_members():
+    assert not is_address_list_member("MissingList", members[0])
+
+
+def test_index_is_reloaded_when_the_list_changes(address_list):
+    index = get_address_list_index("TestList")
+    assert get_address_list_index("TestList") is index
+
+    address_list.save()
+
+    assert get_address_list_index("TestList") is not index
+
+
+def test_index_is_reloaded_when_too_old(settings, address_list):
+    index = get_address_list_index("TestList")
+
+    settings.ADDRESS_LIST_INDEX_MAX_AGE = -1
+
+    assert get_address_list_index("TestList") is not index
@@ -7,12 +7,16 @@ What remains here is exercising the scorer-side surface:
 - ``WalletGroupCommunityClaim`` (now keyed on an opaque ``group_key`` TEXT)
 - ``_build_non_canonical_response`` response shape
 - The stamp-merge / weight-aggregation logic in ``_score_wallet_group``
+- Scoring a whole group through ``ahandle_scoring``
 """
 
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
 from django.test import TestCase
 
 from account.models import (
@@ -20,7 +24,7 @@ from account.models import (
     Community,
     WalletGroupCommunityClaim,
 )
-from registry.models import Passport, Score
+from registry.models import Event, Passport, Score
 from scorer_weighted.models import BinaryWeightedScorer, Scorer
 
 # ============================================================
@@ -418,6 +422,114 @@ class TestStampMergeLogic:
         assert wallet_stamps["0xbbb"]["Google"]["expiration_date"] == "2026-01-01T00:00:00+00:00"
 
 
+# ============================================================
+# Group scoring tests
+# ============================================================
+
+
+def _credential(address, provider, stamp_hash):
+    now = datetime.now(timezone.utc)
+    return {
+        "provider": provider,
+        "credential": {
+            "type": ["VerifiableCredential"],
+            "issuer": settings.TRUSTED_IAM_ISSUERS[0],
+            "issuanceDate": (now - timedelta(days=1)).isoformat(),
+            "expirationDate": (now + timedelta(days=30)).isoformat(),
+            "credentialSubject": {
+                "id": f"did:pkh:eip155:1:{address}",
+                "hash": stamp_hash,
+                "provider": provider,
+            },
+        },
+    }
+
+
+ADDRESS_A = "0x" + "a" * 40
+ADDRESS_B = "0x" + "b" * 40
+ADDRESS_C = "0x" + "c" * 40
+
+
+class TestScoreWalletGroup(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+
+        user = User.objects.create_user(username="test_group", password="test")
+        account = Account.objects.create(user=user, address="0xowner_group")
+        scorer = BinaryWeightedScorer.objects.create(
+            type=Scorer.Type.WEIGHTED_BINARY,
+            threshold=Decimal("3"),
+            weights={"Ens": "1", "Google": "2"},
+        )
+        self.community = Community.objects.create(
+            account=account, name="Test", scorer=scorer
+        )
+        self.addresses = [ADDRESS_C, ADDRESS_B, ADDRESS_A]
+        # B and C hold the same Google account, only one can claim it
+        self.passports = {
+            ADDRESS_A: {"stamps": [_credential(ADDRESS_A, "Ens", "v0.0.0:ens")]},
+            ADDRESS_B: {"stamps": [_credential(ADDRESS_B, "Google", "v0.0.0:google")]},
+            ADDRESS_C: {"stamps": [_credential(ADDRESS_C, "Google", "v0.0.0:google")]},
+        }
+
+    def _score(self, address):
+        from v2.api.api_stamps import ahandle_scoring
+
+        async def get_passports(addresses):
+            return {addr: self.passports[addr] for addr in addresses}
+
+        with (
+            patch(
+                "v2.api.api_stamps.get_linked_addresses", return_value=self.addresses
+            ),
+            patch("v2.api.api_stamps.aget_passports", side_effect=get_passports),
+            patch("registry.atasks.validate_credential", return_value=[]),
+        ):
+            return async_to_sync(ahandle_scoring)(address, self.community)
+
+    def test_group_is_scored_and_merged(self):
+        response = self._score(ADDRESS_A)
+
+        assert response.address == ADDRESS_A
+        assert response.passing_score is True
+        assert response.score == Decimal(3)
+        assert response.stamps.keys() == {"Ens", "Google"}
+
+        scores = {
+            s.passport.address: s
+            for s in Score.objects.select_related("passport").filter(
+                passport__community=self.community
+            )
+        }
+        assert scores.keys() == {ADDRESS_A, ADDRESS_B, ADDRESS_C}
+        assert all(s.status == Score.Status.DONE for s in scores.values())
+        # The other wallets claim the hashes in order after the canonical one
+        assert scores[ADDRESS_B].stamps["Google"]["dedup"] is False
+        assert scores[ADDRESS_C].stamps["Google"]["dedup"] is True
+        assert scores[ADDRESS_A].stamps["Google"]["source_wallet"] == ADDRESS_B
+
+    def test_one_score_update_event_per_wallet(self):
+        self._score(ADDRESS_A)
+
+        events = Event.objects.filter(
+            action=Event.Action.SCORE_UPDATE, community=self.community
+        )
+        assert sorted(e.address for e in events) == [ADDRESS_A, ADDRESS_B, ADDRESS_C]
+        # The canonical wallet's event has the merged score
+        canonical_event = events.get(address=ADDRESS_A)
+        assert canonical_event.data["fields"]["evidence"]["rawScore"] == "3"
+
+    def test_non_canonical_wallet(self):
+        self._score(ADDRESS_A)
+
+        response = self._score(ADDRESS_B)
+
+        assert response.address == ADDRESS_B
+        assert response.score == Decimal(0)
+        assert response.linked_score.address == ADDRESS_A
+        assert response.linked_score.passing_score is True
+
+
 # ============================================================
 # Linkage source stub tests
 # ============================================================
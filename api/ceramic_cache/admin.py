@@ -15,7 +15,13 @@ from django.utils import timezone
 
 from scorer.scorer_admin import ScorerModelAdmin
 
+from .ban_index import bump_ban_index_version
 from .models import Ban, BanList, CeramicCache, Revocation, RevocationList
+from .revocations import (
+    REVOCATION_BATCH_SIZE,
+    RevocationResult,
+    revoke_proof_values,
+)
 
 
 @admin.action(
@@ -104,26 +110,31 @@ class RevocationListForm(forms.ModelForm):
         csv_data = csv_file.read().decode("utf-8-sig")
 
         csv_reader = csv.DictReader(StringIO(csv_data))
-        line = 0
-        for revocation_item in csv_reader:
-            line += 1
+        proof_values = []
+        for line, revocation_item in enumerate(csv_reader, start=1):
             try:
-                # In this case we'll only validate that the proof_values provided indicate valid (existing) stamps
-                proof_value = revocation_item["proof_value"]
-                if not CeramicCache.objects.filter(
-                    proof_value=revocation_item["proof_value"]
-                ).exists():
-                    raise ValidationError(
-                        f"Unable to find stamp for proof_value '{proof_value}'"
-                    )
-            except ValueError as e:
-                raise ValidationError(f"Failed to validate line {line}, {e}") from e
-            except ValidationError as e:
-                raise ValidationError(f"Failed to validate line {line}, {e}") from e
+                proof_values.append(revocation_item["proof_value"])
             except Exception as e:
                 raise ValidationError(
                     f"Failed to validate line {line} (unknown error), {e}"
                 ) from e
+
+        # In this case we'll only validate that the proof_values provided indicate valid (existing) stamps
+        # Existing proof values are looked up in batches, rather than one query per line
+        existing_proof_values = set()
+        for i in range(0, len(proof_values), REVOCATION_BATCH_SIZE):
+            existing_proof_values.update(
+                CeramicCache.objects.filter(
+                    proof_value__in=proof_values[i : i + REVOCATION_BATCH_SIZE]
+                ).values_list("proof_value", flat=True)
+            )
+
+        for line, proof_value in enumerate(proof_values, start=1):
+            if proof_value not in existing_proof_values:
+                e = ValidationError(
+                    f"Unable to find stamp for proof_value '{proof_value}'"
+                )
+                raise ValidationError(f"Failed to validate line {line}, {e}")
         return csv_file
 
 
@@ -146,17 +157,15 @@ class RevocationListAdmin(admin.ModelAdmin):
         # using 'utf-8-sig' will also handle the case where the file is saved with a BOM (byte order mark - \ufeff)
         csv_data = obj.csv_file.open("rb").read().decode("utf-8-sig")
         csv_reader = csv.DictReader(StringIO(csv_data))
-        revocation_item_list = []
-        for revocation_item in csv_reader:
-            proof_value = revocation_item["proof_value"]
-            ceramic_cache = CeramicCache.objects.get(proof_value=proof_value)
-            db_revocation_item = Revocation(
-                proof_value=proof_value,
-                ceramic_cache=ceramic_cache,
-                revocation_list=obj,
-            )
-            revocation_item_list.append(db_revocation_item)
-        Revocation.objects.bulk_create(revocation_item_list, batch_size=1000)
+        result = revoke_proof_values(
+            (revocation_item["proof_value"] for revocation_item in csv_reader),
+            revocation_list=obj,
+        )
+        self.message_user(
+            request,
+            f"Revoked {result.revoked} stamp(s) of {len(result.addresses)} address(es)",
+            level=messages.SUCCESS,
+        )
 
 
 class BanForm(ModelForm):
@@ -172,10 +181,11 @@ class BanForm(ModelForm):
 def revoke_matching_credentials_action(modeladmin, request, queryset):
     success_count = 0
     error_count = 0
+    result = RevocationResult()
 
     for ban in queryset:
         try:
-            ban.revoke_matching_credentials()
+            result.update(ban.revoke_matching_credentials())
             success_count += 1
         except Exception as e:
             error_count += 1
@@ -188,7 +198,7 @@ def revoke_matching_credentials_action(modeladmin, request, queryset):
     if success_count:
         modeladmin.message_user(
             request,
-            f"Successfully processed {success_count} ban(s)",
+            f"Successfully processed {success_count} ban(s), revoked {result.revoked} stamp(s) of {len(result.addresses)} address(es)",
             level=messages.SUCCESS,
         )
 
@@ -318,3 +328,5 @@ class BanListAdmin(admin.ModelAdmin):
             )
             ban_item_list.append(db_ban_item)
         Ban.objects.bulk_create(ban_item_list, batch_size=1000)
+        # bulk_create does not send post_save signals
+        bump_ban_index_version()
@@ -0,0 +1,187 @@
+"""
+In-memory index of the active bans, used to check credentials against bans
+without querying the database for every request.
+
+Bans change rarely but are checked on every stamp issuance. Each process keeps
+a compiled index of all active bans, keyed by what the checks look up:
+the lowercase address (account bans), the credential hash (hash bans) and the
+(lowercase address, provider) tuple (single stamp bans). Temporary bans are
+additionally tracked in a heap ordered by `end_time`, so that they can be
+dropped from the index when they expire.
+
+A version token stored in the django cache is bumped whenever bans change.
+The index is rebuilt when the version it was built from does not match the
+current one, or when it is older than `BAN_INDEX_MAX_AGE` (this bounds the
+staleness if the cache is not reachable).
+"""
+
+import heapq
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+import api_logging as logging
+
+from .models import Ban, BanType
+
+log = logging.getLogger(__name__)
+
+BAN_INDEX_VERSION_CACHE_KEY = "ceramic_cache:ban_index:version"
+
+
+class BanIndex:
+    def __init__(self, bans: list[Ban], version: Optional[str]):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._account_bans: dict[str, list[Ban]] = defaultdict(list)
+        self._hash_bans: dict[str, list[Ban]] = defaultdict(list)
+        self._single_stamp_bans: dict[tuple[str, str], list[Ban]] = defaultdict(list)
+        self._expiry_heap: list[tuple[datetime, int, Ban]] = []
+
+        for ban in bans:
+            bucket = self._bucket_for(ban)
+            if bucket is None:
+                continue
+            bucket.append(ban)
+            if ban.end_time is not None:
+                self._expiry_heap.append((ban.end_time, ban.id, ban))
+
+        heapq.heapify(self._expiry_heap)
+
+    @classmethod
+    def load(cls, version: Optional[str]) -> "BanIndex":
+        bans = list(
+            Ban.objects.filter(
+                Q(end_time__isnull=True) | Q(end_time__gt=timezone.now())
+            )
+        )
+        log.info("Loaded ban index. version=%s bans=%s", version, len(bans))
+        return cls(bans, version)
+
+    def __len__(self):
+        return (
+            sum(len(b) for b in self._account_bans.values())
+            + sum(len(b) for b in self._hash_bans.values())
+            + sum(len(b) for b in self._single_stamp_bans.values())
+        )
+
+    def _bucket_for(self, ban: Ban) -> Optional[list[Ban]]:
+        if ban.type == "account" and not ban.provider:
+            return self._account_bans[ban.address.lower()]
+        if ban.type == "hash" and ban.hash:
+            return self._hash_bans[ban.hash]
+        if ban.type == "single_stamp":
+            return self._single_stamp_bans[(ban.address.lower(), ban.provider)]
+        return None
+
+    def _remove_expired(self, now: datetime):
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, _, ban = heapq.heappop(self._expiry_heap)
+            self._bucket_for(ban).remove(ban)
+
+    def check(
+        self, address: str, stamp_hash: str, provider: str
+    ) -> tuple[bool, BanType | None, Ban | None]:
+        """
+        Check if a specific credential is banned. This is equivalent to
+        `Ban.check_bans_for` with the bans returned by `Ban.get_bans`.
+
+        Returns:
+            Tuple of (is_banned, ban_type, ban_object)
+        """
+        parsed_address = address.lower()
+
+        with self._lock:
+            if self._expiry_heap:
+                self._remove_expired(timezone.now())
+
+            # Lookups use `.get` so that checks do not create empty buckets
+            bans = self._account_bans.get(parsed_address)
+            if bans:
+                return True, "account", bans[0]
+
+            if stamp_hash:
+                bans = self._hash_bans.get(stamp_hash)
+                if bans:
+                    return True, "hash", bans[0]
+
+            bans = self._single_stamp_bans.get((parsed_address, provider))
+            if bans:
+                return True, "single_stamp", bans[0]
+
+        return False, None, None
+
+
+_ban_index: Optional[BanIndex] = None
+_ban_index_lock = threading.Lock()
+
+
+def _get_current_version() -> Optional[str]:
+    try:
+        version = cache.get(BAN_INDEX_VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(BAN_INDEX_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(BAN_INDEX_VERSION_CACHE_KEY)
+        return version
+    except Exception:
+        log.exception("Failed to read the ban index version")
+        return None
+
+
+def get_ban_index() -> BanIndex:
+    """
+    Return the ban index of this process, rebuilding it if bans have changed
+    since it was loaded.
+    """
+    global _ban_index
+
+    version = _get_current_version()
+    with _ban_index_lock:
+        index = _ban_index
+        if (
+            index is None
+            or index.version != version
+            or time.monotonic() - index.loaded_at > settings.BAN_INDEX_MAX_AGE
+        ):
+            index = BanIndex.load(version)
+            _ban_index = index
+
+    return index
+
+
+def _set_new_version():
+    try:
+        cache.set(BAN_INDEX_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+    except Exception:
+        log.exception("Failed to bump the ban index version")
+
+
+def bump_ban_index_version():
+    """
+    Signal all processes to rebuild their ban index.
+
+    The version is bumped right away, so that this process sees its own
+    changes, and again when the transaction commits, as other processes may
+    have rebuilt their index before the changes were visible to them.
+    """
+    _set_new_version()
+    transaction.on_commit(_set_new_version)
+
+
+def reset_ban_index():
+    """
+    Drop the ban index of this process, it will be rebuilt on the next check.
+    """
+    global _ban_index
+    with _ban_index_lock:
+        _ban_index = None
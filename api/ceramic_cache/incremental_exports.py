@@ -0,0 +1,131 @@
+"""
+Incremental exports.
+
+Instead of re-exporting whole tables, an incremental export only exports the
+records changed since its last successful run, according to a watermark field
+of the model (an indexed timestamp updated on every change):
+
+- `CeramicCache.updated_at`, which is also set when a stamp is soft-deleted,
+  so deltas include the deleted stamps (with their `deleted_at`)
+- `Score.last_score_timestamp`
+
+Each run exports the records in the window (last watermark, until], where
+`until` lags `INCREMENTAL_EXPORT_LAG` seconds behind the current time so
+that transactions still in flight (or replication lag on the read replica)
+do not commit records into a window that has already been exported.
+
+Periodically (every `snapshot_every` deltas, and on the first run) a
+compacted snapshot of all the current records is exported instead, so that
+consumers do not need to replay every delta since the beginning.
+
+The watermarks are stored as `StampExports` records, and must only be
+recorded (with `IncrementalExport.record`) once the exported file has been
+uploaded. A failed run therefore leaves the watermark unchanged, and the next
+run exports the same records again.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from ceramic_cache.models import StampExports
+
+# Watermark field of the models that can be exported incrementally
+WATERMARK_FIELDS = {
+    "ceramic_cache.CeramicCache": "updated_at",
+    "registry.Score": "last_score_timestamp",
+}
+
+# Filters applied to snapshots, to leave out records only relevant to deltas
+SNAPSHOT_FILTERS = {
+    "ceramic_cache.CeramicCache": {"deleted_at__isnull": True},
+}
+
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S"
+
+
+def get_watermark_field(model) -> Optional[str]:
+    return WATERMARK_FIELDS.get(model._meta.label)
+
+
+class IncrementalExport:
+    def __init__(
+        self,
+        export_name: str,
+        model,
+        watermark_field: Optional[str] = None,
+        snapshot_every: int = 0,
+        force_snapshot: bool = False,
+    ):
+        self.export_name = export_name
+        self.model = model
+        self.watermark_field = watermark_field or get_watermark_field(model)
+        if self.watermark_field is None:
+            raise ValueError(
+                f"No watermark field for {model._meta.label}, it cannot be exported incrementally"
+            )
+
+        self.until: datetime = timezone.now() - timedelta(
+            seconds=settings.INCREMENTAL_EXPORT_LAG
+        )
+        last_export = (
+            StampExports.objects.filter(export_name=export_name)
+            .order_by("-last_export_ts")
+            .first()
+        )
+        self.since: Optional[datetime] = (
+            last_export.last_export_ts if last_export else None
+        )
+        self.is_snapshot = (
+            force_snapshot
+            or last_export is None
+            or (snapshot_every > 0 and self._deltas_since_snapshot() >= snapshot_every)
+        )
+
+    def _deltas_since_snapshot(self) -> int:
+        exports = StampExports.objects.filter(export_name=self.export_name)
+        last_snapshot = exports.filter(is_snapshot=True).order_by("-last_export_ts")
+        last_snapshot = last_snapshot.first()
+        if last_snapshot:
+            exports = exports.filter(last_export_ts__gt=last_snapshot.last_export_ts)
+        return exports.filter(is_snapshot=False).count()
+
+    def filter_kwargs(self) -> dict:
+        """
+        Filter selecting the records to export, to be passed to `filter(...)`
+        """
+        field = self.watermark_field
+        if self.is_snapshot:
+            return {
+                f"{field}__lte": self.until,
+                **SNAPSHOT_FILTERS.get(self.model._meta.label, {}),
+            }
+        return {f"{field}__gt": self.since, f"{field}__lte": self.until}
+
+    def filter(self, queryset):
+        return queryset.filter(**self.filter_kwargs())
+
+    @property
+    def suffix(self) -> str:
+        """
+        Identifies the exported window, to be used in the exported file name
+        """
+        until = self.until.strftime(TIMESTAMP_FORMAT)
+        if self.is_snapshot:
+            return f"snapshot_{until}"
+        return f"delta_{self.since.strftime(TIMESTAMP_FORMAT)}_{until}"
+
+    def record(self, total: int, s3_key: str = "") -> StampExports:
+        """
+        Record the watermark of this export. Only call this once the exported
+        data has been uploaded.
+        """
+        return StampExports.objects.create(
+            export_name=self.export_name,
+            last_export_ts=self.until,
+            stamp_total=total,
+            is_snapshot=self.is_snapshot,
+            s3_key=s3_key,
+        )
@@ -1,13 +1,13 @@
-import datetime
 import json
 import os
 
 import boto3
 from django.conf import settings
-from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
 from tqdm import tqdm
 
-from ceramic_cache.models import CeramicCache, StampExports
+from ceramic_cache.incremental_exports import IncrementalExport
+from ceramic_cache.models import CeramicCache
 
 from .base_cron_cmds import BaseCronJobCmd
 
@@ -17,64 +17,61 @@ s3 = boto3.client("s3")
 class Command(BaseCronJobCmd):
     help = "Weekly data dump of new Stamp data since the last dump."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default="read_replica_0",
+            help='The database to read the stamps from. Defaults to "read_replica_0".',
+        )
+        parser.add_argument(
+            "--snapshot",
+            action="store_true",
+            help="Export a full snapshot of the current stamps instead of the changes since the last dump",
+        )
+        parser.add_argument(
+            "--snapshot-every",
+            type=int,
+            default=0,
+            help="Export a full snapshot instead of the changes after this many dumps of changes (0: never)",
+        )
+
     def handle_cron_job(self, *args, **options):
         print("Starting dump_stamp_data.py")
 
-        latest_export = StampExports.objects.order_by("-last_export_ts").first()
-
-        if not latest_export:
-            print("No previous exports found. Exporting all data.")
-            latest_export = StampExports(
-                last_export_ts=datetime.date.fromisoformat("1970-01-01")
-            )
+        export = IncrementalExport(
+            "stamps",
+            CeramicCache,
+            snapshot_every=options["snapshot_every"],
+            force_snapshot=options["snapshot"],
+        )
 
-        print(f"Getting Stamps updated since {latest_export.last_export_ts}")
+        if export.is_snapshot:
+            print(f"Exporting a snapshot of the Stamps up to {export.until}")
+        else:
+            print(f"Getting Stamps updated since {export.since} up to {export.until}")
 
+        # Deltas include the deleted stamps, with their `deleted_at`
         query = (
-            CeramicCache.objects.values("stamp", "updated_at")
-            .order_by("updated_at")
-            .using("read_replica_0")
+            export.filter(CeramicCache.objects.using(options["database"]))
+            .values_list("stamp", "deleted_at")
+            .order_by("id")
         )
 
         # Generate the dump file name
-        file_name = f"stamps_{latest_export.last_export_ts.strftime('%Y%m%d_%H%M%S')}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
-
-        last_updated_at = latest_export.last_export_ts
-        chunk_size = 1000
-
-        try:
-            # Write serialized data to the file
-            with open(file_name, "w") as f:
-                with tqdm(
-                    unit="items", unit_scale=None, desc="Exporting stamps"
-                ) as progress_bar:
-                    has_more = True
-                    while has_more:
-                        objects = list(
-                            query.filter(updated_at__gt=last_updated_at)[:chunk_size]
-                        )
-                        if objects:
-                            num_objects = len(objects)
-                            progress_bar.update(num_objects)
-
-                            for cache_obj in objects:
-                                f.write(
-                                    json.dumps({"stamp": cache_obj["stamp"]}) + "\n"
-                                )
-
-                            last_updated_at = cache_obj["updated_at"]
-
-                            # If we get less than the chunk size, we've reached the end
-                            # No need to keep querying which could result in querying forever
-                            if num_objects < chunk_size:
-                                has_more = False
-                        else:
-                            has_more = False
-
-        finally:
-            self.stdout.write(
-                self.style.SUCCESS(f'Last stamp updated at "{last_updated_at}"')
-            )
+        file_name = f"stamps_{export.suffix}.jsonl"
+        encoder = DjangoJSONEncoder()
+
+        # Write serialized data to the file
+        with open(file_name, "w") as f:
+            with tqdm(
+                unit="items", unit_scale=None, desc="Exporting stamps"
+            ) as progress_bar:
+                for stamp, deleted_at in query.iterator(chunk_size=1000):
+                    f.write(
+                        encoder.encode({"stamp": stamp, "deleted_at": deleted_at})
+                        + "\n"
+                    )
+                    progress_bar.update(1)
 
         # Upload to S3 bucket
         s3.upload_file(file_name, settings.S3_WEEKLY_BACKUP_BUCKET_NAME, file_name)
@@ -82,8 +79,8 @@ class Command(BaseCronJobCmd):
         # Delete local file after upload
         os.remove(file_name)
 
-        StampExports.objects.create(
-            last_export_ts=last_updated_at, stamp_total=progress_bar.n
-        )
+        # Only move the watermark forward once the file is uploaded
+        export.record(progress_bar.n, s3_key=file_name)
 
+        self.stdout.write(self.style.SUCCESS(f'Stamps exported up to "{export.until}"'))
         print(f"Data dump completed and uploaded to S3 as {file_name}")
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ceramic_cache.models import Ban
+from ceramic_cache.revocations import RevocationResult, revoke_bans_matching_credentials
+
+
+class Command(BaseCommand):
+    help = (
+        "Revoke the stamps matching bans. This is the background counterpart of the "
+        "'Revoke matching credentials' admin action, for large sets of bans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ban-id",
+            type=int,
+            action="append",
+            default=[],
+            help="Id of a ban to process (can be repeated)",
+        )
+        parser.add_argument(
+            "--ban-list-id",
+            type=int,
+            help="Process all the bans created from this ban list",
+        )
+        parser.add_argument(
+            "--pending",
+            action="store_true",
+            help="Process all the bans for which matching credentials have never been revoked",
+        )
+        parser.add_argument(
+            "--addresses-file",
+            type=str,
+            help="Write the addresses of the affected passports to this file, one per line",
+        )
+
+    def handle(self, *args, **options):
+        bans = Ban.objects.all()
+        if options["ban_id"]:
+            bans = bans.filter(id__in=options["ban_id"])
+        if options["ban_list_id"] is not None:
+            bans = bans.filter(ban_list_id=options["ban_list_id"])
+        if options["pending"]:
+            bans = bans.filter(last_run_revoke_matching__isnull=True)
+        if not (options["ban_id"] or options["ban_list_id"] or options["pending"]):
+            raise CommandError(
+                "Select the bans to process with --ban-id, --ban-list-id or --pending"
+            )
+
+        bans = bans.order_by("id")
+        total = bans.count()
+        self.stdout.write(f"Revoking matching credentials for {total} ban(s)")
+
+        def on_progress(processed: int, ban: Ban, result: RevocationResult):
+            self.stdout.write(
+                f"[{processed}/{total}] ban #{ban.id}: revoked {result.revoked} stamp(s)"
+            )
+
+        result = revoke_bans_matching_credentials(
+            bans.iterator(), on_progress=on_progress
+        )
+
+        if options["addresses_file"]:
+            with open(options["addresses_file"], "w", encoding="utf-8") as f:
+                for address in sorted(result.addresses):
+                    f.write(f"{address}\n")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Revoked {result.revoked} stamp(s), {len(result.addresses)} passport(s) affected"
+            )
+        )
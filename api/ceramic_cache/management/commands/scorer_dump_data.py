@@ -1,7 +1,11 @@
 import datetime
 import json
+import multiprocessing
 import os
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Tuple
 from urllib.parse import urlparse
 
 import boto3
@@ -9,9 +13,12 @@ from django.apps import apps
 from django.conf import settings
 from django.core.serializers.json import DjangoJSONEncoder
 from django.core.serializers.python import Serializer as PythonSerializer
-from django.db import DEFAULT_DB_ALIAS
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Max, Min
 from tqdm import tqdm
 
+from ceramic_cache.incremental_exports import IncrementalExport
+
 from .base_cron_cmds import BaseCronJobCmd
 
 
@@ -49,6 +56,10 @@ class Serializer(PythonSerializer):
         self.json_kwargs["separators"] = (",", ": ")
         self.json_kwargs.setdefault("cls", DjangoJSONEncoder)
         self.json_kwargs.setdefault("ensure_ascii", False)
+        # `json.dump` always uses the pure python encoder, while `encode` can
+        # use the C accelerated one
+        json_kwargs = self.json_kwargs.copy()
+        self._encoder = json_kwargs.pop("cls")(**json_kwargs)
 
     def start_serialization(self):
         self._init_options()
@@ -57,7 +68,7 @@ class Serializer(PythonSerializer):
         # self._current has the field data
         self._current["id"] = self._value_from_field(obj, obj._meta.pk)
 
-        json.dump(self._current, self.stream, **self.json_kwargs)
+        self.stream.write(self._encoder.encode(self._current))
         self.stream.write("\n")
         self.last_id = self._current["id"]
         self.total_items_count += 1
@@ -181,7 +192,9 @@ def export_data(model_config, file, database, batch_size=None):
             serializer.serialize(
                 queryset.iterator(), progress_output=progress_bar, stream=file
             )
+            return serializer.total_items_count
         else:
+            total_items_count = 0
             has_more_records = True
             query_filter = model_config["filter"] if "filter" in model_config else {}
             while has_more_records:
@@ -198,8 +211,54 @@ def export_data(model_config, file, database, batch_size=None):
                 serializer.serialize(
                     queryset.iterator(), progress_output=progress_bar, stream=file
                 )
+                total_items_count += serializer.total_items_count
 
                 has_more_records = serializer.last_id != 0
+            return total_items_count
+
+
+def get_id_ranges(model_config, database, partitions) -> List[Tuple[int, int]]:
+    """
+    Split the range of ids of the records to export into (at most)
+    `partitions` contiguous ranges of the same width, as inclusive
+    (id_from, id_to) bounds.
+    """
+    model = apps.get_model(model_config["name"])
+    queryset = model.objects.using(database).filter(**model_config.get("filter", {}))
+    bounds = queryset.aggregate(min_id=Min("id"), max_id=Max("id"))
+    min_id, max_id = bounds["min_id"], bounds["max_id"]
+    if min_id is None:
+        return []
+
+    width = -(-(max_id - min_id + 1) // partitions)
+    return [
+        (id_from, min(id_from + width - 1, max_id))
+        for id_from in range(min_id, max_id + 1, width)
+    ]
+
+
+def export_partition(model_config, database, batch_size, part):
+    """
+    Export the records with ids in [part["id_from"], part["id_to"]] to
+    part["file_name"]. This runs in a worker process, and returns the part
+    with the number of exported records.
+    """
+    partition_config = {
+        **model_config,
+        "filter": {
+            **model_config.get("filter", {}),
+            "id__gte": part["id_from"],
+            "id__lte": part["id_to"],
+        },
+    }
+    try:
+        with open(part["file_name"], "w", encoding="utf-8") as file:
+            records = export_data(
+                partition_config, file, database=database, batch_size=batch_size
+            )
+        return {**part, "records": records}
+    finally:
+        connections.close_all()
 
 
 class Command(BaseCronJobCmd):
@@ -234,13 +293,50 @@ class Command(BaseCronJobCmd):
                                 "filename": "custom filename for the export, otherwise the tablename will be used by default",
                                 "filter": "<filter to apply to query - this dict will be passed into the `filter(...) query method`>,
                                 "extra-args": "<extra args to the s3 upload. This can be used to set dump file permissions, see: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/upload_file.html>"
-                                "select_related":["<array of releated field names that should be expanded and included in the dump">]
+                                "select_related":["<array of releated field names that should be expanded and included in the dump">],
+                                "watermark_field": "<timestamp field tracking changes, for --incremental>"
                             }
                             """,
         )
         parser.add_argument(
             "--s3-uri", type=str, help="The S3 URI target location for the files"
         )
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            default=1,
+            help="""Number of worker processes to export each model with.
+            If greater than 1, the range of ids is split into this many ranges, each exported to
+            its own part file. The parts are uploaded to a folder named after the file, together
+            with a `manifest.json` listing them.
+            """,
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="""Only export the records changed since the last incremental export of the same file.
+            The changes are tracked with the `watermark_field` of the model config, which defaults to
+            `updated_at` for ceramic_cache.CeramicCache and `last_score_timestamp` for registry.Score.
+            The exported file names get a `_delta_<since>_<until>` or `_snapshot_<until>` suffix.
+            """,
+        )
+        parser.add_argument(
+            "--snapshot-every",
+            type=int,
+            default=0,
+            help="With --incremental, export a full snapshot after this many deltas (0: only the first time)",
+        )
+        parser.add_argument(
+            "--snapshot",
+            action="store_true",
+            help="With --incremental, export a full snapshot instead of a delta",
+        )
+        parser.add_argument(
+            "--upload-concurrency",
+            type=int,
+            default=8,
+            help="Number of part files uploaded concurrently, when using --partitions",
+        )
         parser.add_argument(
             "--s3-endpoint",
             type=str,
@@ -282,6 +378,8 @@ class Command(BaseCronJobCmd):
         self.stdout.write("Options: " + str(options))
 
         batch_size = options["batch_size"]
+        partitions = options["partitions"]
+        upload_concurrency = options["upload_concurrency"]
         config = options["config"]
         configured_models = json.loads(config)
         s3_uri = options["s3_uri"]
@@ -291,8 +389,12 @@ class Command(BaseCronJobCmd):
         database = options["database"]
         summary_extra_args = json.loads(options["summary_extra_args"])
         cloudfront_distribution_id = options["cloudfront_distribution_id"]
+        incremental = options["incremental"]
+        snapshot_every = options["snapshot_every"]
+        force_snapshot = options["snapshot"]
         self.stdout.write("-" * 40)
         self.stdout.write(f"batch_size          : {batch_size}")
+        self.stdout.write(f"partitions          : {partitions}")
         self.stdout.write(f"config              : {config}")
         self.stdout.write(f"s3_uri              : {s3_uri}")
         self.stdout.write(f"s3_endpoint         : {s3_endpoint}")
@@ -336,66 +438,98 @@ class Command(BaseCronJobCmd):
                     else model_config["filename"]
                 )
 
-                s3_key = f"{s3_folder}/{file_name}"
-
                 # chunk_size = 1000
 
                 try:
-                    # Write serialized data to the file
-                    self.stdout.write(f"Serializing to file: {file_name}")
-                    with open(file_name, "w", encoding="utf-8") as file:
-                        export_data(
-                            model_config, file, batch_size=batch_size, database=database
+                    export = None
+                    if incremental:
+                        export = IncrementalExport(
+                            f"scorer_dump_data:{file_name}",
+                            model,
+                            watermark_field=model_config.get("watermark_field"),
+                            snapshot_every=snapshot_every,
+                            force_snapshot=force_snapshot,
                         )
+                        model_config = {
+                            **model_config,
+                            "filter": {
+                                **model_config.get("filter", {}),
+                                **export.filter_kwargs(),
+                            },
+                        }
+                        name, extension = os.path.splitext(file_name)
+                        file_name = f"{name}_{export.suffix}{extension}"
+                        model_summary["incremental"] = {
+                            "since": export.since.isoformat() if export.since else None,
+                            "until": export.until.isoformat(),
+                            "is_snapshot": export.is_snapshot,
+                        }
+
+                    s3_key = f"{s3_folder}/{file_name}"
+
+                    if partitions > 1:
+                        manifest_key, records = self.dump_partitioned(
+                            model_config,
+                            file_name,
+                            s3,
+                            s3_bucket_name,
+                            s3_folder,
+                            database=database,
+                            batch_size=batch_size,
+                            partitions=partitions,
+                            upload_concurrency=upload_concurrency,
+                        )
+                        model_summary["finished_at"] = (
+                            datetime.datetime.now().isoformat()
+                        )
+                        model_summary["manifest_key"] = manifest_key
+                        model_summary["s3_bucket_name"] = s3_bucket_name
+                        paths_to_invalidate = [
+                            f"/{os.path.dirname(manifest_key)}/*",
+                        ]
+                    else:
+                        # Write serialized data to the file
+                        self.stdout.write(f"Serializing to file: {file_name}")
+                        with open(file_name, "w", encoding="utf-8") as file:
+                            records = export_data(
+                                model_config,
+                                file,
+                                batch_size=batch_size,
+                                database=database,
+                            )
 
-                    model_summary["start_s3_upload"] = (
-                        datetime.datetime.now().isoformat()
-                    )
-                    self.stdout.write(
-                        f"Uploading to s3, bucket='{s3_bucket_name}', key='{s3_key}'"
-                    )
-
-                    # Upload to S3 bucket
-                    s3.upload_file(
-                        file_name,
-                        s3_bucket_name,
-                        s3_key,
-                        ExtraArgs=model_config.get("extra-args", {}),
-                    )
-                    model_summary["finished_at"] = datetime.datetime.now().isoformat()
-                    model_summary["s3_key"] = s3_key
-                    model_summary["s3_bucket_name"] = s3_bucket_name
-
-                    if cloudfront_distribution_id:
-                        client = boto3.client("cloudfront")
-                        paths_to_invalidate = [f"/{s3_key}"]
+                        model_summary["start_s3_upload"] = (
+                            datetime.datetime.now().isoformat()
+                        )
                         self.stdout.write(
-                            f"Create invalidation for {paths_to_invalidate} in the cloufront distribution {cloudfront_distribution_id}"
+                            f"Uploading to s3, bucket='{s3_bucket_name}', key='{s3_key}'"
                         )
-                        response = client.create_invalidation(
-                            DistributionId=cloudfront_distribution_id,
-                            InvalidationBatch={
-                                "Paths": {
-                                    "Quantity": len(paths_to_invalidate),
-                                    "Items": paths_to_invalidate,
-                                },
-                                "CallerReference": str(
-                                    datetime.datetime.utcnow().timestamp()
-                                ),  # Unique reference, using timestamp
-                            },
+
+                        # Upload to S3 bucket
+                        s3.upload_file(
+                            file_name,
+                            s3_bucket_name,
+                            s3_key,
+                            ExtraArgs=model_config.get("extra-args", {}),
+                        )
+                        model_summary["finished_at"] = (
+                            datetime.datetime.now().isoformat()
+                        )
+                        model_summary["s3_key"] = s3_key
+                        model_summary["s3_bucket_name"] = s3_bucket_name
+                        paths_to_invalidate = [f"/{s3_key}"]
+                        os.remove(file_name)
+
+                    if export:
+                        # Only move the watermark forward once the data is uploaded
+                        export.record(
+                            records, s3_key=model_summary.get("manifest_key", s3_key)
                         )
-                        # Verify the response
-                        if response["ResponseMetadata"]["HTTPStatusCode"] == 201:
-                            invalidation_id = response["Invalidation"]["Id"]
-                            self.stdout.write(
-                                f"Invalidation created successfully. Invalidation ID: {invalidation_id}\n"
-                            )
-                        else:
-                            self.stdout.write(
-                                f"Failed to create invalidation. HTTP Status Code: {response['ResponseMetadata']['HTTPStatusCode']}\n"
-                            )
 
-                    os.remove(file_name)
+                    if cloudfront_distribution_id:
+                        self.create_invalidation(
+                            cloudfront_distribution_id, paths_to_invalidate
+                        )
                 except Exception as e:
                     self.stderr.write(self.style.ERROR(f"ERROR: {e}"))
                     self.stderr.write(traceback.format_exc())
@@ -421,3 +555,124 @@ class Command(BaseCronJobCmd):
             self.stderr.write(traceback.format_exc())
         finally:
             self.stdout.write(self.style.SUCCESS("Finished dump all data"))
+
+    def create_invalidation(self, cloudfront_distribution_id, paths_to_invalidate):
+        client = boto3.client("cloudfront")
+        self.stdout.write(
+            f"Create invalidation for {paths_to_invalidate} in the cloufront distribution {cloudfront_distribution_id}"
+        )
+        response = client.create_invalidation(
+            DistributionId=cloudfront_distribution_id,
+            InvalidationBatch={
+                "Paths": {
+                    "Quantity": len(paths_to_invalidate),
+                    "Items": paths_to_invalidate,
+                },
+                "CallerReference": str(
+                    datetime.datetime.utcnow().timestamp()
+                ),  # Unique reference, using timestamp
+            },
+        )
+        # Verify the response
+        if response["ResponseMetadata"]["HTTPStatusCode"] == 201:
+            invalidation_id = response["Invalidation"]["Id"]
+            self.stdout.write(
+                f"Invalidation created successfully. Invalidation ID: {invalidation_id}\n"
+            )
+        else:
+            self.stdout.write(
+                f"Failed to create invalidation. HTTP Status Code: {response['ResponseMetadata']['HTTPStatusCode']}\n"
+            )
+
+    def dump_partitioned(
+        self,
+        model_config,
+        file_name,
+        s3,
+        s3_bucket_name,
+        s3_folder,
+        database,
+        batch_size,
+        partitions,
+        upload_concurrency,
+    ) -> Tuple[str, int]:
+        """
+        Export the records in `partitions` ranges of ids, each in its own worker
+        process and part file. Part files are uploaded as soon as they are
+        written, concurrently, under a folder named after the file. A manifest
+        listing the parts is uploaded last, so consumers can rely on the parts
+        it lists being complete. Returns the key of the manifest and the number
+        of exported records.
+        """
+        name, _ = os.path.splitext(file_name)
+        parts_folder = f"{s3_folder}/{name}"
+        extra_args = model_config.get("extra-args", {})
+
+        id_ranges = get_id_ranges(model_config, database, partitions)
+        self.stdout.write(
+            f"Exporting {len(id_ranges)} partitions of {model_config['name']} to '{parts_folder}'"
+        )
+
+        parts = [
+            {
+                "key": f"{parts_folder}/part-{index:05d}.jsonl",
+                "file_name": f"{name}.part-{index:05d}.jsonl",
+                "id_from": id_from,
+                "id_to": id_to,
+            }
+            for index, (id_from, id_to) in enumerate(id_ranges)
+        ]
+
+        def upload(part):
+            s3.upload_file(
+                part["file_name"], s3_bucket_name, part["key"], ExtraArgs=extra_args
+            )
+            os.remove(part["file_name"])
+            self.stdout.write(f"Uploaded part '{part['key']}'")
+
+        # The worker processes open their own database connections, the
+        # connections of this process must not be shared with them
+        connections.close_all()
+        # The worker processes are forked when creating the pool, before
+        # any upload thread is started
+        with (
+            multiprocessing.get_context("fork").Pool(processes=len(parts) or 1) as pool,
+            ThreadPoolExecutor(max_workers=upload_concurrency) as upload_pool,
+        ):
+            uploads = []
+            exported_parts = []
+            for part in pool.imap_unordered(
+                partial(export_partition, model_config, database, batch_size), parts
+            ):
+                part["bytes"] = os.path.getsize(part["file_name"])
+                exported_parts.append(part)
+                uploads.append(upload_pool.submit(upload, part))
+            for upload_result in uploads:
+                upload_result.result()
+        parts = sorted(exported_parts, key=lambda part: part["id_from"])
+
+        manifest = {
+            "model": model_config["name"],
+            "created_at": datetime.datetime.now().isoformat(),
+            "format": "jsonl",
+            "records": sum(part["records"] for part in parts),
+            "parts": [
+                {
+                    "key": part["key"],
+                    "id_from": part["id_from"],
+                    "id_to": part["id_to"],
+                    "records": part["records"],
+                    "bytes": part["bytes"],
+                }
+                for part in parts
+            ],
+        }
+        manifest_file_name = f"{name}.manifest.json"
+        with open(manifest_file_name, "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+        manifest_key = f"{parts_folder}/manifest.json"
+        s3.upload_file(
+            manifest_file_name, s3_bucket_name, manifest_key, ExtraArgs=extra_args
+        )
+        os.remove(manifest_file_name)
+        return manifest_key, manifest["records"]
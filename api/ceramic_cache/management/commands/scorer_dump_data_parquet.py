@@ -5,10 +5,10 @@ from urllib.parse import urlparse
 from django.apps import apps
 from django.db import DEFAULT_DB_ALIAS
 
+from ceramic_cache.incremental_exports import IncrementalExport, get_watermark_field
 from scorer.export_utils import (
-    export_data_for_model,
+    export_queryset_to_parquet,
     upload_to_s3,
-    writer_context_manager,
 )
 
 from .base_cron_cmds import BaseCronJobCmd
@@ -21,10 +21,10 @@ class Command(BaseCronJobCmd):
         parser.add_argument(
             "--batch-size",
             type=int,
-            default=1000,
+            default=10000,
             help="""Size of record batches.
-            If present, this will read the records in batches. The result list is ordered by pk (id), to get
-            to the next batch we query by id__gt=last_id.
+            The records are streamed from a single query ordered by the sort field (pk by default),
+            fetching this many records at a time. Each batch is written as one row group.
             """,
         )
         parser.add_argument(
@@ -53,12 +53,47 @@ class Command(BaseCronJobCmd):
             help="""The field used to sort and batch the export. This is typically the id, but can be any unique field.""",
             default="id",
         )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="""Only export the records changed since the last incremental export, for the models
+            that track changes (see ceramic_cache.incremental_exports). The other models are exported
+            in full. The exported file names get a `_delta_<since>_<until>` or `_snapshot_<until>` suffix.""",
+        )
+        parser.add_argument(
+            "--snapshot-every",
+            type=int,
+            default=0,
+            help="""With --incremental, export a full snapshot after this many deltas (0: only the first time)""",
+        )
+        parser.add_argument(
+            "--snapshot",
+            action="store_true",
+            help="""With --incremental, export a full snapshot instead of a delta""",
+        )
+        parser.add_argument(
+            "--compression",
+            type=str,
+            default="zstd",
+            help="""Compression codec for the parquet files (e.g. zstd, snappy, none).""",
+        )
+        parser.add_argument(
+            "--compression-level",
+            type=int,
+            default=None,
+            help="""Compression level, for the codecs that support it.""",
+        )
 
     def handle_cron_job(self, *args, **options):
         self.batch_size = options["batch_size"]
         self.s3_uri = options["s3_uri"]
         self.database = options["database"]
         self.sort_field = options["sort_field"]
+        self.compression = options["compression"]
+        self.compression_level = options["compression_level"]
+        self.incremental = options["incremental"]
+        self.snapshot_every = options["snapshot_every"]
+        self.snapshot = options["snapshot"]
         apps_to_export = options["apps"].split(",") if options["apps"] else None
         extra_args = (
             json.parse(options["s3_extra_args"]) if options["s3_extra_args"] else None
@@ -68,6 +103,7 @@ class Command(BaseCronJobCmd):
         self.stdout.write(f"EXPORT - batch_size  : '{self.batch_size}'")
         self.stdout.write(f"EXPORT - database    : '{self.database}'")
         self.stdout.write(f"EXPORT - apps        : '{apps_to_export}'")
+        self.stdout.write(f"EXPORT - compression : '{self.compression}'")
 
         if not apps:
             return
@@ -88,19 +124,40 @@ class Command(BaseCronJobCmd):
                 try:
                     table_name = model._meta.db_table
                     output_file = f"{table_name}.parquet"
-                    export_data_for_model(
-                        model.objects.all().using(self.database),
-                        self.sort_field,
-                        self.batch_size,
-                        writer_context_manager,
+                    queryset = model.objects.all().using(self.database)
+
+                    export = None
+                    if self.incremental and get_watermark_field(model):
+                        export = IncrementalExport(
+                            f"scorer_dump_data_parquet:{table_name}",
+                            model,
+                            snapshot_every=self.snapshot_every,
+                            force_snapshot=self.snapshot,
+                        )
+                        queryset = export.filter(queryset)
+                        output_file = f"{table_name}_{export.suffix}.parquet"
+
+                    num_rows = export_queryset_to_parquet(
+                        queryset,
+                        output_file,
+                        sort_field=self.sort_field,
+                        chunk_size=self.batch_size,
+                        compression=self.compression,
+                        compression_level=self.compression_level,
                     )
 
                     self.stdout.write(
-                        self.style.SUCCESS(f"EXPORT - Data exported to '{output_file}'")
+                        self.style.SUCCESS(
+                            f"EXPORT - {num_rows} records exported to '{output_file}'"
+                        )
                     )
 
                     upload_to_s3(output_file, s3_folder, s3_bucket_name, extra_args)
 
+                    if export:
+                        # Only move the watermark forward once the data is uploaded
+                        export.record(num_rows, s3_key=f"{s3_folder}/{output_file}")
+
                     self.stdout.write(
                         self.style.SUCCESS(
                             f"EXPORT - Data uploaded to '{s3_bucket_name}/{s3_folder}/{output_file}'"
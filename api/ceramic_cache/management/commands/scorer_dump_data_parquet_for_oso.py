@@ -10,6 +10,7 @@ from django.conf import settings
 from django.db import DEFAULT_DB_ALIAS
 from django.db.models.functions import Lower
 
+from ceramic_cache.incremental_exports import IncrementalExport
 from registry.models import Score
 from scorer.export_utils import (
     AWSOverrideCredentials,
@@ -102,12 +103,26 @@ class Command(BaseCronJobCmd):
             "--s3-uri", type=str, help="The S3 URI target location for the files"
         )
         parser.add_argument("--filename", type=str, help="The filename to create")
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="""Only export the scores changed since the last incremental export.
+            The file name gets a `_delta_<since>_<until>` or `_snapshot_<until>` suffix.""",
+        )
+        parser.add_argument(
+            "--snapshot-every",
+            type=int,
+            default=0,
+            help="""With --incremental, export a full snapshot after this many deltas (0: only the first time)""",
+        )
 
     def handle_cron_job(self, *args, **options):
         self.batch_size = options["batch_size"]
         self.database = options["database"]
         self.s3_uri = options["s3_uri"]
         self.filename = options["filename"]
+        self.incremental = options["incremental"]
+        self.snapshot_every = options["snapshot_every"]
 
         # Get the bucket name and folder from the S3 uri
         parsed_uri = urlparse(self.s3_uri)
@@ -121,12 +136,23 @@ class Command(BaseCronJobCmd):
 
         self.stdout.write("EXPORT - START export data for Score")
         try:
-            export_data_for_model(
-                # We only want to export for the default scorer
-                Score.objects.filter(
-                    passport__community__id=settings.CERAMIC_CACHE_SCORER_ID
+            # We only want to export for the default scorer
+            queryset = Score.objects.filter(
+                passport__community__id=settings.CERAMIC_CACHE_SCORER_ID
+            )
+            export = None
+            if self.incremental:
+                export = IncrementalExport(
+                    "scorer_dump_data_parquet_for_oso",
+                    Score,
+                    snapshot_every=self.snapshot_every,
                 )
-                .select_related("passport")
+                queryset = export.filter(queryset)
+                name, extension = os.path.splitext(self.filename)
+                self.filename = f"{name}_{export.suffix}{extension}"
+
+            num_rows = export_data_for_model(
+                queryset.select_related("passport")
                 .annotate(  # This is basically just a trick to get the `address` form the related `passport` into the values() output ...
                     passport_address=Lower("passport__address")
                 )
@@ -153,6 +179,10 @@ class Command(BaseCronJobCmd):
                 self.filename, s3_folder, s3_bucket_name, {}, aws_override_credentials
             )
 
+            if export:
+                # Only move the watermark forward once the data is uploaded
+                export.record(num_rows, s3_key=f"{s3_folder}/{self.filename}")
+
             self.stdout.write(
                 self.style.SUCCESS(
                     f"EXPORT - Data uploaded to folder '{s3_folder}' in bucket '{s3_bucket_name}'"
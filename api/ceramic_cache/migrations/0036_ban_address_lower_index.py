@@ -0,0 +1,20 @@
+# Generated by Django 4.2.6 on 2026-10-19 10:33
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ceramic_cache", "0035_remove_old_address_deleted_at_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ban",
+            index=models.Index(
+                django.db.models.functions.text.Lower("address"),
+                name="ban_address_lower_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.6 on 2026-10-19 11:49
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ceramic_cache", "0036_ban_address_lower_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stampexports",
+            name="export_name",
+            field=models.CharField(
+                db_index=True,
+                default="stamps",
+                help_text="Name of the export this watermark belongs to",
+                max_length=255,
+            ),
+        ),
+        migrations.AddField(
+            model_name="stampexports",
+            name="is_snapshot",
+            field=models.BooleanField(
+                default=False,
+                help_text="Whether this export is a full snapshot rather than a delta",
+            ),
+        ),
+        migrations.AddField(
+            model_name="stampexports",
+            name="s3_key",
+            field=models.CharField(blank=True, default="", max_length=1024),
+        ),
+        migrations.AlterField(
+            model_name="stampexports",
+            name="last_export_ts",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now
+            ),
+        ),
+    ]
@@ -6,6 +6,9 @@ from typing import Literal, Self
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import Q, UniqueConstraint
+from django.db.models.functions import Lower
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
 from account.models import EthAddressField
@@ -155,8 +158,24 @@ class CeramicCache(models.Model):
 
 
 class StampExports(models.Model):
-    last_export_ts = models.DateTimeField(auto_now_add=True)
+    """
+    Watermark of a successful export: records are exported up to (and
+    including) `last_export_ts`. See `ceramic_cache.incremental_exports`.
+    """
+
+    export_name = models.CharField(
+        max_length=255,
+        default="stamps",
+        db_index=True,
+        help_text="Name of the export this watermark belongs to",
+    )
+    last_export_ts = models.DateTimeField(default=timezone.now, db_index=True)
     stamp_total = models.IntegerField(default=0)
+    is_snapshot = models.BooleanField(
+        default=False,
+        help_text="Whether this export is a full snapshot rather than a delta",
+    )
+    s3_key = models.CharField(max_length=1024, blank=True, default="")
 
 
 class CeramicCacheLegacy(models.Model):
@@ -295,6 +314,7 @@ class Ban(models.Model):
     def get_bans(cls, *, address: str, hashes: list[str]) -> list["Ban"]:
         """
         Fetch all bans that could affect the given address and/or hashes in one query.
+        The address is matched on `lower(address)`, which is backed by a functional index.
 
         Returns:
             List of relevant Ban objects
@@ -302,10 +322,12 @@ class Ban(models.Model):
         now = timezone.now()
 
         return list(
-            cls.objects.filter(
+            cls.objects.alias(address_lower=Lower("address"))
+            .filter(
                 Q(end_time__isnull=True) | Q(end_time__gt=now),
-                Q(hash__in=hashes) | Q(address__iexact=address),
-            ).select_related()
+                Q(hash__in=hashes) | Q(address_lower=address.lower()),
+            )
+            .select_related()
         )
 
     @staticmethod
@@ -351,6 +373,11 @@ class Ban(models.Model):
 
         return False, None, None
 
+    class Meta:
+        indexes = [
+            models.Index(Lower("address"), name="ban_address_lower_idx"),
+        ]
+
     def clean(self):
         super().clean()
 
@@ -391,24 +418,20 @@ class Ban(models.Model):
     def revoke_matching_credentials(self):
         """
         Revoke all matching credentials.
+
+        Returns:
+            RevocationResult with the number of revoked stamps and the affected addresses
         """
-        filters = [
-            f
-            for f in [
-                Q(provider=self.provider) if self.provider else None,
-                Q(address=self.address) if self.address else None,
-                Q(stamp__credentialSubject__hash=self.hash) if self.hash else None,
-                Q(deleted_at__isnull=True, revocation__isnull=True),
-            ]
-            if f is not None
-        ]
+        # pylint: disable=import-outside-toplevel
+        from .revocations import revoke_ban_matching_credentials
 
-        stamps = CeramicCache.objects.filter(*filters)
+        return revoke_ban_matching_credentials(self)
 
-        for stamp in stamps:
-            Revocation.objects.create(
-                proof_value=stamp.proof_value, ceramic_cache=stamp
-            )
 
-        self.last_run_revoke_matching = timezone.now()
-        self.save()
+@receiver(post_save, sender=Ban)
+@receiver(post_delete, sender=Ban)
+def ban_changed(sender, instance, **kwargs):
+    # pylint: disable=import-outside-toplevel
+    from .ban_index import bump_ban_index_version
+
+    bump_ban_index_version()
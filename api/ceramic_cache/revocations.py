@@ -0,0 +1,182 @@
+"""
+Set-based revocation of stamps.
+
+Stamps are revoked in batches: the ids of the candidate stamps (the ones not
+revoked yet) are read in id order, a batch at a time, and the revocations
+for a batch are written with a single `INSERT ... ON CONFLICT DO NOTHING`, so
+that re-running a revocation (or racing with another one) is harmless. Only
+the revocations actually inserted are counted.
+
+The addresses owning the revoked stamps are collected, so that the affected
+passports can be rescored.
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from .models import Ban, CeramicCache, Revocation, RevocationList
+
+REVOCATION_BATCH_SIZE = 1000
+
+
+@dataclass
+class RevocationResult:
+    revoked: int = 0
+    addresses: set[str] = field(default_factory=set)
+
+    def update(self, other: "RevocationResult"):
+        self.revoked += other.revoked
+        self.addresses.update(other.addresses)
+
+
+def get_stamps_matching_ban(ban: Ban) -> QuerySet[CeramicCache]:
+    filters = [
+        f
+        for f in [
+            Q(provider=ban.provider) if ban.provider else None,
+            Q(address=ban.address) if ban.address else None,
+            Q(stamp__credentialSubject__hash=ban.hash) if ban.hash else None,
+        ]
+        if f is not None
+    ]
+    return CeramicCache.objects.filter(*filters)
+
+
+def insert_revocations(
+    stamps: Iterable[tuple[int, str]],
+    revocation_list: Optional[RevocationList] = None,
+) -> set[int]:
+    """
+    Insert the revocations of the (id, proof_value) `stamps`, skipping the stamps
+    that are already revoked. Returns the ids of the stamps actually revoked.
+    """
+    stamp_ids, proof_values = zip(*stamps) if stamps else ((), ())
+    if not stamp_ids:
+        return set()
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {Revocation._meta.db_table}
+                (ceramic_cache_id, proof_value, revocation_list_id)
+            SELECT stamp.id, stamp.proof_value, %s
+            FROM unnest(%s::bigint[], %s::varchar[]) AS stamp(id, proof_value)
+            ON CONFLICT DO NOTHING
+            RETURNING ceramic_cache_id
+            """,
+            [
+                revocation_list.pk if revocation_list else None,
+                list(stamp_ids),
+                list(proof_values),
+            ],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def revoke_stamps(
+    stamps: QuerySet[CeramicCache],
+    revocation_list: Optional[RevocationList] = None,
+    include_deleted: bool = False,
+    batch_size: int = REVOCATION_BATCH_SIZE,
+) -> RevocationResult:
+    """
+    Revoke all the stamps in `stamps` that are not revoked yet (and not
+    deleted, unless `include_deleted` is set).
+    """
+    result = RevocationResult()
+    candidates = stamps.filter(revocation__isnull=True)
+    if not include_deleted:
+        candidates = candidates.filter(deleted_at__isnull=True)
+    last_id = 0
+
+    while True:
+        batch = list(
+            candidates.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "proof_value", "address")[:batch_size]
+        )
+        if not batch:
+            break
+
+        revoked_ids = insert_revocations(
+            [(stamp_id, proof_value) for stamp_id, proof_value, _ in batch],
+            revocation_list,
+        )
+
+        result.revoked += len(revoked_ids)
+        result.addresses.update(
+            address for stamp_id, _, address in batch if stamp_id in revoked_ids
+        )
+        last_id = batch[-1][0]
+
+    return result
+
+
+def revoke_ban_matching_credentials(ban: Ban) -> RevocationResult:
+    """
+    Revoke all the stamps matching `ban`, and record when this was last run.
+    """
+    with transaction.atomic():
+        result = revoke_stamps(get_stamps_matching_ban(ban))
+        ban.last_run_revoke_matching = timezone.now()
+        # Update the timestamp only: this is not a change to the ban itself,
+        # so there is no need to validate it or to refresh the ban index
+        Ban.objects.filter(pk=ban.pk).update(
+            last_run_revoke_matching=ban.last_run_revoke_matching
+        )
+    return result
+
+
+def revoke_bans_matching_credentials(
+    bans: Iterable[Ban],
+    on_progress: Optional[Callable[[int, Ban, RevocationResult], None]] = None,
+) -> RevocationResult:
+    """
+    Revoke the stamps matching each of the `bans`. Each ban is processed in its
+    own transaction, and `on_progress` is called after each of them with the
+    number of bans processed so far.
+    """
+    result = RevocationResult()
+    for processed, ban in enumerate(bans, start=1):
+        ban_result = revoke_ban_matching_credentials(ban)
+        result.update(ban_result)
+        if on_progress:
+            on_progress(processed, ban, ban_result)
+    return result
+
+
+def revoke_proof_values(
+    proof_values: Iterable[str],
+    revocation_list: Optional[RevocationList] = None,
+    batch_size: int = REVOCATION_BATCH_SIZE,
+) -> RevocationResult:
+    """
+    Revoke the stamps with the given proof values (e.g. from a revocation list).
+    Deleted stamps are revoked too, as revocations are checked by proof value.
+    """
+    result = RevocationResult()
+    batch = []
+
+    def flush():
+        result.update(
+            revoke_stamps(
+                CeramicCache.objects.filter(proof_value__in=batch),
+                revocation_list=revocation_list,
+                include_deleted=True,
+                batch_size=batch_size,
+            )
+        )
+        batch.clear()
+
+    for proof_value in proof_values:
+        batch.append(proof_value)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    return result
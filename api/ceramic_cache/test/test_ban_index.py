@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from ceramic_cache.ban_index import (
+    BAN_INDEX_VERSION_CACHE_KEY,
+    BanIndex,
+    get_ban_index,
+)
+from ceramic_cache.models import Ban
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def sample_address():
+    return "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+class TestBanIndex:
+    def test_account_ban_is_case_insensitive(self, sample_address):
+        Ban.objects.create(type="account", address=sample_address)
+
+        index = get_ban_index()
+
+        is_banned, ban_type, ban = index.check(sample_address.upper(), "", "github")
+        assert is_banned
+        assert ban_type == "account"
+        assert ban.address == sample_address.lower()
+
+    def test_single_stamp_ban_matches_provider_only(self, sample_address):
+        Ban.objects.create(
+            type="single_stamp", address=sample_address, provider="github"
+        )
+
+        index = get_ban_index()
+
+        assert index.check(sample_address, "", "github")[:2] == (
+            True,
+            "single_stamp",
+        )
+        assert index.check(sample_address, "", "twitter") == (False, None, None)
+
+    def test_expired_bans_are_not_loaded(self, sample_address):
+        Ban.objects.create(
+            type="account",
+            address=sample_address,
+            end_time=timezone.now() - timedelta(days=1),
+        )
+
+        index = get_ban_index()
+
+        assert len(index) == 0
+        assert index.check(sample_address, "", "github") == (False, None, None)
+
+    def test_bans_expire_while_loaded(self, sample_address):
+        ban = Ban(
+            id=1,
+            type="account",
+            address=sample_address.lower(),
+            end_time=timezone.now() + timedelta(days=1),
+        )
+        index = BanIndex([ban], version="v1")
+
+        assert index.check(sample_address, "", "github")[0]
+
+        ban.end_time = timezone.now() - timedelta(seconds=1)
+        index._expiry_heap = [(ban.end_time, ban.id, ban)]
+
+        assert index.check(sample_address, "", "github") == (False, None, None)
+        assert len(index) == 0
+
+    def test_index_is_reused_until_bans_change(self, sample_address):
+        index = get_ban_index()
+        assert get_ban_index() is index
+
+        Ban.objects.create(type="account", address=sample_address)
+
+        new_index = get_ban_index()
+        assert new_index is not index
+        assert new_index.check(sample_address, "", "github")[0]
+
+    def test_deleting_ban_refreshes_index(self, sample_address):
+        ban = Ban.objects.create(type="account", address=sample_address)
+        assert get_ban_index().check(sample_address, "", "github")[0]
+
+        ban.delete()
+
+        assert not get_ban_index().check(sample_address, "", "github")[0]
+
+    def test_version_change_from_other_process_refreshes_index(self, sample_address):
+        index = get_ban_index()
+
+        cache.set(BAN_INDEX_VERSION_CACHE_KEY, "changed-elsewhere", timeout=None)
+
+        assert get_ban_index() is not index
+
+    def test_index_is_reloaded_after_max_age(self, settings):
+        settings.BAN_INDEX_MAX_AGE = 0
+        index = get_ban_index()
+
+        assert get_ban_index() is not index
+
+
+class TestGetBansFallback:
+    def test_get_bans_matches_address_case_insensitively(self, sample_address):
+        Ban.objects.create(type="account", address=sample_address)
+
+        bans = Ban.get_bans(address=sample_address.upper(), hashes=[])
+
+        assert len(bans) == 1
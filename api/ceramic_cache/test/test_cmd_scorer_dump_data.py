@@ -6,6 +6,7 @@ import pytest
 from django.core.management import call_command
 
 from account.models import Community
+from ceramic_cache.models import CeramicCache
 from registry.models import Passport, Score
 from scorer_weighted.models import BinaryWeightedScorer, Scorer
 
@@ -110,3 +111,65 @@ class TestGetStamps:
 
         # We only expect the number of records we generated for the community that we filtered by
         assert len(data) == 5
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_partitioned(mocker, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    CeramicCache.objects.bulk_create(
+        [
+            CeramicCache(
+                address=f"0x{i:040x}",
+                provider=f"provider-{i % 3}",
+                stamp={"credentialSubject": {"provider": f"provider-{i % 3}"}},
+            )
+            for i in range(50)
+        ]
+    )
+
+    uploads = {}
+
+    class MockS3:
+        """Keep the contents of the uploaded files, by key"""
+
+        def upload_file(self, file_name, bucket, key, **kwargs):
+            with open(file_name, "r", encoding="utf-8") as f:
+                uploads[key] = f.read()
+
+    mocker.patch(
+        "ceramic_cache.management.commands.scorer_dump_data.boto3.client",
+        return_value=MockS3(),
+    )
+
+    def dump(**options):
+        uploads.clear()
+        call_command(
+            "scorer_dump_data",
+            config='[{"name":"ceramic_cache.CeramicCache"}]',
+            s3_uri="s3://bucket/dump/",
+            **options,
+        )
+        return dict(uploads)
+
+    sequential = dump()
+    partitioned = dump(partitions=3, batch_size=10)
+
+    manifest = json.loads(partitioned["dump/ceramic_cache_ceramiccache/manifest.json"])
+    assert manifest["model"] == "ceramic_cache.CeramicCache"
+    assert manifest["records"] == 50
+    assert len(manifest["parts"]) == 3
+
+    # The parts hold the same records as the single file, in order
+    lines = []
+    for part in manifest["parts"]:
+        part_lines = partitioned[part["key"]].splitlines()
+        assert len(part_lines) == part["records"]
+        assert all(
+            part["id_from"] <= json.loads(line)["id"] <= part["id_to"]
+            for line in part_lines
+        )
+        lines.extend(part_lines)
+    assert lines == sequential["dump/ceramic_cache_ceramiccache.jsonl"].splitlines()
+
+    summary = json.loads(partitioned["dump/export_summary.json"])
+    assert summary[0]["manifest_key"] == "dump/ceramic_cache_ceramiccache/manifest.json"
@@ -0,0 +1,82 @@
+import json
+from datetime import datetime, timezone
+
+import pyarrow.parquet as pq
+import pytest
+from django.core.management import call_command
+
+from ceramic_cache.models import CeramicCache
+from scorer.export_utils import (
+    export_queryset_to_parquet,
+    get_data_json_as_str,
+    get_pa_schema,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def ceramic_cache_stamps():
+    return CeramicCache.objects.bulk_create(
+        [
+            CeramicCache(
+                address=f"0x{i:040x}",
+                provider=f"provider-{i % 3}",
+                stamp={"credentialSubject": {"provider": f"provider-{i % 3}"}},
+                proof_value=f"proof-{i}",
+                updated_at=datetime(2024, 1, 2, tzinfo=timezone.utc),
+            )
+            for i in range(25)
+        ]
+    )
+
+
+def test_export_queryset_to_parquet(tmp_path, ceramic_cache_stamps):
+    output_file = tmp_path / "ceramic_cache.parquet"
+
+    num_rows = export_queryset_to_parquet(
+        CeramicCache.objects.all(), output_file, chunk_size=10
+    )
+
+    parquet_file = pq.ParquetFile(output_file)
+    assert num_rows == 25
+    assert parquet_file.schema_arrow == get_pa_schema(CeramicCache)
+    # Each chunk is written as one row group
+    assert [
+        parquet_file.metadata.row_group(i).num_rows
+        for i in range(parquet_file.num_row_groups)
+    ] == [10, 10, 5]
+    assert parquet_file.metadata.row_group(0).column(0).compression == "ZSTD"
+
+    # Same records as the paginated export
+    expected = get_data_json_as_str(None, CeramicCache.objects.all(), "id", 100)
+    rows = parquet_file.read().to_pylist()
+    assert [row["id"] for row in rows] == [row["id"] for row in expected]
+    for row, expected_row in zip(rows, expected):
+        assert json.loads(row["stamp"]) == json.loads(expected_row["stamp"])
+        assert row["proof_value"] == expected_row["proof_value"]
+        # Timestamps are exported with millisecond precision
+        created_at = expected_row["created_at"]
+        assert row["created_at"] == created_at.replace(
+            tzinfo=None, microsecond=created_at.microsecond // 1000 * 1000
+        )
+
+
+def test_dump_data_parquet_command(tmp_path, monkeypatch, mocker, ceramic_cache_stamps):
+    monkeypatch.chdir(tmp_path)
+    upload_to_s3 = mocker.patch(
+        "ceramic_cache.management.commands.scorer_dump_data_parquet.upload_to_s3"
+    )
+
+    call_command(
+        "scorer_dump_data_parquet",
+        "--apps=ceramic_cache",
+        "--s3-uri=s3://bucket/folder",
+        "--compression=snappy",
+    )
+
+    table = pq.read_table(tmp_path / "ceramic_cache_ceramiccache.parquet")
+    assert table.num_rows == 25
+    upload_to_s3.assert_any_call(
+        "ceramic_cache_ceramiccache.parquet", "folder", "bucket", None
+    )
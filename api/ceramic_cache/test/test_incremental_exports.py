@@ -0,0 +1,145 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+from django.core.management import call_command
+
+from ceramic_cache.incremental_exports import IncrementalExport
+from ceramic_cache.models import CeramicCache, StampExports
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def no_export_lag(settings):
+    settings.INCREMENTAL_EXPORT_LAG = 0
+
+
+def create_stamp(provider):
+    return CeramicCache.objects.create(
+        address="0x0000000000000000000000000000000000000001",
+        provider=provider,
+        stamp={"credentialSubject": {"provider": provider}},
+    )
+
+
+def test_first_export_is_a_snapshot():
+    create_stamp("provider-1")
+    deleted = create_stamp("provider-2")
+    CeramicCache.objects.filter(id=deleted.id).update(
+        deleted_at=datetime.now(timezone.utc), updated_at=datetime.now(timezone.utc)
+    )
+
+    export = IncrementalExport("test", CeramicCache)
+
+    assert export.is_snapshot
+    assert export.since is None
+    # Snapshots are compacted, the deleted stamps are left out
+    assert [s.provider for s in export.filter(CeramicCache.objects.all())] == [
+        "provider-1"
+    ]
+
+
+def test_deltas_export_changes_since_the_watermark():
+    old = create_stamp("provider-1")
+    IncrementalExport("test", CeramicCache).record(1)
+
+    new = create_stamp("provider-2")
+    CeramicCache.objects.filter(id=old.id).update(
+        deleted_at=datetime.now(timezone.utc), updated_at=datetime.now(timezone.utc)
+    )
+
+    export = IncrementalExport("test", CeramicCache)
+
+    assert not export.is_snapshot
+    assert export.suffix.startswith("delta_")
+    # Deltas include the deleted stamps
+    assert set(export.filter(CeramicCache.objects.all())) == {old, new}
+
+
+def test_snapshot_every():
+    for _ in range(3):
+        export = IncrementalExport("test", CeramicCache, snapshot_every=2)
+        export.record(0)
+
+    exports = StampExports.objects.filter(export_name="test").order_by("last_export_ts")
+    assert [e.is_snapshot for e in exports] == [True, False, False]
+    assert IncrementalExport("test", CeramicCache, snapshot_every=2).is_snapshot
+
+
+def test_exports_are_independent():
+    IncrementalExport("test", CeramicCache).record(0)
+
+    assert IncrementalExport("other", CeramicCache).is_snapshot
+
+
+def test_dump_stamp_data_records_the_watermark_after_upload(
+    mocker, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    s3 = mocker.patch("ceramic_cache.management.commands.dump_stamp_data.s3")
+    uploads = []
+
+    def upload_file(file_name, *args):
+        with open(file_name, encoding="utf-8") as f:
+            uploads.append([json.loads(line) for line in f])
+
+    s3.upload_file.side_effect = upload_file
+    create_stamp("provider-1")
+    call_command("dump_stamp_data", database="default")
+
+    create_stamp("provider-2")
+    s3.upload_file.side_effect = Exception("upload failed")
+    call_command("dump_stamp_data", database="default")
+
+    # The failed upload did not move the watermark, the next delta includes
+    # the changes it missed
+    assert StampExports.objects.filter(export_name="stamps").count() == 1
+    s3.upload_file.side_effect = upload_file
+    call_command("dump_stamp_data", database="default")
+
+    assert [
+        [record["stamp"]["credentialSubject"]["provider"] for record in upload]
+        for upload in uploads
+    ] == [["provider-1"], ["provider-2"]]
+    assert StampExports.objects.filter(export_name="stamps").count() == 2
+
+
+def test_scorer_dump_data_incremental(mocker, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    uploads = {}
+
+    class MockS3:
+        def upload_file(self, file_name, bucket, key, **kwargs):
+            with open(file_name, encoding="utf-8") as f:
+                uploads[key] = f.read().splitlines()
+
+    mocker.patch(
+        "ceramic_cache.management.commands.scorer_dump_data.boto3.client",
+        return_value=MockS3(),
+    )
+
+    def dump():
+        uploads.clear()
+        call_command(
+            "scorer_dump_data",
+            config='[{"name":"ceramic_cache.CeramicCache"}]',
+            s3_uri="s3://bucket/dump/",
+            incremental=True,
+        )
+        return {
+            key: lines for key, lines in uploads.items() if "export_summary" not in key
+        }
+
+    create_stamp("provider-1")
+    ((snapshot_key, snapshot),) = dump().items()
+    create_stamp("provider-2")
+    ((delta_key, delta),) = dump().items()
+
+    assert "_snapshot_" in snapshot_key
+    assert "_delta_" in delta_key
+    assert [json.loads(line)["provider"] for line in snapshot] == ["provider-1"]
+    assert [json.loads(line)["provider"] for line in delta] == ["provider-2"]
+    assert list(
+        StampExports.objects.order_by("last_export_ts").values_list("s3_key", flat=True)
+    ) == [snapshot_key, delta_key]
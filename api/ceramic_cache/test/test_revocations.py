@@ -0,0 +1,119 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from ceramic_cache.models import Ban, CeramicCache, Revocation, RevocationList
+from ceramic_cache.revocations import (
+    insert_revocations,
+    revoke_proof_values,
+    revoke_stamps,
+)
+
+pytestmark = pytest.mark.django_db
+
+addresses = [f"0x{i:040x}" for i in range(1, 4)]
+
+
+@pytest.fixture
+def stamps():
+    return [
+        CeramicCache.objects.create(
+            address=address,
+            provider=provider,
+            proof_value=f"proof-{address}-{provider}",
+            stamp={"credentialSubject": {"provider": provider}},
+        )
+        for address in addresses
+        for provider in ["github", "twitter"]
+    ]
+
+
+def test_revoke_stamps_in_batches(stamps):
+    result = revoke_stamps(CeramicCache.objects.all(), batch_size=4)
+
+    assert result.revoked == 6
+    assert result.addresses == set(addresses)
+    assert Revocation.objects.count() == 6
+
+
+def test_revoke_stamps_skips_revoked_and_deleted(stamps):
+    Revocation.objects.create(
+        proof_value=stamps[0].proof_value, ceramic_cache=stamps[0]
+    )
+    stamps[1].deleted_at = timezone.now()
+    stamps[1].save()
+
+    result = revoke_stamps(CeramicCache.objects.filter(address=addresses[0]))
+
+    assert result.revoked == 0
+    assert result.addresses == set()
+
+
+def test_only_inserted_revocations_are_counted(stamps):
+    # Revoked by someone else after the candidates were read
+    Revocation.objects.create(
+        proof_value=stamps[0].proof_value, ceramic_cache=stamps[0]
+    )
+
+    revoked_ids = insert_revocations(
+        [(stamp.id, stamp.proof_value) for stamp in stamps[:2]]
+    )
+
+    assert revoked_ids == {stamps[1].id}
+    assert Revocation.objects.count() == 2
+
+
+def test_ban_revoke_matching_credentials_reports_result(stamps):
+    ban = Ban.objects.create(
+        type="single_stamp", address=addresses[1], provider="github"
+    )
+
+    result = ban.revoke_matching_credentials()
+
+    assert result.revoked == 1
+    assert result.addresses == {addresses[1]}
+    ban.refresh_from_db()
+    assert ban.last_run_revoke_matching is not None
+
+
+def test_revoke_proof_values_includes_deleted_stamps(stamps):
+    revocation_list = RevocationList.objects.create(name="test", csv_file="list.csv")
+    stamps[0].deleted_at = timezone.now()
+    stamps[0].save()
+
+    result = revoke_proof_values(
+        [stamps[0].proof_value, stamps[2].proof_value, "unknown"],
+        revocation_list=revocation_list,
+        batch_size=1,
+    )
+
+    assert result.revoked == 2
+    assert set(
+        Revocation.objects.filter(revocation_list=revocation_list).values_list(
+            "ceramic_cache_id", flat=True
+        )
+    ) == {stamps[0].id, stamps[2].id}
+
+
+def test_command_processes_pending_bans(stamps, tmp_path):
+    processed_ban = Ban.objects.create(
+        type="account", address=addresses[0], last_run_revoke_matching=timezone.now()
+    )
+    pending_ban = Ban.objects.create(type="account", address=addresses[1])
+    addresses_file = tmp_path / "addresses.txt"
+    out = StringIO()
+
+    call_command(
+        "revoke_matching_credentials",
+        "--pending",
+        "--addresses-file",
+        str(addresses_file),
+        stdout=out,
+    )
+
+    assert f"[1/1] ban #{pending_ban.id}: revoked 2 stamp(s)" in out.getvalue()
+    assert "Revoked 2 stamp(s), 1 passport(s) affected" in out.getvalue()
+    assert addresses_file.read_text() == f"{addresses[1]}\n"
+    assert not Revocation.objects.filter(ceramic_cache__address=processed_ban.address)
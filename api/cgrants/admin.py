@@ -4,6 +4,7 @@ from scorer.scorer_admin import ScorerModelAdmin
 
 from .models import (
     Contribution,
+    ContributorStatisticsSummary,
     Grant,
     GrantCLR,
     GrantCLRCalculation,
@@ -82,6 +83,17 @@ class RoundMappingAdmin(ScorerModelAdmin):
     search_fields = ("round_number", "round_eth_address")
 
 
+@admin.register(ContributorStatisticsSummary)
+class ContributorStatisticsSummaryAdmin(ScorerModelAdmin):
+    list_display = (
+        "address",
+        "num_grants_contribute_to",
+        "total_contribution_amount",
+        "updated_at",
+    )
+    search_fields = ("address",)
+
+
 @admin.register(GrantContributionIndex)
 class GrantContributionIndexAdmin(ScorerModelAdmin):
     list_display = ("profile", "contribution", "grant", "round_num", "amount")
@@ -6,7 +6,6 @@ This file re-iplements the API endpoints from the original cgrants API: https://
 
 from enum import Enum
 
-from django.db.models import Count, Q, Sum
 from django.http import JsonResponse
 from ninja_schema import Schema
 from pydantic import Field
@@ -15,12 +14,11 @@ import api_logging as logging
 from registry.api.v1 import is_valid_address
 from registry.exceptions import InvalidAddressException
 
-from .models import (
-    GrantContributionIndex,
-    ProtocolContributions,
-    RoundMapping,
-    SquelchedAccounts,
+from .contributor_statistics import (
+    compute_cgrants_statistics,
+    compute_protocol_statistics,
 )
+from .models import ContributorStatisticsSummary
 
 logger = logging.getLogger(__name__)
 
@@ -45,65 +43,13 @@ class IdentifierType(Enum):
 
 
 def _get_contributor_statistics_for_cgrants(address: str) -> dict:
-    identifier_query = Q(contributor_address=address)
-
-    contributions = GrantContributionIndex.objects.filter(
-        identifier_query, contribution__success=True
-    )
-
-    if contributions.count() == 0:
-        return {
-            "num_grants_contribute_to": 0,
-            "total_contribution_amount": 0,
-        }
-
-    # Get number of grants the user contributed to
-
-    num_grants_contribute_to = (
-        contributions.order_by("grant_id").values("grant_id").distinct().count()
-    )
-
-    # Get the total contribution amount
-    total_contribution_amount = contributions.aggregate(
-        total_contribution_amount=Sum("amount")
-    )["total_contribution_amount"]
-
-    if total_contribution_amount is None:
-        total_contribution_amount = 0
-
-    return {
-        "num_grants_contribute_to": num_grants_contribute_to,
-        "total_contribution_amount": total_contribution_amount,
-    }
+    address = address.lower()
+    return compute_cgrants_statistics([address])[address]
 
 
 def _get_contributor_statistics_for_protocol(address: str) -> dict:
-    # Get the round numbers where the address is squelched
-    squelched_rounds = SquelchedAccounts.objects.filter(address=address).values_list(
-        "round_number", flat=True
-    )
-
-    # Get round_eth_address for squelched round numbers
-    squelched_round_ids = RoundMapping.objects.filter(
-        round_number__in=squelched_rounds
-    ).values_list("round_eth_address", flat=True)
-
-    # Get contributions excluding squelched rounds
-    protocol_filter = ProtocolContributions.objects.filter(
-        contributor=address, amount__gte=0.95
-    ).exclude(round__in=squelched_round_ids)
-
-    # Calculate total amount and number of projects
-    total_amount_usd = protocol_filter.aggregate(Sum("amount"))["amount__sum"] or 0
-    num_projects = (
-        protocol_filter.aggregate(Count("project", distinct=True))["project__count"]
-        or 0
-    )
-
-    return {
-        "num_grants_contribute_to": num_projects,
-        "total_contribution_amount": round(total_amount_usd, 3),
-    }
+    address = address.lower()
+    return compute_protocol_statistics([address])[address]
 
 
 def handle_get_contributor_statistics(address: str):
@@ -112,20 +58,17 @@ def handle_get_contributor_statistics(address: str):
 
     address = address.lower()
 
-    cgrants_contributions = _get_contributor_statistics_for_cgrants(address)
-    protocol_contributions = _get_contributor_statistics_for_protocol(address)
-
-    combined_contributions = {
-        key: float(
-            round(
-                (
-                    protocol_contributions.get(key, 0)
-                    + cgrants_contributions.get(key, 0)
-                ),
-                2,
-            )
-        )
-        for key in set(protocol_contributions) | set(cgrants_contributions)
-    }
-
-    return JsonResponse(combined_contributions)
+    # Precomputed by the import commands, addresses without contributions have
+    # no statistics
+    statistics = ContributorStatisticsSummary.objects.filter(address=address).first()
+
+    return JsonResponse(
+        {
+            "num_grants_contribute_to": float(
+                statistics.num_grants_contribute_to if statistics else 0
+            ),
+            "total_contribution_amount": float(
+                statistics.total_contribution_amount if statistics else 0
+            ),
+        }
+    )
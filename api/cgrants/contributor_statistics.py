@@ -0,0 +1,164 @@
+"""
+Set based computation of the contributor statistics, for batches of addresses.
+
+The statistics only change when the cgrants import commands run, so they are
+precomputed into ContributorStatisticsSummary, and the contributor statistics
+API is a single lookup by address.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List
+
+from django.db.models import Count, Sum
+
+from registry.utils import iterate_distinct_values, iterate_merged_batches
+
+from .models import (
+    ContributorStatisticsSummary,
+    GrantContributionIndex,
+    ProtocolContributions,
+    RoundMapping,
+    SquelchedAccounts,
+)
+
+REFRESH_BATCH_SIZE = 1000
+
+
+def compute_cgrants_statistics(addresses: List[str]) -> Dict[str, dict]:
+    statistics = {
+        address: {"num_grants_contribute_to": 0, "total_contribution_amount": 0}
+        for address in addresses
+    }
+
+    for row in (
+        GrantContributionIndex.objects.filter(
+            contributor_address__in=addresses, contribution__success=True
+        )
+        .values("contributor_address")
+        .annotate(
+            num_grants_contribute_to=Count("grant_id", distinct=True),
+            total_contribution_amount=Sum("amount"),
+        )
+        .order_by()
+    ):
+        statistics[row["contributor_address"]] = {
+            "num_grants_contribute_to": row["num_grants_contribute_to"],
+            "total_contribution_amount": row["total_contribution_amount"] or 0,
+        }
+
+    return statistics
+
+
+def compute_protocol_statistics(addresses: List[str]) -> Dict[str, dict]:
+    # Get the round numbers where the addresses are squelched
+    squelched_round_numbers = defaultdict(set)
+    for address, round_number in SquelchedAccounts.objects.filter(
+        address__in=addresses
+    ).values_list("address", "round_number"):
+        squelched_round_numbers[address].add(round_number)
+
+    # Get round_eth_address for squelched round numbers
+    round_addresses = defaultdict(set)
+    for round_number, round_eth_address in RoundMapping.objects.filter(
+        round_number__in=set().union(*squelched_round_numbers.values())
+    ).values_list("round_number", "round_eth_address"):
+        round_addresses[round_number].add(round_eth_address)
+
+    squelched_rounds = {
+        address: set().union(*(round_addresses[n] for n in round_numbers))
+        for address, round_numbers in squelched_round_numbers.items()
+    }
+
+    # Sum the contributions excluding squelched rounds
+    total_amounts = defaultdict(Decimal)
+    projects = defaultdict(set)
+    for (
+        contributor,
+        round_address,
+        project,
+        amount,
+    ) in ProtocolContributions.objects.filter(
+        contributor__in=addresses, amount__gte=0.95
+    ).values_list("contributor", "round", "project", "amount"):
+        if round_address in squelched_rounds.get(contributor, ()):
+            continue
+        total_amounts[contributor] += amount
+        projects[contributor].add(project)
+
+    return {
+        address: {
+            "num_grants_contribute_to": len(projects[address]),
+            "total_contribution_amount": round(total_amounts[address], 3),
+        }
+        for address in addresses
+    }
+
+
+def compute_contributor_statistics(addresses: List[str]) -> Dict[str, dict]:
+    cgrants_statistics = compute_cgrants_statistics(addresses)
+    protocol_statistics = compute_protocol_statistics(addresses)
+
+    return {
+        address: {
+            key: round(
+                protocol_statistics[address][key] + cgrants_statistics[address][key],
+                2,
+            )
+            for key in ["num_grants_contribute_to", "total_contribution_amount"]
+        }
+        for address in addresses
+    }
+
+
+def refresh_contributor_statistics(addresses: Iterable[str]):
+    """
+    Recompute and store the contributor statistics of the addresses, in batches.
+    Addresses without contributions are removed.
+    """
+    addresses = sorted({address.lower() for address in addresses if address})
+
+    for i in range(0, len(addresses), REFRESH_BATCH_SIZE):
+        batch = addresses[i : i + REFRESH_BATCH_SIZE]
+        statistics = compute_contributor_statistics(batch)
+
+        ContributorStatisticsSummary.objects.bulk_create(
+            [
+                ContributorStatisticsSummary(address=address, **address_statistics)
+                for address, address_statistics in statistics.items()
+                if address_statistics["num_grants_contribute_to"]
+            ],
+            update_conflicts=True,
+            unique_fields=["address"],
+            update_fields=[
+                "num_grants_contribute_to",
+                "total_contribution_amount",
+                "updated_at",
+            ],
+        )
+        ContributorStatisticsSummary.objects.filter(
+            address__in=[
+                address
+                for address, address_statistics in statistics.items()
+                if not address_statistics["num_grants_contribute_to"]
+            ]
+        ).delete()
+
+
+def iterate_contributor_addresses(batch_size: int) -> Iterator[List[str]]:
+    """
+    Iterate over the addresses with cgrants or protocol contributions, in
+    batches ordered by address. The addresses of the two sources are paginated
+    separately and merged.
+    """
+    return iterate_merged_batches(
+        [
+            iterate_distinct_values(
+                GrantContributionIndex.objects.all(), "contributor_address", batch_size
+            ),
+            iterate_distinct_values(
+                ProtocolContributions.objects.all(), "contributor", batch_size
+            ),
+        ],
+        batch_size,
+    )
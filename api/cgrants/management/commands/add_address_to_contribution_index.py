@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from tqdm import tqdm
 
+from cgrants.contributor_statistics import refresh_contributor_statistics
 from cgrants.models import Contribution, GrantContributionIndex, Profile
 
 
@@ -36,6 +37,9 @@ class Command(BaseCommand):
                     GrantContributionIndex.objects.bulk_update(
                         contributions, ["contributor_address"]
                     )
+                    refresh_contributor_statistics(
+                        c.contributor_address for c in contributions
+                    )
                 else:
                     break  # No more data to process
 
@@ -1,10 +1,10 @@
 import csv
-import json
 
-from django.core.management.base import BaseCommand
-from tqdm import tqdm
-
-from cgrants.management.commands.utils import batch_iterator, stream_object_from_s3_uri
+from cgrants.contributor_statistics import refresh_contributor_statistics
+from cgrants.management.commands.utils import (
+    JsonlImportCommand,
+    stream_object_from_s3_uri,
+)
 from cgrants.models import RoundMapping, SquelchedAccounts
 
 
@@ -17,61 +17,18 @@ def get_squelch_data_from_json(json_data, round_number):
     )
 
 
-class Command(BaseCommand):
+class Command(JsonlImportCommand):
     help = (
         "This command will import votes and contribution amounts for the Allo protocol."
     )
 
-    def import_squelched_users(self, squelched_users_uri, round_number):
-        num_errors = 0
-        stream = stream_object_from_s3_uri(squelched_users_uri, self.stdout, self.style)
-        if stream:
-            self.stdout.write(self.style.SUCCESS("Got stream, processing JSONL"))
-
-            total_size = None
-
-            # Process each line of the JSONL file with a progress bar
-            with tqdm(
-                total=total_size, unit="B", unit_scale=True, desc="Processing JSONL"
-            ) as pbar:
-                self.stdout.write("reading squelched users lines ...")
-                chunk_size = 1000
-
-                for dataset in batch_iterator(stream.iter_lines(), chunk_size):
-                    squelched_accounts = []
-                    for line in dataset:
-                        try:
-                            json_data = json.loads(line)
-                            squelched_accounts.append(
-                                get_squelch_data_from_json(json_data, round_number)
-                            )
-                        except json.JSONDecodeError as e:
-                            self.stdout.write(
-                                self.style.ERROR(f"Error parsing JSON line: '{line}'")
-                            )
-                            self.stdout.write(self.style.ERROR(f"Error: '{e}'"))
-                            num_errors = num_errors + 1
-
-                        # Update the progress bar with the number of bytes read
-                        pbar.update(len(line))
-
-                    SquelchedAccounts.objects.bulk_create(
-                        squelched_accounts,
-                        ignore_conflicts=True,
-                    )
+    model = SquelchedAccounts
 
-        if num_errors == 0:
-            self.stdout.write(
-                self.style.SUCCESS(
-                    "JSONL loading status: All records loaded succefully!"
-                )
-            )
-        else:
-            self.stdout.write(
-                self.style.ERROR(
-                    f"JSONL loading status: {num_errors} records failed to parse"
-                )
-            )
+    def get_instance(self, record):
+        return get_squelch_data_from_json(record, self.round_number)
+
+    def after_batch(self, instances):
+        refresh_contributor_statistics(a.address for a in instances)
 
     def import_round_data(self, round_data_uri):
         num_errors = 0
@@ -79,11 +36,21 @@ class Command(BaseCommand):
         if stream:
             data = stream.read().decode("utf-8").splitlines()
             csvreader = csv.DictReader(data)
+            round_numbers = set()
             for row in csvreader:
                 RoundMapping.objects.update_or_create(
                     round_number=row["program"],
                     round_eth_address=row["round_id"],
                 )
+                round_numbers.add(row["program"])
+
+            # The squelched rounds of the accounts squelched in these rounds
+            # may have changed
+            refresh_contributor_statistics(
+                SquelchedAccounts.objects.filter(
+                    round_number__in=round_numbers
+                ).values_list("address", flat=True)
+            )
 
         else:
             self.stdout.write(
@@ -124,6 +91,8 @@ class Command(BaseCommand):
             help="""Round number in which users were squelched""",
         )
 
+        self.add_import_arguments(parser)
+
     def handle(self, *args, **options):
         squelched_users_uri = options["squelched_users_input"]
         round_number = options["round_number"]
@@ -145,4 +114,7 @@ class Command(BaseCommand):
             self.stdout.write(
                 f'Squelched User Input file "{squelched_users_uri}" and round number "{round_number}"'
             )
-            self.import_squelched_users(squelched_users_uri, round_number)
+            self.round_number = round_number
+            self.import_jsonl(
+                squelched_users_uri, options["batch_size"], options["start_offset"]
+            )
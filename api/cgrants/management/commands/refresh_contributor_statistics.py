@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from tqdm import tqdm
+
+from cgrants.contributor_statistics import (
+    iterate_contributor_addresses,
+    refresh_contributor_statistics,
+)
+from cgrants.models import ContributorStatisticsSummary
+
+
+class Command(BaseCommand):
+    help = "This command will refresh the precomputed contributor statistics of all contributors"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of addresses to refresh in each batch (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        started_at = timezone.now()
+
+        with tqdm(
+            unit="addresses", unit_scale=True, desc="Refreshing contributor statistics"
+        ) as progress_bar:
+            for addresses in iterate_contributor_addresses(options["batch_size"]):
+                refresh_contributor_statistics(addresses)
+                progress_bar.update(len(addresses))
+
+        # Addresses that no longer have contributions
+        num_removed, _ = ContributorStatisticsSummary.objects.filter(
+            updated_at__lt=started_at
+        ).delete()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Contributor statistics refreshed, {num_removed} outdated removed"
+            )
+        )
@@ -1,8 +1,11 @@
 import itertools
+import json
+import time
 from urllib.parse import urlparse
 
 import boto3
 from django.conf import settings
+from django.core.management.base import BaseCommand
 
 
 def iterate_array_in_chunks(arr, chunk_size):
@@ -19,7 +22,7 @@ def batch_iterator(iterable, batch_size):
         yield batch
 
 
-def stream_object_from_s3_uri(s3_uri, stdout, style):
+def stream_object_from_s3_uri(s3_uri, stdout, style, start_offset=0):
     # Parse the S3 URI to get the bucket name, folder, and file name
     parsed_uri = urlparse(s3_uri)
     bucket_name = parsed_uri.netloc
@@ -30,8 +33,135 @@ def stream_object_from_s3_uri(s3_uri, stdout, style):
     s3 = boto3.client("s3")
 
     try:
-        response = s3.get_object(Bucket=bucket_name, Key=f"{folder_name}/{file_name}")
+        kwargs = {"Range": f"bytes={start_offset}-"} if start_offset else {}
+        response = s3.get_object(
+            Bucket=bucket_name, Key=f"{folder_name}/{file_name}", **kwargs
+        )
         return response["Body"]
     except Exception as e:
         stdout.write(style.ERROR(f"Error reading file from S3: {e}"))
         return None
+
+
+def _iterate_file_lines(path, start_offset):
+    with open(path, "rb") as f:
+        f.seek(start_offset)
+        yield from f
+
+
+def iterate_jsonl_input(uri, stdout, style, start_offset=0):
+    """
+    Return an iterator over the lines (bytes, including the line endings) of the
+    input `uri`, either an S3 uri or a local file, starting at the byte offset
+    `start_offset`. Returns None if the S3 object cannot be read.
+    """
+    if uri.startswith("s3://"):
+        stream = stream_object_from_s3_uri(uri, stdout, style, start_offset)
+        return stream.iter_lines(keepends=True) if stream else None
+    return _iterate_file_lines(uri, start_offset)
+
+
+class JsonlImportCommand(BaseCommand):
+    """
+    Base class of the commands importing a JSONL input (1 JSON record per line)
+    into `model`. Subclasses implement `get_instance` to build the model
+    instance of a record.
+
+    The input is streamed and the records are inserted in batches, skipping the
+    records that already exist (same primary key or unique field). After each
+    batch the command reports the byte offset of the next line of the input and
+    the import rate: an interrupted import can be resumed from the last
+    reported offset with `--start-offset`.
+    """
+
+    model = None
+    batch_size = 1000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--in",
+            required=True,
+            help="""JSONL input file, either a local path or an S3 uri, for example
+            's3://your_bucket_name/your_folder_name/your_file_name.jsonl'""",
+        )
+        self.add_import_arguments(parser)
+
+    def add_import_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=self.batch_size,
+            help="Number of records inserted at once",
+        )
+        parser.add_argument(
+            "--start-offset",
+            type=int,
+            default=0,
+            help="Byte offset of the input to start from, to resume an import",
+        )
+
+    def get_instance(self, record):
+        """
+        Return the model instance to insert for `record`, or None to skip it
+        """
+        raise NotImplementedError
+
+    def after_batch(self, instances):
+        """
+        Called after each batch of `instances` is inserted
+        """
+
+    def handle(self, *args, **options):
+        self.import_jsonl(options["in"], options["batch_size"], options["start_offset"])
+
+    def import_jsonl(self, uri, batch_size, start_offset=0):
+        self.stdout.write(f'Input file "{uri}"')
+        lines = iterate_jsonl_input(uri, self.stdout, self.style, start_offset)
+        if lines is None:
+            self.stdout.write(self.style.ERROR(f"Empty file read from S3: {uri}"))
+            return
+
+        offset = start_offset
+        num_records = 0
+        num_errors = 0
+        started_at = time.monotonic()
+        for dataset in batch_iterator(lines, batch_size):
+            instances = []
+            for line in dataset:
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    instance = self.get_instance(json.loads(line))
+                except json.JSONDecodeError as e:
+                    self.stdout.write(
+                        self.style.ERROR(f"Error parsing JSON line: '{line}'")
+                    )
+                    self.stdout.write(self.style.ERROR(f"Error: '{e}'"))
+                    num_errors = num_errors + 1
+                    continue
+                if instance is not None:
+                    instances.append(instance)
+
+            self.model.objects.bulk_create(instances, ignore_conflicts=True)
+            self.after_batch(instances)
+
+            num_records += len(instances)
+            rate = num_records / max(time.monotonic() - started_at, 1e-6)
+            self.stdout.write(
+                f"Processed {num_records} records ({rate:.0f} records/s), "
+                f"next offset: {offset}"
+            )
+
+        if num_errors == 0:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "JSONL loading status: All records loaded successfully!"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"JSONL loading status: {num_errors} records failed to parse"
+                )
+            )
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.6 on 2026-10-19 13:25
+
+from django.db import migrations, models
+
+import account.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cgrants", "0012_alter_grantcontributionindex_contributor_address"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContributorStatisticsSummary",
+            fields=[
+                (
+                    "address",
+                    account.models.EthAddressField(
+                        max_length=100, primary_key=True, serialize=False
+                    ),
+                ),
+                ("num_grants_contribute_to", models.IntegerField(default=0)),
+                (
+                    "total_contribution_amount",
+                    models.DecimalField(decimal_places=18, default=0, max_digits=64),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Contributor statistics summaries",
+            },
+        ),
+    ]
@@ -294,3 +294,22 @@ class RoundMapping(models.Model):
 
     class Meta:
         unique_together = ("round_number", "round_eth_address")
+
+
+class ContributorStatisticsSummary(models.Model):
+    """
+    Precomputed contributor statistics of an address, combining the cgrants and
+    protocol contributions (see `cgrants.contributor_statistics`). Refreshed by
+    the import commands for the addresses they import, and in bulk by the
+    `refresh_contributor_statistics` command.
+    """
+
+    address = EthAddressField(primary_key=True, max_length=100)
+    num_grants_contribute_to = models.IntegerField(default=0)
+    total_contribution_amount = models.DecimalField(
+        default=0, decimal_places=18, max_digits=64
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Contributor statistics summaries"
@@ -2,6 +2,7 @@
 
 import pytest
 from django.conf import settings
+from django.core.management import call_command
 from django.test import Client
 from django.urls import reverse
 from numpy import add
@@ -41,6 +42,8 @@ class TestCombinedContributionsApi:
             contrib.amount = 5
             contrib.save()
 
+        call_command("refresh_contributor_statistics")
+
         response = client.get(
             reverse("internal:cgrants_contributor_statistics"),
             {"address": scorer_account.address},
@@ -100,6 +103,8 @@ class TestCombinedContributionsApi:
             contrib.amount = 0.5
             contrib.save()
 
+        call_command("refresh_contributor_statistics")
+
         response = client.get(
             reverse("internal:cgrants_contributor_statistics"),
             {"address": scorer_account.address},
@@ -113,6 +118,8 @@ class TestCombinedContributionsApi:
         }
 
     def test_only_protocol_contributions(self, protocol_contributions, scorer_account):
+        call_command("refresh_contributor_statistics")
+
         response = client.get(
             reverse("internal:cgrants_contributor_statistics"),
             {"address": scorer_account.address},
@@ -134,6 +141,8 @@ class TestCombinedContributionsApi:
             ext_id=scorer_account.address,
         )
 
+        call_command("refresh_contributor_statistics")
+
         response = client.get(
             reverse("internal:cgrants_contributor_statistics"),
             {"address": scorer_account.address},
@@ -0,0 +1,162 @@
+"""Test file for the precomputed contributor statistics"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+
+from cgrants.api import (
+    _get_contributor_statistics_for_cgrants,
+    _get_contributor_statistics_for_protocol,
+)
+from cgrants.contributor_statistics import iterate_contributor_addresses
+from cgrants.models import (
+    ContributorStatisticsSummary,
+    Grant,
+    GrantContributionIndex,
+    Profile,
+    ProtocolContributions,
+)
+from cgrants.test.conftest import (
+    generate_bulk_cgrant_data,
+    grant_contribution_indices_no_address,
+)
+
+pytestmark = pytest.mark.django_db
+
+client = Client()
+headers = {"HTTP_AUTHORIZATION": settings.CGRANTS_API_TOKEN}
+
+address = "0x9965507d1a55bcc2695c58ba16fb37d819b0a4dc"
+
+
+def get_statistics(address):
+    response = client.get(
+        reverse("internal:cgrants_contributor_statistics"),
+        {"address": address},
+        **headers,
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_statistics_match_the_per_address_computation(
+    generate_bulk_cgrant_data, grant_contribution_indices_no_address
+):
+    # Refreshes the statistics of the addresses it sets
+    call_command("add_address_to_contribution_index")
+
+    addresses = set(
+        GrantContributionIndex.objects.values_list("contributor_address", flat=True)
+    )
+    summaries = {s.address: s for s in ContributorStatisticsSummary.objects.all()}
+    assert summaries
+    for contributor in addresses:
+        cgrants = _get_contributor_statistics_for_cgrants(contributor)
+        summary = summaries.get(contributor)
+        if cgrants["num_grants_contribute_to"]:
+            assert (
+                summary.num_grants_contribute_to,
+                summary.total_contribution_amount,
+            ) == (
+                cgrants["num_grants_contribute_to"],
+                round(cgrants["total_contribution_amount"], 2),
+            )
+        else:
+            assert summary is None
+
+
+def test_statistics_are_a_single_lookup(django_assert_num_queries):
+    ProtocolContributions.objects.create(
+        contributor=address, project="0xprj", round="0xround", amount=2, ext_id="0x1"
+    )
+    call_command("refresh_contributor_statistics")
+
+    with django_assert_num_queries(1):
+        assert get_statistics(address) == {
+            "num_grants_contribute_to": 1.0,
+            "total_contribution_amount": 2.0,
+        }
+
+
+def test_refresh_removes_addresses_without_contributions():
+    contribution = ProtocolContributions.objects.create(
+        contributor=address, project="0xprj", round="0xround", amount=2, ext_id="0x1"
+    )
+    call_command("refresh_contributor_statistics", batch_size=1)
+
+    contribution.delete()
+    call_command("refresh_contributor_statistics")
+
+    assert not ContributorStatisticsSummary.objects.exists()
+    assert get_statistics(address) == {
+        "num_grants_contribute_to": 0.0,
+        "total_contribution_amount": 0.0,
+    }
+
+
+def test_iterate_contributor_addresses():
+    addresses = [f"0x{i:040x}" for i in range(5)]
+    for i, contributor in enumerate(addresses[:4]):
+        ProtocolContributions.objects.create(
+            contributor=contributor,
+            project="0xprj",
+            round="0xround",
+            amount=2,
+            ext_id=f"0x{i}",
+        )
+        ProtocolContributions.objects.create(
+            contributor=contributor,
+            project="0xprj2",
+            round="0xround",
+            amount=2,
+            ext_id=f"0x{i}_2",
+        )
+    profile = Profile.objects.create(handle="contributor", github_id=1)
+    grant = Grant.objects.create(admin_profile=profile, hidden=False, active=True)
+    for contributor in addresses[2:]:
+        GrantContributionIndex.objects.create(
+            profile=profile, grant=grant, amount=1, contributor_address=contributor
+        )
+
+    assert list(iterate_contributor_addresses(2)) == [
+        addresses[:2],
+        addresses[2:4],
+        addresses[4:],
+    ]
+
+
+def test_import_allo_votes_refreshes_the_contributors(mocker):
+    votes = [
+        {
+            "id": f"0xvote_{i}",
+            "voter": address,
+            "amountUSD": 1.5,
+            "projectId": f"0xprj_{i}",
+            "roundId": "0xround",
+        }
+        for i in range(3)
+    ]
+    stream = MagicMock()
+    stream.iter_lines.return_value = [
+        f"{json.dumps(vote)}\n".encode() for vote in votes
+    ]
+    mocker.patch(
+        "cgrants.management.commands.utils.stream_object_from_s3_uri",
+        return_value=stream,
+    )
+
+    call_command("import_allo_votes", "--in", "s3://bucket/votes.jsonl")
+
+    assert get_statistics(address) == {
+        "num_grants_contribute_to": 3.0,
+        "total_contribution_amount": 4.5,
+    }
+    assert _get_contributor_statistics_for_protocol(address) == {
+        "num_grants_contribute_to": 3,
+        "total_contribution_amount": 4.5,
+    }
@@ -0,0 +1,78 @@
+"""Test file for the cgrants JSONL import commands"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from django.core.management import call_command
+
+from cgrants.models import Profile, ProtocolContributions
+
+pytestmark = pytest.mark.django_db
+
+
+def profile_record(pk):
+    return {"pk": pk, "fields": {"handle": f"handle_{pk}"}}
+
+
+@pytest.fixture
+def profiles_file(tmp_path):
+    path = tmp_path / "profiles.jsonl"
+    path.write_text("".join(f"{json.dumps(profile_record(pk))}\n" for pk in (1, 2, 3)))
+    return path
+
+
+def test_existing_records_are_skipped(profiles_file):
+    Profile.objects.create(id=2, handle="existing")
+
+    call_command("import_profile", "--in", str(profiles_file), "--batch-size", "2")
+
+    assert dict(Profile.objects.values_list("id", "handle")) == {
+        1: "handle_1",
+        2: "existing",
+        3: "handle_3",
+    }
+
+
+def test_import_resumes_from_the_reported_offset(profiles_file, capsys):
+    call_command("import_profile", "--in", str(profiles_file), "--batch-size", "1")
+    first_offset = capsys.readouterr().out.split("next offset: ")[1].split()[0]
+    Profile.objects.all().delete()
+
+    call_command(
+        "import_profile", "--in", str(profiles_file), "--start-offset", first_offset
+    )
+
+    assert sorted(Profile.objects.values_list("id", flat=True)) == [2, 3]
+
+
+def test_import_from_s3(mocker):
+    votes = [
+        {
+            "id": f"0xvote_{i}",
+            "voter": "0x9965507d1a55bcc2695c58ba16fb37d819b0a4dc",
+            "amountUSD": 1.5,
+            "projectId": f"0xprj_{i}",
+            "roundId": "0xround",
+        }
+        for i in range(3)
+    ]
+    body = MagicMock()
+    body.iter_lines.return_value = [
+        f"{json.dumps(vote)}\n".encode() for vote in votes
+    ] + [b"not json\n"]
+    s3 = mocker.patch("cgrants.management.commands.utils.boto3").client.return_value
+    s3.get_object.return_value = {"Body": body}
+
+    call_command(
+        "import_allo_votes",
+        "--in",
+        "s3://bucket/folder/votes.jsonl",
+        "--start-offset",
+        "10",
+    )
+
+    s3.get_object.assert_called_once_with(
+        Bucket="bucket", Key="folder/votes.jsonl", Range="bytes=10-"
+    )
+    assert ProtocolContributions.objects.count() == 3
@@ -4,6 +4,7 @@ from django.conf import settings
 from ninja_extra.exceptions import APIException
 
 import api_logging as logging
+from ceramic_cache.ban_index import get_ban_index
 from ceramic_cache.exceptions import InternalServerException, TooManyStampsException
 from ceramic_cache.models import Ban, Revocation
 
@@ -18,6 +19,36 @@ from .schema import (
 log = logging.getLogger(__name__)
 
 
+def check_credential_bans(address: str, payload: List[Credential]):
+    """
+    Check the credentials against the in-memory ban index, falling back to
+    querying the bans from the database if the index cannot be loaded.
+    """
+    try:
+        ban_index = get_ban_index()
+    except Exception:
+        log.warning("Failed to load the ban index, querying bans", exc_info=True)
+    else:
+        return [
+            ban_index.check(
+                address, c.credentialSubject.hash, c.credentialSubject.provider
+            )
+            for c in payload
+        ]
+
+    hashes = list(
+        set([c.credentialSubject.hash for c in payload if c.credentialSubject.hash])
+    )
+    bans = Ban.get_bans(address=address, hashes=hashes)
+
+    return [
+        Ban.check_bans_for(
+            bans, address, c.credentialSubject.hash, c.credentialSubject.provider
+        )
+        for c in payload
+    ]
+
+
 def handle_check_bans(payload: List[Credential]) -> List[CheckBanResult]:
     """
     Check for active bans matching the given address and/or hashes.
@@ -35,19 +66,8 @@ def handle_check_bans(payload: List[Credential]) -> List[CheckBanResult]:
 
     address = unique_ids[0].split(":")[-1]
 
-    hashes = list(
-        set([c.credentialSubject.hash for c in payload if c.credentialSubject.hash])
-    )
-
     try:
-        bans = Ban.get_bans(address=address, hashes=hashes)
-
-        credential_ban_results = [
-            Ban.check_bans_for(
-                bans, address, c.credentialSubject.hash, c.credentialSubject.provider
-            )
-            for c in payload
-        ]
+        credential_ban_results = check_credential_bans(address, payload)
 
         return [
             CheckBanResult(
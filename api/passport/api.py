@@ -2,7 +2,6 @@ import asyncio
 import json
 from typing import Dict, List, Optional, Tuple
 
-import aiohttp
 from django.conf import settings
 from django_ratelimit.exceptions import Ratelimited
 from eth_utils.address import to_checksum_address
@@ -12,6 +11,11 @@ from ninja_extra import NinjaExtraAPI
 from ninja_extra.exceptions import APIException
 
 import api_logging as logging
+from passport.model_client import model_client
+from passport.model_evaluation import (
+    ModelDependencyError,
+    ModelEvaluation,
+)
 from registry.admin import get_s3_client
 from registry.api.utils import (
     aapi_key,
@@ -21,7 +25,6 @@ from registry.api.utils import (
 )
 from registry.exceptions import InvalidAddressException
 from registry.models import BatchModelScoringRequest, BatchRequestStatus
-from scorer.settings.model_config import MODEL_AGGREGATION_NAMES
 
 log = logging.getLogger(__name__)
 
@@ -156,13 +159,9 @@ async def get_analysis(
 
 
 async def fetch(session, url, data):
-    headers = {"Content-Type": "application/json"}
     try:
-        async with session.post(
-            url, data=json.dumps(data), headers=headers
-        ) as response:
-            body = await response.json()
-            return {"status": response.status, "data": body.get("data")}
+        status, body = await model_client.post(session, url, data)
+        return {"status": status, "data": body.get("data")}
     except Exception as e:
         log.error(f"Error fetching {url}", exc_info=True)
         return {
@@ -176,13 +175,15 @@ async def fetch(session, url, data):
 
 
 async def fetch_all(urls, payload):
-    async with aiohttp.ClientSession() as session:
-        tasks = []
-        for url in urls:
-            task = asyncio.ensure_future(fetch(session, url, payload))
-            tasks.append(task)
-        responses = await asyncio.gather(*tasks)
-        return responses
+    # The session is shared by all requests, so that connections to the model
+    # endpoints are reused. It must not be closed here.
+    session = model_client.session()
+    tasks = []
+    for url in urls:
+        task = asyncio.ensure_future(fetch(session, url, payload))
+        tasks.append(task)
+    responses = await asyncio.gather(*tasks)
+    return responses
 
 
 async def handle_get_analysis(
@@ -223,11 +224,12 @@ async def handle_get_analysis(
     checksummed_address = to_checksum_address(address)
 
     try:
+        # The evaluation is shared by the requested models and the models the
+        # aggregate depends on, so that each model is only evaluated once
+        evaluation = ModelEvaluation(checksummed_address)
         non_aggregate_models = list(set(models) - {settings.AGGREGATE_MODEL_NAME})
         if non_aggregate_models:
-            responses_data = await get_model_responses(
-                non_aggregate_models, checksummed_address
-            )
+            responses_data = await evaluation.aevaluate(non_aggregate_models)
             model_responses = list(zip(non_aggregate_models, responses_data))
         else:
             model_responses = []
@@ -238,7 +240,7 @@ async def handle_get_analysis(
 
         if model_responses_ok and settings.AGGREGATE_MODEL_NAME in models:
             aggregate_response = await get_aggregate_model_response(
-                checksummed_address, model_responses
+                checksummed_address, model_responses, evaluation
             )
             model_responses.append((settings.AGGREGATE_MODEL_NAME, aggregate_response))
             model_responses_ok = aggregate_response["status"] == 200
@@ -278,6 +280,11 @@ async def handle_get_analysis(
                 score = data.get("human_probability", 0)
                 ret.details.models[model] = ScoreModel(score=score)
 
+        log.debug(
+            "Evaluated models. address=%s sources=%s",
+            checksummed_address,
+            evaluation.sources,
+        )
         return ret
     except PassportAnalysisError:
         raise
@@ -287,69 +294,25 @@ async def handle_get_analysis(
 
 
 async def get_aggregate_model_response(
-    checksummed_address: str, prefetched_responses: List[Tuple[str, Dict]]
+    checksummed_address: str,
+    prefetched_responses: List[Tuple[str, Dict]],
+    evaluation: Optional[ModelEvaluation] = None,
 ):
-    model_responses = await get_submodel_responses_for_aggregate(
-        checksummed_address, prefetched_responses
-    )
-
-    payload = {
-        "address": checksummed_address,
-        "data": {},
-    }
-    model_responses_ok = all(
-        response["status"] == 200 for _, response in model_responses
-    )
+    if evaluation is None:
+        evaluation = ModelEvaluation(checksummed_address)
+        evaluation.add_responses(prefetched_responses)
 
-    if not model_responses_ok:
+    try:
+        (response,) = await evaluation.aevaluate([settings.AGGREGATE_MODEL_NAME])
+    except ModelDependencyError as e:
         # If querying at least one of the submodules resulted in an error, then throw an error
         details = [
             dict(model=model, status=response.get("status"))
-            for model, response in model_responses
+            for model, response in e.dependency_responses
         ]
 
         raise PassportAnalysisError(
             f"Error retrieving Passport analysis: {json.dumps(details)}"
         )
 
-    for model, response in model_responses:
-        data = response.get("data", {})
-        score = data.get("human_probability", 0)
-        num_transactions = data.get("n_transactions", 0)
-        model_key = MODEL_AGGREGATION_NAMES[model]
-
-        payload["data"][f"score_{model_key}"] = score
-        payload["data"][f"txs_{model_key}"] = num_transactions
-
-    url = settings.MODEL_ENDPOINTS[settings.AGGREGATE_MODEL_NAME]
-
-    return (await fetch_all([url], payload))[0]
-
-
-async def get_submodel_responses_for_aggregate(
-    checksummed_address: str, prefetched_responses: List[Tuple[str, Dict]]
-):
-    relevant_prefetched_responses = [
-        (model, response)
-        for model, response in prefetched_responses
-        if model in MODEL_AGGREGATION_NAMES.keys()
-    ]
-
-    prefetched_models = [model for model, _ in relevant_prefetched_responses]
-
-    additional_models = list(MODEL_AGGREGATION_NAMES.keys() - prefetched_models)
-
-    additional_responses_data = await get_model_responses(
-        additional_models, checksummed_address
-    )
-
-    additional_model_responses = list(zip(additional_models, additional_responses_data))
-
-    return relevant_prefetched_responses + additional_model_responses
-
-
-async def get_model_responses(models: List[str], checksummed_address: str):
-    urls = [settings.MODEL_ENDPOINTS[model] for model in models]
-
-    payload = {"address": checksummed_address}
-    return await fetch_all(urls, payload)
+    return response
@@ -0,0 +1,332 @@
+"""
+Process-wide HTTP client for the model endpoints.
+
+Requests to the model endpoints share a pooled `aiohttp.ClientSession` (one per
+event loop, as sessions are bound to the loop they are created in) so that
+connections to the model lambdas are kept alive between analysis requests.
+The session of a loop is closed when the loop shuts down (`asyncio.run` and
+`async_to_sync` both finalize the async generators of the loop before closing
+it).
+Each endpoint has:
+
+- a request timeout (`MODEL_REQUEST_TIMEOUT`, overridable per model in
+  `MODEL_REQUEST_TIMEOUTS`)
+- a limit on concurrent requests (`MODEL_MAX_CONCURRENT_REQUESTS`)
+- a circuit breaker: after `MODEL_CIRCUIT_BREAKER_FAILURE_THRESHOLD`
+  consecutive failures requests fail fast for
+  `MODEL_CIRCUIT_BREAKER_RESET_TIMEOUT` seconds, after which a single trial
+  request decides whether the circuit closes again
+- a latency histogram, see `ModelClient.stats`
+"""
+
+import asyncio
+import bisect
+import json
+import threading
+import time
+import weakref
+from typing import Dict, Tuple
+
+import aiohttp
+from django.conf import settings
+
+import api_logging as logging
+
+log = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def begin(self) -> Tuple[bool, bool]:
+        """
+        Return whether a request is allowed, and whether it is the trial request
+        deciding if the circuit closes again
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True, False
+            if (
+                self.state == self.OPEN
+                and time.monotonic() - self.opened_at >= self.reset_timeout
+            ):
+                # Let a single trial request through
+                self.state = self.HALF_OPEN
+                return True, True
+            return False, False
+
+    def abandon(self, trial: bool):
+        """
+        Called when a request is cancelled before its outcome is known. If it
+        was the trial request, the next request is let through as the trial.
+        """
+        with self._lock:
+            if trial and self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                log.info("Circuit closed. model=%s", self.name)
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if (
+                self.state == self.HALF_OPEN
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                if self.state != self.OPEN:
+                    log.warning(
+                        "Circuit opened. model=%s consecutive_failures=%s",
+                        self.name,
+                        self.consecutive_failures,
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class LatencyHistogram:
+    def __init__(self):
+        # One count per bucket, plus one for latencies above the last bucket
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def snapshot(self) -> dict:
+        buckets = {
+            f"le_{bound}ms": n for bound, n in zip(LATENCY_BUCKETS_MS, self.counts)
+        }
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "buckets": buckets,
+        }
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limit on concurrent requests that adapts to the health of the model
+    endpoints (additive increase, multiplicative decrease): the limit grows
+    by about one for every `limit` successful requests completing within
+    `target_latency`, and is halved when a request fails or is slower. The
+    limit is halved at most once per `target_latency` seconds, so that a burst
+    of failures of the requests already in flight only counts once.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float,
+        min_limit: float,
+        max_limit: float,
+        target_latency: float,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, duration: float, ok: bool):
+        async with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if not ok or duration > self.target_latency:
+                if now - self._last_decrease >= self.target_latency:
+                    self._last_decrease = now
+                    self.limit = max(self.min_limit, self.limit / 2)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+async def _close_on_loop_shutdown(session: aiohttp.ClientSession):
+    try:
+        yield
+    finally:
+        await session.close()
+
+
+class ModelClient:
+    def __init__(self):
+        self._sessions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._session_guards: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared session for the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=settings.MODEL_CLIENT_MAX_CONNECTIONS,
+                    keepalive_timeout=settings.MODEL_CLIENT_KEEPALIVE_TIMEOUT,
+                    ttl_dns_cache=300,
+                ),
+                headers={"Content-Type": "application/json"},
+            )
+            self._sessions[loop] = session
+            self._session_guards[loop] = self._start_session_guard(session)
+        return session
+
+    @staticmethod
+    def _start_session_guard(session: aiohttp.ClientSession):
+        # Run the guard until its `yield`: starting it registers it with the
+        # running loop, which closes it (and so the session) on shutdown
+        guard = _close_on_loop_shutdown(session)
+        try:
+            guard.asend(None).send(None)
+        except StopIteration:
+            pass
+        return guard
+
+    async def post(
+        self, session: aiohttp.ClientSession, url: str, data: dict
+    ) -> Tuple[int, dict]:
+        """
+        POST `data` to the model endpoint at `url`, and return the response
+        status and JSON body. Raises CircuitOpenError without sending the
+        request if the endpoint is considered unhealthy.
+        """
+        model = self._model_name(url)
+        breaker = self._breaker(model)
+        allowed, trial = breaker.begin()
+        if not allowed:
+            raise CircuitOpenError(f"Circuit open for model {model}")
+
+        timeout = aiohttp.ClientTimeout(
+            total=settings.MODEL_REQUEST_TIMEOUTS.get(
+                model, settings.MODEL_REQUEST_TIMEOUT
+            )
+        )
+        try:
+            async with self._semaphore(url):
+                start = time.monotonic()
+                try:
+                    async with session.post(
+                        url, data=json.dumps(data), timeout=timeout
+                    ) as response:
+                        body = await response.json()
+                        status = response.status
+                finally:
+                    self._histogram(model).observe(time.monotonic() - start)
+        except Exception:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled, either while waiting for the semaphore or during the
+            # request
+            breaker.abandon(trial)
+            raise
+
+        if status >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return status, body
+
+    def stats(self) -> dict:
+        """
+        Latency histogram and circuit state for each model.
+        """
+        with self._lock:
+            return {
+                model: {
+                    "latency": histogram.snapshot(),
+                    "circuit": self._breakers[model].state,
+                }
+                for model, histogram in self._histograms.items()
+            }
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        guard = self._session_guards.pop(loop, None)
+        if guard is not None:
+            await guard.aclose()
+        if session is not None:
+            await session.close()
+
+    def reset(self):
+        with self._lock:
+            self._sessions = weakref.WeakKeyDictionary()
+            self._session_guards = weakref.WeakKeyDictionary()
+            self._semaphores = weakref.WeakKeyDictionary()
+            self._breakers = {}
+            self._histograms = {}
+
+    def _model_name(self, url: str) -> str:
+        for model, endpoint in settings.MODEL_ENDPOINTS.items():
+            if endpoint == url:
+                return model
+        return url
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(model)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    model,
+                    failure_threshold=settings.MODEL_CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                    reset_timeout=settings.MODEL_CIRCUIT_BREAKER_RESET_TIMEOUT,
+                )
+                self._breakers[model] = breaker
+                self._histograms[model] = LatencyHistogram()
+            return breaker
+
+    def _histogram(self, model: str) -> LatencyHistogram:
+        self._breaker(model)
+        return self._histograms[model]
+
+    def _semaphore(self, url: str) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop too
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.setdefault(loop, {})
+        semaphore = semaphores.get(url)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.MODEL_MAX_CONCURRENT_REQUESTS)
+            semaphores[url] = semaphore
+        return semaphore
+
+
+model_client = ModelClient()
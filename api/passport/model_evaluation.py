@@ -0,0 +1,131 @@
+"""
+Evaluation of models for an address.
+
+Models can depend on other models: the aggregate model is evaluated on the
+outputs of the models in `MODEL_AGGREGATION_NAMES`. A `ModelEvaluation`
+resolves these dependencies once per address: every model (requested or
+needed as a dependency) is evaluated at most once, and its response is reused
+by all the models depending on it.
+
+Each model response comes either from the model score cache (when enabled) or
+from the model endpoint. Concurrent evaluations of the same model for the same
+address (e.g. concurrent analysis requests) share a single request to the
+model endpoint. The source of each response is recorded in
+`ModelEvaluation.sources` and counted in `model_evaluation_stats`.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+
+import api_logging as logging
+from registry.singleflight import SingleFlight
+from scorer.settings.model_config import MODEL_AGGREGATION_NAMES
+
+from .model_score_cache import model_score_cache
+
+log = logging.getLogger(__name__)
+
+model_singleflight = SingleFlight("model")
+
+# Number of model responses served from each source, for all evaluations in
+# this process
+model_evaluation_stats = Counter()
+
+
+class ModelDependencyError(Exception):
+    def __init__(self, model: str, dependency_responses: List[Tuple[str, Dict]]):
+        super().__init__(f"Failed to evaluate dependencies of model {model}")
+        self.model = model
+        self.dependency_responses = dependency_responses
+
+
+def get_model_dependencies(model: str) -> List[str]:
+    if model == settings.AGGREGATE_MODEL_NAME:
+        return list(MODEL_AGGREGATION_NAMES.keys())
+    return []
+
+
+class ModelEvaluation:
+    def __init__(self, checksummed_address: str):
+        self.address = checksummed_address
+        self.responses: Dict[str, Dict] = {}
+        # model -> "cache" | "network" | "prefetched"
+        self.sources: Dict[str, str] = {}
+
+    def add_responses(self, responses: List[Tuple[str, Dict]]):
+        """
+        Add responses evaluated elsewhere, to be reused as dependencies.
+        """
+        for model, response in responses:
+            self.responses[model] = response
+            self.sources[model] = "prefetched"
+
+    async def aevaluate(self, models: List[str]) -> List[Dict]:
+        """
+        Evaluate the models, after their dependencies, and return their
+        responses in the same order. Raises ModelDependencyError if the
+        dependencies of a model could not be evaluated.
+        """
+        pending = [m for m in dict.fromkeys(models) if m not in self.responses]
+
+        if pending and settings.MODEL_SCORE_CACHE_ENABLED:
+            cached = await model_score_cache.aget_many(pending, self.address)
+            for model, response in cached.items():
+                self._record(model, response, "cache")
+            pending = [m for m in pending if m not in cached]
+
+        dependencies = list(
+            dict.fromkeys(
+                dependency
+                for model in pending
+                for dependency in get_model_dependencies(model)
+            )
+        )
+        if dependencies:
+            await self.aevaluate(dependencies)
+            dependency_responses = [(d, self.responses[d]) for d in dependencies]
+            if not all(r["status"] == 200 for _, r in dependency_responses):
+                dependant = next(m for m in pending if get_model_dependencies(m))
+                raise ModelDependencyError(dependant, dependency_responses)
+
+        if pending:
+            fetched = await asyncio.gather(*[self._afetch(model) for model in pending])
+            for model, response in zip(pending, fetched):
+                self._record(model, response, "network")
+            if settings.MODEL_SCORE_CACHE_ENABLED:
+                await model_score_cache.aset_many(
+                    dict(zip(pending, fetched)), self.address
+                )
+
+        return [self.responses[model] for model in models]
+
+    def _record(self, model: str, response: Dict, source: str):
+        self.responses[model] = response
+        self.sources[model] = source
+        model_evaluation_stats[source] += 1
+
+    def _payload(self, model: str) -> Dict:
+        if model == settings.AGGREGATE_MODEL_NAME:
+            payload = {"address": self.address, "data": {}}
+            for dependency in get_model_dependencies(model):
+                data = self.responses[dependency].get("data") or {}
+                model_key = MODEL_AGGREGATION_NAMES[dependency]
+                payload["data"][f"score_{model_key}"] = data.get("human_probability", 0)
+                payload["data"][f"txs_{model_key}"] = data.get("n_transactions", 0)
+            return payload
+        return {"address": self.address}
+
+    async def _afetch(self, model: str) -> Dict:
+        # pylint: disable=import-outside-toplevel
+        from .api import fetch_all
+
+        url = settings.MODEL_ENDPOINTS[model]
+        payload = self._payload(model)
+
+        async def fetch_one():
+            return (await fetch_all([url], payload))[0]
+
+        return await model_singleflight.do((model, self.address), fetch_one)
@@ -0,0 +1,173 @@
+"""
+Read-through cache for model responses.
+
+The model endpoints store their outputs in the `data_model` database (the
+`cache` table, keyed by a model specific key and the checksummed address).
+Before calling a model endpoint, responses are looked up in:
+
+1. an in-process LRU of recent responses
+2. the django cache, shared by all processes
+3. the `cache` table, with one query for all the requested models
+
+Entries are only used while fresh, according to the model's TTL
+(`MODEL_SCORE_CACHE_TTL`, overridable per model in `MODEL_SCORE_CACHE_TTLS`).
+Responses fetched from the model endpoints are written back to the LRU and
+the django cache. The `cache` table is owned by the model service, and is
+only read from.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+import api_logging as logging
+from data_model.models import Cache
+
+log = logging.getLogger(__name__)
+
+
+class ModelScoreCache:
+    def __init__(self):
+        # (model, address) -> (fetched_at timestamp, response)
+        self._lru: OrderedDict[Tuple[str, str], Tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"lru_hits": 0, "cache_hits": 0, "db_hits": 0, "misses": 0}
+
+    async def aget_many(self, models: Iterable[str], address: str) -> Dict[str, dict]:
+        """
+        Return the fresh cached responses for the given models, keyed by model.
+        Models without a fresh response are missing from the result.
+        """
+        models = list(models)
+        responses = {}
+        now = time.time()
+        for model in models:
+            response = self._lru_get(model, address, now)
+            if response is not None:
+                responses[model] = response
+        self.stats["lru_hits"] += len(responses)
+
+        missing = [model for model in models if model not in responses]
+        if missing:
+            cached_responses = await self._acache_get_many(missing, address, now)
+            self.stats["cache_hits"] += len(cached_responses)
+            responses.update(cached_responses)
+
+        missing = [model for model in models if model not in responses]
+        if missing:
+            db_responses = await self._adb_get_many(missing, address, now)
+            self.stats["db_hits"] += len(db_responses)
+            self.stats["misses"] += len(missing) - len(db_responses)
+            responses.update(db_responses)
+
+        return responses
+
+    async def aset_many(self, responses: Dict[str, dict], address: str):
+        """
+        Write back successful responses fetched from the model endpoints.
+        """
+        responses = {
+            model: response
+            for model, response in responses.items()
+            if response.get("status") == 200
+        }
+        if not responses:
+            return
+
+        now = time.time()
+        for model, response in responses.items():
+            self._lru_set(model, address, now, response)
+
+        try:
+            for model, response in responses.items():
+                await cache.aset(
+                    self._cache_key(model, address),
+                    {"fetched_at": now, "data": response["data"]},
+                    timeout=self._ttl(model),
+                )
+        except Exception:
+            log.exception("Failed to write model responses to the cache")
+
+    def reset(self):
+        with self._lock:
+            self._lru.clear()
+        self.stats = {"lru_hits": 0, "cache_hits": 0, "db_hits": 0, "misses": 0}
+
+    def _ttl(self, model: str) -> float:
+        return settings.MODEL_SCORE_CACHE_TTLS.get(
+            model, settings.MODEL_SCORE_CACHE_TTL
+        )
+
+    def _db_key(self, model: str) -> str:
+        return settings.MODEL_SCORE_CACHE_KEYS.get(model, model)
+
+    def _cache_key(self, model: str, address: str) -> str:
+        return f"model_score_cache:{model}:{address}"
+
+    def _lru_get(self, model: str, address: str, now: float) -> Optional[dict]:
+        key = (model, address)
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            fetched_at, response = entry
+            if now - fetched_at > self._ttl(model):
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return response
+
+    def _lru_set(self, model: str, address: str, fetched_at: float, response: dict):
+        with self._lock:
+            self._lru[(model, address)] = (fetched_at, response)
+            self._lru.move_to_end((model, address))
+            while len(self._lru) > settings.MODEL_SCORE_CACHE_LRU_SIZE:
+                self._lru.popitem(last=False)
+
+    async def _acache_get_many(
+        self, models: list[str], address: str, now: float
+    ) -> Dict[str, dict]:
+        model_by_key = {self._cache_key(model, address): model for model in models}
+        responses = {}
+        try:
+            entries = await cache.aget_many(model_by_key.keys())
+        except Exception:
+            log.exception("Failed to read model responses from the cache")
+            return responses
+
+        for key, entry in entries.items():
+            model = model_by_key[key]
+            if now - entry["fetched_at"] > self._ttl(model):
+                continue
+            response = {"status": 200, "data": entry["data"]}
+            self._lru_set(model, address, entry["fetched_at"], response)
+            responses[model] = response
+        return responses
+
+    async def _adb_get_many(
+        self, models: list[str], address: str, now: float
+    ) -> Dict[str, dict]:
+        model_by_key = {self._db_key(model): model for model in models}
+        responses = {}
+        try:
+            async for entry in Cache.objects.filter(
+                key_0__in=model_by_key.keys(), key_1=address
+            ).only("key_0", "value", "updated_at"):
+                model = model_by_key[entry.key_0]
+                fetched_at = entry.updated_at.timestamp()
+                data = (entry.value or {}).get("data")
+                if data is None or now - fetched_at > self._ttl(model):
+                    continue
+                response = {"status": 200, "data": data}
+                self._lru_set(model, address, fetched_at, response)
+                responses[model] = response
+        except Exception:
+            log.exception("Failed to read model responses from the cache")
+        return responses
+
+
+model_score_cache = ModelScoreCache()
@@ -0,0 +1,188 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from passport.api import fetch_all
+from passport.model_client import AdaptiveConcurrencyLimiter, model_client
+
+
+class StandInModel:
+    """Local stand-in for a model endpoint"""
+
+    def __init__(self):
+        self.status = 200
+        self.delay = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.peers = set()
+
+    async def handle(self, request):
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.peers.add(request.transport.get_extra_info("peername"))
+        try:
+            await asyncio.sleep(self.delay)
+            payload = await request.json()
+            return web.json_response(
+                {"data": {"human_probability": 50, "address": payload["address"]}},
+                status=self.status,
+            )
+        finally:
+            self.in_flight -= 1
+
+
+@asynccontextmanager
+async def stand_in_model():
+    model = StandInModel()
+    app = web.Application()
+    app.router.add_post("/predict", model.handle)
+    server = TestServer(app)
+    await server.start_server()
+    model.url = str(server.make_url("/predict"))
+    try:
+        yield model
+    finally:
+        await model_client.close()
+        model_client.reset()
+        await server.close()
+
+
+async def test_connections_are_reused():
+    async with stand_in_model() as stand_in:
+        for _ in range(3):
+            (response,) = await fetch_all([stand_in.url], {"address": "0x1"})
+            assert response == {
+                "status": 200,
+                "data": {"human_probability": 50, "address": "0x1"},
+            }
+
+        assert stand_in.requests == 3
+        assert len(stand_in.peers) == 1
+
+
+async def test_request_timeout(settings):
+    async with stand_in_model() as stand_in:
+        settings.MODEL_REQUEST_TIMEOUT = 0.05
+        stand_in.delay = 0.5
+
+        (response,) = await fetch_all([stand_in.url], {"address": "0x1"})
+
+        assert response["status"] == 500
+        assert response["data"]["human_probability"] == -1
+
+
+async def test_concurrency_limit(settings):
+    async with stand_in_model() as stand_in:
+        settings.MODEL_MAX_CONCURRENT_REQUESTS = 2
+        stand_in.delay = 0.05
+
+        responses = await fetch_all([stand_in.url] * 6, {"address": "0x1"})
+
+        assert all(r["status"] == 200 for r in responses)
+        assert stand_in.max_in_flight == 2
+
+
+async def test_circuit_breaker(settings):
+    async with stand_in_model() as stand_in:
+        settings.MODEL_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 2
+        settings.MODEL_CIRCUIT_BREAKER_RESET_TIMEOUT = 0.1
+        stand_in.status = 503
+
+        for _ in range(2):
+            (response,) = await fetch_all([stand_in.url], {"address": "0x1"})
+            assert response["status"] == 503
+
+        # The circuit is open: fail fast without reaching the model
+        (response,) = await fetch_all([stand_in.url], {"address": "0x1"})
+        assert response["status"] == 500
+        assert "Circuit open" in response["data"]["error"]
+        assert stand_in.requests == 2
+        assert model_client.stats()[stand_in.url]["circuit"] == "open"
+
+        # After the reset timeout a trial request goes through and closes the circuit
+        await asyncio.sleep(0.1)
+        stand_in.status = 200
+        (response,) = await fetch_all([stand_in.url], {"address": "0x1"})
+        assert response["status"] == 200
+        assert model_client.stats()[stand_in.url]["circuit"] == "closed"
+
+
+async def test_cancelled_trial_request(settings):
+    async with stand_in_model() as stand_in:
+        settings.MODEL_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 1
+        settings.MODEL_CIRCUIT_BREAKER_RESET_TIMEOUT = 0.05
+        stand_in.status = 503
+        await fetch_all([stand_in.url], {"address": "0x1"})
+        assert model_client.stats()[stand_in.url]["circuit"] == "open"
+
+        # The trial request is cancelled before its response
+        await asyncio.sleep(0.05)
+        stand_in.status = 200
+        stand_in.delay = 1
+        trial = asyncio.create_task(fetch_all([stand_in.url], {"address": "0x1"}))
+        await asyncio.sleep(0.05)
+        assert model_client.stats()[stand_in.url]["circuit"] == "half_open"
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        # The next request is let through as the trial
+        stand_in.delay = 0
+        (response,) = await fetch_all([stand_in.url], {"address": "0x1"})
+        assert response["status"] == 200
+        assert model_client.stats()[stand_in.url]["circuit"] == "closed"
+
+
+def test_sessions_are_closed_with_their_loop():
+    async def get_session():
+        return model_client.session()
+
+    try:
+        session = asyncio.run(get_session())
+
+        assert session.closed
+    finally:
+        model_client.reset()
+
+
+async def test_latency_histogram():
+    async with stand_in_model() as stand_in:
+        await fetch_all([stand_in.url] * 3, {"address": "0x1"})
+
+        latency = model_client.stats()[stand_in.url]["latency"]
+        assert latency["count"] == 3
+        assert sum(latency["buckets"].values()) == 3
+
+
+async def test_adaptive_concurrency_limit():
+    limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=4, min_limit=1, max_limit=8, target_latency=1
+    )
+
+    # Fast successful requests raise the limit, up to the maximum
+    for _ in range(100):
+        await limiter.acquire()
+        await limiter.release(0.1, ok=True)
+    assert limiter.limit == 8
+
+    # A burst of failures only halves the limit once
+    for _ in range(3):
+        await limiter.acquire()
+    for _ in range(3):
+        await limiter.release(0.1, ok=False)
+    assert limiter.limit == 4
+
+    # Requests wait for a slot once the limit is reached
+    for _ in range(4):
+        await limiter.acquire()
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+    await limiter.release(0.1, ok=True)
+    await asyncio.wait_for(waiting, 1)
+    assert limiter.in_flight == 4
@@ -0,0 +1,73 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+
+from aws_lambdas.passport.tests.test_passport_analysis_lambda import (
+    mock_post_response,
+)
+from passport.api import handle_get_analysis
+from passport.model_evaluation import ModelEvaluation, model_evaluation_stats
+
+pytestmark = pytest.mark.django_db
+
+address = "0x06e3c221011767FE816D0B8f5B16253E43e4Af7D"
+
+
+async def slow_post_response(session, url, data):
+    # Give concurrent evaluations the time to join the in-flight requests
+    await asyncio.sleep(0.05)
+    return mock_post_response(session, url, data)
+
+
+@patch("passport.api.fetch", side_effect=mock_post_response)
+def test_dependencies_are_evaluated_once(mock_fetch):
+    async def evaluate():
+        evaluation = ModelEvaluation(address)
+        await evaluation.aevaluate(["nft", "zksync"])
+        await evaluation.aevaluate([settings.AGGREGATE_MODEL_NAME])
+        return evaluation
+
+    evaluation = async_to_sync(evaluate)()
+
+    # Each model is called once, the requested zksync response is reused as a
+    # dependency of the aggregate
+    assert mock_fetch.call_count == len(settings.MODEL_AGGREGATION_NAMES) + 2
+    assert evaluation.sources["nft"] == "network"
+    assert evaluation.sources[settings.AGGREGATE_MODEL_NAME] == "network"
+
+
+@patch("passport.api.fetch", side_effect=slow_post_response)
+def test_concurrent_analyses_share_model_requests(mock_fetch):
+    async def analyse_concurrently():
+        return await asyncio.gather(
+            handle_get_analysis(address, "aggregate", only_one_model=False),
+            handle_get_analysis(address, "aggregate", only_one_model=False),
+        )
+
+    first, second = async_to_sync(analyse_concurrently)()
+
+    assert mock_fetch.call_count == len(settings.MODEL_AGGREGATION_NAMES) + 1
+    assert (
+        first.details.models["aggregate"].score
+        == second.details.models["aggregate"].score
+    )
+
+
+@patch("passport.api.fetch", side_effect=mock_post_response)
+def test_sources_are_counted(mock_fetch):
+    model_evaluation_stats.clear()
+
+    async def evaluate():
+        evaluation = ModelEvaluation(address)
+        evaluation.add_responses([("nft", {"status": 200, "data": {}})])
+        await evaluation.aevaluate(["nft", "zksync"])
+        return evaluation
+
+    evaluation = async_to_sync(evaluate)()
+
+    assert evaluation.sources == {"nft": "prefetched", "zksync": "network"}
+    assert model_evaluation_stats["network"] == 1
+    assert mock_fetch.call_count == 1
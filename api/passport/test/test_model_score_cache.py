@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connections
+
+from aws_lambdas.passport.tests.test_passport_analysis_lambda import (
+    mock_post_response,
+)
+from data_model.models import Cache
+from passport.api import handle_get_analysis
+from passport.model_score_cache import model_score_cache
+
+pytestmark = pytest.mark.django_db(databases=["default", "data_model"])
+
+address = "0x06e3c221011767FE816D0B8f5B16253E43e4Af7D"
+
+
+@pytest.fixture(autouse=True)
+def model_score_cache_enabled(settings):
+    settings.MODEL_SCORE_CACHE_ENABLED = True
+    model_score_cache.reset()
+    cache.clear()
+    # The cache table is not managed by django, create it for the tests
+    connection = connections["data_model"]
+    with connection.schema_editor() as schema_editor:
+        schema_editor.create_model(Cache)
+    yield
+    with connection.schema_editor() as schema_editor:
+        schema_editor.delete_model(Cache)
+    model_score_cache.reset()
+
+
+def get_analysis(model_list):
+    return async_to_sync(handle_get_analysis)(address, model_list, only_one_model=False)
+
+
+@patch("passport.api.fetch", side_effect=mock_post_response)
+def test_repeated_requests_are_served_from_memory(mock_fetch):
+    first = get_analysis("ethereum_activity")
+    second = get_analysis("ethereum_activity")
+
+    assert mock_fetch.call_count == 1
+    assert first == second
+    assert model_score_cache.stats["lru_hits"] == 1
+
+
+@patch("passport.api.fetch", side_effect=mock_post_response)
+def test_fresh_results_are_read_from_the_database(mock_fetch):
+    Cache.objects.create(
+        key_0="predict",
+        key_1=address,
+        value={"data": {"human_probability": 42}, "meta": {"version": "v1"}},
+        updated_at=datetime.now(timezone.utc),
+    )
+
+    response = get_analysis("ethereum_activity,nft")
+
+    assert response.details.models["ethereum_activity"].score == 42
+    # Only the model missing from the cache is called
+    assert mock_fetch.call_count == 1
+    assert "nft" in mock_fetch.call_args.args[1]
+
+
+@patch("passport.api.fetch", side_effect=mock_post_response)
+def test_stale_results_are_refreshed_and_written_back(mock_fetch, settings):
+    settings.MODEL_SCORE_CACHE_TTLS = {"ethereum_activity": 60}
+    value = {"data": {"human_probability": 42}, "meta": {"version": "v1"}}
+    Cache.objects.create(
+        key_0="predict",
+        key_1=address,
+        value=value,
+        updated_at=datetime.now(timezone.utc) - timedelta(minutes=5),
+    )
+
+    response = get_analysis("ethereum_activity")
+
+    assert response.details.models["ethereum_activity"].score == 75
+    assert mock_fetch.call_count == 1
+
+    # Written back to the django cache, shared by the other processes
+    model_score_cache.reset()
+    response = get_analysis("ethereum_activity")
+    assert response.details.models["ethereum_activity"].score == 75
+    assert mock_fetch.call_count == 1
+    assert model_score_cache.stats["cache_hits"] == 1
+
+    # The rows of the model service are left untouched
+    entry = Cache.objects.get(key_0="predict", key_1=address)
+    assert entry.value == value
+
+
+@patch("passport.api.fetch", side_effect=mock_post_response)
+def test_aggregate_is_cached(mock_fetch):
+    get_analysis("aggregate")
+    calls = mock_fetch.call_count
+
+    model_score_cache.reset()
+    response = get_analysis("aggregate")
+
+    # Served from the django cache, without calling the submodels again
+    assert mock_fetch.call_count == calls
+    assert "aggregate" in response.details.models
@@ -1,8 +1,9 @@
+from datetime import timedelta
 from typing import List, Optional
 
 from django.conf import settings
 from django.core.cache import cache
-from django.db.models import OuterRef, Q, Subquery, Value
+from django.db.models import F, FilteredRelation, Q, Subquery, Value
 from django.db.models.functions import Coalesce
 from django.utils import timezone
 from ninja import Router
@@ -31,6 +32,7 @@ from passport_admin.schema import (
 from .models import (
     DismissedBanners,
     Notification,
+    NotificationGeneration,
     NotificationStatus,
     PassportBanner,
     SystemTestRun,
@@ -123,67 +125,76 @@ def get_notifications(request, payload: NotificationPayload):
         except Community.DoesNotExist:
             raise Exception("Scorer for provided id does not exist")
 
-        generate_deduplication_notifications(address=address, community=community)
-        generate_stamp_expired_notifications(address=address, community=community)
+        # Only the events and stamps that changed since the last run (with some
+        # overlap) need to be considered
+        generation_started_at = timezone.now()
+        last_run = (
+            NotificationGeneration.objects.filter(
+                eth_address=address, community=community
+            )
+            .values_list("last_run", flat=True)
+            .first()
+        )
+        since = (
+            last_run - timedelta(seconds=settings.NOTIFICATION_GENERATION_OVERLAP)
+            if last_run
+            else None
+        )
+
+        generate_deduplication_notifications(
+            address=address, community=community, since=since
+        )
+        generate_stamp_expired_notifications(
+            address=address, community=community, since=since
+        )
+        NotificationGeneration.objects.bulk_create(
+            [
+                NotificationGeneration(
+                    eth_address=address,
+                    community=community,
+                    last_run=generation_started_at,
+                )
+            ],
+            update_conflicts=True,
+            unique_fields=["eth_address", "community"],
+            update_fields=["last_run"],
+        )
         if payload.expired_chain_ids:
             generate_on_chain_expired_notifications(
                 address=address, expired_chains=payload.expired_chain_ids
             )
 
-        notification_status_subquery = NotificationStatus.objects.filter(
-            notification=OuterRef("pk"), eth_address=address
-        ).values(
-            "is_read"
-        )[
-            :1
-        ]  # [:1] is used to limit the subquery to 1 result. There should be only 1 NotificationStatus per Notification
-
-        custom_notifications = (
-            Notification.objects.filter(
-                Q(is_active=True, eth_address=address)
-                & (Q(expires_at__gte=current_date) | Q(expires_at__isnull=True))
-                & (
-                    Q(notificationstatus__is_deleted=False)
-                    | Q(notificationstatus__isnull=True)
+        # The address specific and general notifications, with the status of
+        # the address, are ordered and limited in a single query
+        notifications = (
+            Notification.objects.annotate(
+                address_status=FilteredRelation(
+                    "notificationstatus",
+                    condition=Q(notificationstatus__eth_address=address),
                 )
             )
-            .annotate(
-                is_read=Coalesce(Subquery(notification_status_subquery), Value(False))
-            )
-            .order_by("-created_at")
-        )
-
-        general_notifications = (
-            Notification.objects.filter(
-                Q(is_active=True, eth_address=None)
+            .filter(
+                Q(is_active=True)
+                & (Q(eth_address=address) | Q(eth_address=None))
                 & (Q(expires_at__gte=current_date) | Q(expires_at__isnull=True))
-                & (
-                    Q(notificationstatus__is_deleted=False)
-                    | Q(notificationstatus__isnull=True)
-                )
+                & (Q(address_status__is_deleted=False) | Q(address_status__isnull=True))
             )
-            .annotate(
-                is_read=Coalesce(Subquery(notification_status_subquery), Value(False))
-            )
-            .order_by("-created_at")
+            .annotate(is_read=Coalesce(F("address_status__is_read"), Value(False)))
+            .order_by("-created_at", "-id")[:20]  # Limit to the 20 newest notifications
         )
 
-        all_notifications = sorted(
-            [
-                NotificationSchema(
-                    notification_id=n.notification_id,
-                    type=n.type,
-                    content=n.content,
-                    link=n.link,
-                    link_text=n.link_text,
-                    is_read=n.is_read,
-                    created_at=n.created_at,
-                ).dict()
-                for n in [*custom_notifications, *general_notifications]
-            ],
-            key=lambda x: x["created_at"],
-            reverse=True,
-        )[:20]  # Limit to the 20 newest notifications
+        all_notifications = [
+            NotificationSchema(
+                notification_id=n.notification_id,
+                type=n.type,
+                content=n.content,
+                link=n.link,
+                link_text=n.link_text,
+                is_read=n.is_read,
+                created_at=n.created_at,
+            ).dict()
+            for n in notifications
+        ]
 
         ret = NotificationResponse(items=all_notifications).dict()
         return ret
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.6 on 2026-10-19 12:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import account.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("account", "0055_walletgroup_models"),
+        ("passport_admin", "0015_passportbanner_display_on_all_dashboards"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationGeneration",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("eth_address", account.models.EthAddressField(max_length=42)),
+                ("last_run", models.DateTimeField()),
+                (
+                    "community",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="account.community",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("eth_address", "community")},
+            },
+        ),
+    ]
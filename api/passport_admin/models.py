@@ -109,6 +109,20 @@ class NotificationStatus(models.Model):
     )  # The account / eth address that dismissed the notification. Required to track the dismissed notifications / user in case of global notifications.
 
 
+class NotificationGeneration(models.Model):
+    """
+    Watermark of the notification generation for an address and community: only
+    the events and stamps that changed since the last run are considered
+    """
+
+    eth_address = EthAddressField()
+    community = models.ForeignKey(Community, on_delete=models.CASCADE)
+    last_run = models.DateTimeField()
+
+    class Meta:
+        unique_together = ["eth_address", "community"]
+
+
 class LastScheduledRun(models.Model):
     name = models.CharField(
         max_length=255, unique=True, blank=False, null=False, db_index=True
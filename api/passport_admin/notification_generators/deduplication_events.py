@@ -3,7 +3,8 @@ This module contains the logic for generating deduplication notifications for a
 """
 
 import hashlib
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Optional
 
 import dag_cbor
 from django.utils import timezone
@@ -11,31 +12,38 @@ from django.utils import timezone
 from account.models import Community
 from ceramic_cache.api.v1 import handle_get_scorer_weights
 from passport_admin.models import Notification
+from passport_admin.notification_generators.utils import create_missing_notifications
 from registry.models import Event
 
 
-def generate_deduplication_notifications(address, community: Community):
+def generate_deduplication_notifications(
+    address, community: Community, since: Optional[datetime] = None
+):
     """
     Generate deduplication notifications for a specific address.
 
     Args:
         address (str): The address for which to generate deduplication notifications.
+        since (datetime): Only the events created since this time are considered.
 
     Returns:
         None
     """
-    thirty_days_ago = timezone.now() - timedelta(days=30)
+    created_after = timezone.now() - timedelta(days=30)
+    if since is not None:
+        created_after = max(created_after, since)
 
     deduplication_events = Event.objects.filter(
         address=address,
         action=Event.Action.LIFO_DEDUPLICATION,
-        created_at__gte=thirty_days_ago,
+        created_at__gte=created_after,
         community=community,
     )
 
     weights = handle_get_scorer_weights(community.id)
     # for each deduplication event, generate a notification
     # if the notification does not already exist
+    notifications = {}
     for event in deduplication_events:
         stamp_name = event.data.get("provider", "<StampName>")
         stamp_weight = weights.get(stamp_name)
@@ -51,18 +59,15 @@ def generate_deduplication_notifications(address, community: Community):
             )
 
             notification_id = hashlib.sha256(encoded_data).hexdigest()
-            notification_exists = Notification.objects.filter(
-                notification_id=notification_id
-            ).exists()
+            notifications[notification_id] = Notification(
+                notification_id=notification_id,
+                type="deduplication",
+                is_active=True,
+                content=f"You have claimed the same '{stamp_name}' stamp in two Passports. We only count your stamp once. This duplicate is in your wallet {address}. Learn more about deduplication",
+                link="https://support.passport.xyz/passport-knowledge-base/using-passport/common-questions/why-is-my-passport-score-not-adding-up",
+                link_text="here",
+                created_at=timezone.now().date(),
+                eth_address=address,
+            )
 
-            if not notification_exists:
-                Notification.objects.create(
-                    notification_id=notification_id,
-                    type="deduplication",
-                    is_active=True,
-                    content=f"You have claimed the same '{stamp_name}' stamp in two Passports. We only count your stamp once. This duplicate is in your wallet {address}. Learn more about deduplication",
-                    link="https://support.passport.xyz/passport-knowledge-base/using-passport/common-questions/why-is-my-passport-score-not-adding-up",
-                    link_text="here",
-                    created_at=timezone.now().date(),
-                    eth_address=address,
-                )
+    create_missing_notifications(notifications)
@@ -1,4 +1,6 @@
 import hashlib
+from datetime import datetime
+from typing import Optional
 
 import dag_cbor
 from django.utils import timezone
@@ -7,11 +9,19 @@ from account.models import Community
 from ceramic_cache.api.v1 import handle_get_scorer_weights
 from ceramic_cache.models import CeramicCache
 from passport_admin.models import Notification
+from passport_admin.notification_generators.utils import create_missing_notifications
 
 
-def generate_stamp_expired_notifications(address, community: Community):
+def generate_stamp_expired_notifications(
+    address, community: Community, since: Optional[datetime] = None
+):
     """
     Generate stamp expired notifications for a specific address
+
+    If `since` is set and the stamps of the address have not changed since then,
+    only the stamps that expired since then are considered. Otherwise all the
+    expired stamps are, and the notifications of the stamps that have been
+    refreshed are invalidated.
     """
     current_date = timezone.now()
 
@@ -19,19 +29,28 @@ def generate_stamp_expired_notifications(address, community: Community):
         address=address, deleted_at__isnull=True, expiration_date__lt=current_date
     )
 
-    # Get all notification to which user has not yet reacted
-    existing_notifications_with_no_status = Notification.objects.filter(
-        type="stamp_expiry",
-        is_active=True,
-        eth_address=address,
-        notificationstatus__isnull=True,
-    )
-    existing_notifications_by_id = {
-        n.notification_id: n for n in existing_notifications_with_no_status
-    }
+    if (
+        since is not None
+        and not CeramicCache.objects.filter(
+            address=address, updated_at__gte=since
+        ).exists()
+    ):
+        ceramic_cache = ceramic_cache.filter(expiration_date__gte=since)
+        existing_notifications_by_id = None
+    else:
+        # Get all notification to which user has not yet reacted
+        existing_notifications_with_no_status = Notification.objects.filter(
+            type="stamp_expiry",
+            is_active=True,
+            eth_address=address,
+            notificationstatus__isnull=True,
+        )
+        existing_notifications_by_id = dict(
+            existing_notifications_with_no_status.values_list("notification_id", "id")
+        )
 
     weights = handle_get_scorer_weights(community.id)
-    notifications_to_create = []
+    notifications = {}
     for cc in ceramic_cache:
         # Ideally we would move this filtering to the UI ...
         stamp_weight = weights.get(cc.provider)
@@ -49,30 +68,24 @@ def generate_stamp_expired_notifications(address, community: Community):
                 }
             )
             notification_id = hashlib.sha256(encoded_data).hexdigest()
+            notifications[notification_id] = Notification(
+                notification_id=notification_id,
+                type="stamp_expiry",
+                is_active=True,
+                content=f"Your {cc.provider} stamp has expired. Please reverify to keep your Passport up to date.",
+                link=cc.provider,
+                eth_address=address,
+            )
 
-            notification_exists = Notification.objects.filter(
-                notification_id=notification_id
-            ).exists()
-
-            if not notification_exists:
-                notifications_to_create.append(
-                    Notification(
-                        notification_id=notification_id,
-                        type="stamp_expiry",
-                        is_active=True,
-                        content=f"Your {cc.provider} stamp has expired. Please reverify to keep your Passport up to date.",
-                        link=cc.provider,
-                        eth_address=address,
-                    )
-                )
-            else:
-                if notification_id in existing_notifications_by_id:
-                    del existing_notifications_by_id[notification_id]
-
-    # Create the notifications in bulk
-    Notification.objects.bulk_create(notifications_to_create)
+    create_missing_notifications(notifications)
 
-    # Invalidate existing notifications that are still in existing_notifications_by_id,
-    # the user has refreshed the stamp
-    for _, notification in existing_notifications_by_id.items():
-        notification.delete()
+    if existing_notifications_by_id:
+        # Invalidate the existing notifications of stamps that are no longer
+        # expired, the user has refreshed the stamp
+        Notification.objects.filter(
+            id__in=[
+                pk
+                for notification_id, pk in existing_notifications_by_id.items()
+                if notification_id not in notifications
+            ]
+        ).delete()
@@ -4,6 +4,7 @@ from typing import List
 import dag_cbor
 
 from passport_admin.models import Notification
+from passport_admin.notification_generators.utils import create_missing_notifications
 from passport_admin.schema import ChainSchema
 
 
@@ -11,6 +12,7 @@ def generate_on_chain_expired_notifications(address, expired_chains: List[ChainS
     """
     Generate on chain expired notifications for a specific address
     """
+    notifications = {}
     for chain in expired_chains:
         encoded_data = dag_cbor.encode(
             {
@@ -20,16 +22,12 @@ def generate_on_chain_expired_notifications(address, expired_chains: List[ChainS
             }
         )
         notification_id = hashlib.sha256(encoded_data).hexdigest()
+        notifications[notification_id] = Notification(
+            notification_id=notification_id,
+            type="on_chain_expiry",
+            is_active=True,
+            content=f"Your onchain Passport on {chain.name} has expired. Update now to maintain your active status.",
+            eth_address=address,
+        )
 
-        notification_exists = Notification.objects.filter(
-            notification_id=notification_id
-        ).exists()
-
-        if not notification_exists:
-            Notification.objects.create(
-                notification_id=notification_id,
-                type="on_chain_expiry",
-                is_active=True,
-                content=f"Your onchain Passport on {chain.name} has expired. Update now to maintain your active status.",
-                eth_address=address,
-            )
+    create_missing_notifications(notifications)
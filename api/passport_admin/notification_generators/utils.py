@@ -0,0 +1,27 @@
+from typing import Dict
+
+from passport_admin.models import Notification
+
+
+def create_missing_notifications(notifications: Dict[str, Notification]):
+    """
+    Create the notifications (keyed by notification_id) that do not exist yet,
+    with one query to check which exist and one bulk insert
+    """
+    if not notifications:
+        return
+
+    existing = set(
+        Notification.objects.filter(
+            notification_id__in=list(notifications)
+        ).values_list("notification_id", flat=True)
+    )
+    Notification.objects.bulk_create(
+        [
+            notification
+            for notification_id, notification in notifications.items()
+            if notification_id not in existing
+        ],
+        # A concurrent request may have created the same notifications
+        ignore_conflicts=True,
+    )
@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 import dag_cbor
 import pytest
 from django.conf import settings
+from django.core.cache import cache
 from django.test import Client
 from django.utils import timezone
 
@@ -1171,3 +1172,121 @@ class TestNotifications:
 
         res = response.json()
         assert len(res["items"]) == 1
+
+    def test_expired_stamps_cost_a_constant_number_of_queries(
+        self,
+        sample_token,
+        sample_address,
+        scorer_account,
+        community,
+        django_assert_max_num_queries,
+    ):
+        providers = [f"provider-{i}" for i in range(50)]
+        weighted_community = Community.objects.create(
+            name="Community 50",
+            account=scorer_account,
+            scorer=BinaryWeightedScorer.objects.create(
+                type=Scorer.Type.WEIGHTED_BINARY,
+                weights={provider: "1" for provider in providers},
+            ),
+        )
+        # The scorer weights are cached by community id
+        cache.clear()
+        for provider in providers:
+            CeramicCache.objects.create(
+                address=sample_address,
+                provider=provider,
+                stamp={"credentialSubject": {"hash": provider, "id": "some_id"}},
+                expiration_date=timezone.now() - timedelta(days=3),
+                issuance_date=timezone.now() - timedelta(days=30),
+                proof_value=provider,
+            )
+
+        with django_assert_max_num_queries(20):
+            response = client.post(
+                "/passport-admin/notifications",
+                {"scorer_id": weighted_community.id},
+                HTTP_AUTHORIZATION=f"Bearer {sample_token}",
+                content_type="application/json",
+            )
+
+        assert len(response.json()["items"]) == 20
+        assert Notification.objects.filter(type="stamp_expiry").count() == 50
+
+    def test_only_changes_since_the_last_run_are_considered(
+        self, sample_token, sample_address, community, existing_expired_stamp
+    ):
+        def get_notifications():
+            # Stamps last changed before the last run
+            CeramicCache.objects.filter(address=sample_address).update(
+                updated_at=timezone.now() - timedelta(days=1)
+            )
+            return client.post(
+                "/passport-admin/notifications",
+                {"scorer_id": community.id},
+                HTTP_AUTHORIZATION=f"Bearer {sample_token}",
+                content_type="application/json",
+            ).json()["items"]
+
+        assert len(get_notifications()) == 1
+
+        # Stamps that expired before the last run are not considered again
+        Notification.objects.all().delete()
+        stamp = CeramicCache.objects.create(
+            address=sample_address,
+            provider="provider-2",
+            stamp={"credentialSubject": {"hash": "hash", "id": "some_id"}},
+            expiration_date=timezone.now() + timedelta(days=3),
+            issuance_date=timezone.now() - timedelta(days=30),
+            proof_value="proof",
+        )
+        assert get_notifications() == []
+
+        # Stamps that expired since the last run are
+        CeramicCache.objects.filter(id=stamp.id).update(
+            expiration_date=timezone.now() - timedelta(seconds=1)
+        )
+
+        assert [n["link"] for n in get_notifications()] == ["provider-2"]
+
+    def test_general_notifications_use_the_status_of_the_address(
+        self, sample_token, sample_address, community
+    ):
+        other_address = "0x0000000000000000000000000000000000000001"
+        read, deleted, deleted_by_other = [
+            Notification.objects.create(
+                notification_id=f"general_{i}",
+                type="custom",
+                is_active=True,
+                content=f"Hello! This is a general notification {i}",
+                eth_address=None,
+                community=community,
+            )
+            for i in range(3)
+        ]
+        NotificationStatus.objects.create(
+            notification=read, is_read=True, eth_address=sample_address
+        )
+        NotificationStatus.objects.create(
+            notification=read, is_read=False, eth_address=other_address
+        )
+        NotificationStatus.objects.create(
+            notification=deleted, is_deleted=True, eth_address=sample_address
+        )
+        NotificationStatus.objects.create(
+            notification=deleted_by_other, is_deleted=True, eth_address=other_address
+        )
+
+        response = client.post(
+            "/passport-admin/notifications",
+            {"scorer_id": community.id},
+            HTTP_AUTHORIZATION=f"Bearer {sample_token}",
+            content_type="application/json",
+        )
+
+        assert [
+            (n["notification_id"], n["is_read"]) for n in response.json()["items"]
+        ] == [
+            ("general_2", False),
+            ("general_0", True),
+        ]
@@ -20,14 +20,10 @@ def get_did(address, network="1"):
     return (f"did:pkh:eip155:{network}:{address}").lower()
 
 
-async def aget_passport(address: str = "") -> Dict:
-    db_stamp_list = CeramicCache.objects.filter(
-        address=address, deleted_at__isnull=True, revocation__isnull=True
-    )
-
+def get_latest_stamps(db_stamps) -> List[Dict]:
     stamps_by_provider = dict()
 
-    async for stamp in db_stamp_list:
+    for stamp in db_stamps:
         if stamp.provider not in stamps_by_provider:
             stamps_by_provider[stamp.provider] = []
 
@@ -45,10 +41,32 @@ async def aget_passport(address: str = "") -> Dict:
 
         latest_stamps.append(latest_stamp)
 
+    return [{"provider": s.provider, "credential": s.stamp} for s in latest_stamps]
+
+
+async def aget_passport(address: str = "") -> Dict:
+    db_stamp_list = CeramicCache.objects.filter(
+        address=address, deleted_at__isnull=True, revocation__isnull=True
+    )
+
+    return {"stamps": get_latest_stamps([stamp async for stamp in db_stamp_list])}
+
+
+async def aget_passports(addresses: List[str]) -> Dict[str, Dict]:
+    """
+    Same as `aget_passport` for several addresses, loaded with a single query
+    """
+    db_stamp_list = CeramicCache.objects.filter(
+        address__in=addresses, deleted_at__isnull=True, revocation__isnull=True
+    )
+
+    stamps_by_address = {address: [] for address in addresses}
+    async for stamp in db_stamp_list:
+        stamps_by_address[stamp.address].append(stamp)
+
     return {
-        "stamps": [
-            {"provider": s.provider, "credential": s.stamp} for s in latest_stamps
-        ]
+        address: {"stamps": get_latest_stamps(stamps)}
+        for address, stamps in stamps_by_address.items()
     }
 
 
@@ -17,6 +17,7 @@ from django.utils.timesince import timesince
 from registry.api.schema import SubmitPassportPayload
 from registry.api.v1 import ahandle_submit_passport
 from registry.models import (
+    BackfillCheckpoint,
     BatchModelScoringRequest,
     BatchModelScoringRequestItem,
     Event,
@@ -26,6 +27,7 @@ from registry.models import (
     HumanPointsCommunityQualifiedUsers,
     HumanPointsConfig,
     HumanPointsMultiplier,
+    HumanPointsSummary,
     Passport,
     Score,
     Stamp,
@@ -638,6 +640,33 @@ class HumanPointsMultiplierAdmin(ScorerModelAdmin):
     ordering = ["address"]
 
 
+@admin.register(HumanPointsSummary)
+class HumanPointsSummaryAdmin(ScorerModelAdmin):
+    list_display = ["address", "total_points", "multiplier", "is_eligible", "stale"]
+    list_filter = ["is_eligible", "stale"]
+    search_fields = ["address"]
+    ordering = ["address"]
+    readonly_fields = ["generation", "updated_at"]
+
+
+@admin.register(BackfillCheckpoint)
+class BackfillCheckpointAdmin(ScorerModelAdmin):
+    list_display = [
+        "name",
+        "partition",
+        "start_id",
+        "end_id",
+        "last_id",
+        "num_processed",
+        "completed_at",
+        "updated_at",
+    ]
+    list_filter = ["name"]
+    search_fields = ["name"]
+    ordering = ["name", "partition"]
+    readonly_fields = ["updated_at"]
+
+
 @admin.register(HumanPointsConfig)
 class HumanPointsConfigAdmin(ScorerModelAdmin):
     list_display = ["action_display", "points", "active"]
@@ -169,6 +169,20 @@ class CursorPaginatedHistoricalScoreResponse(Schema):
     items: List[DetailedScoreResponse]
 
 
+class ScoreChange(Schema):
+    address: str
+    score: Optional[str]
+    last_score_timestamp: Optional[str]
+    expiration_date: Optional[str]
+    evidence: Optional[ThresholdScoreEvidenceResponse]
+
+
+class ScoreChangesResponse(Schema):
+    cursor: int
+    has_more: bool
+    items: List[ScoreChange]
+
+
 class SimpleScoreResponse(Schema):
     address: str
     score: Decimal  # The score should be represented as string as it will be a decimal number
@@ -1,13 +1,16 @@
+import asyncio
+from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import List
-from urllib.parse import urljoin
+from typing import AsyncIterator, List, Optional
 
 import django_filters
-import requests
 from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from ninja import Router
 from ninja.pagination import paginate
 from ninja_extra.exceptions import APIException
@@ -25,12 +28,14 @@ from account.models import (
 )
 from ceramic_cache.models import CeramicCache
 from registry.api.schema import (
+    CursorPaginatedScoreResponse,
     CursorPaginatedStampCredentialResponse,
     DetailedScoreResponse,
     ErrorMessageResponse,
     GenericCommunityPayload,
     GenericCommunityResponse,
     GtcEventsResponse,
+    ScoreChangesResponse,
     SigningMessageResponse,
     StampDisplayResponse,
     SubmitPassportPayload,
@@ -52,6 +57,7 @@ from registry.exceptions import (
     InvalidAddressException,
     InvalidAPIKeyPermissions,
     InvalidCommunityScoreRequestException,
+    InvalidCursorException,
     InvalidLimitException,
     InvalidNonceException,
     InvalidOrderByFieldException,
@@ -62,7 +68,8 @@ from registry.exceptions import (
     api_get_object_or_404,
 )
 from registry.filters import GTCStakeEventsFilter
-from registry.models import GTCStakeEvent, Passport, Score
+from registry.models import Event, GTCStakeEvent, Passport, Score
+from registry.stamp_metadata import stamp_metadata_store
 from registry.utils import (
     decode_cursor,
     encode_cursor,
@@ -86,8 +93,6 @@ Examples of valid values for `timestamp`: \n
 """
 
 
-METADATA_URL = urljoin(settings.PASSPORT_PUBLIC_URL, "stampMetadata.json")
-
 log = logging.getLogger(__name__)
 # api = NinjaExtraAPI(urls_namespace="registry")
 router = Router()
@@ -465,6 +470,334 @@ def get_scores(
         raise e
 
 
+# Fields of the scores listed by `get_scores_by_cursor` and `export_scores`
+SCORE_LISTING_FIELDS = (
+    "id",
+    "passport__address",
+    "score",
+    "status",
+    "last_score_timestamp",
+    "expiration_date",
+    "evidence",
+    "error",
+    "stamp_scores",
+)
+
+SCORE_EXPORT_CHUNK_SIZE = 1000
+
+
+def get_scores_for_listing(
+    scorer_id: int,
+    account: Account,
+    last_score_timestamp__gt: str,
+    last_score_timestamp__gte: str,
+):
+    """
+    Scores of a community, ordered by (last_score_timestamp, id) for keyset
+    pagination. Scores that have not been calculated yet (without a
+    last_score_timestamp) are not listed.
+    """
+    user_community = get_scorer_by_id(scorer_id, account)
+    scores = with_read_db(Score).filter(
+        passport__community__id=user_community.pk,
+        last_score_timestamp__isnull=False,
+    )
+    scores = ScoreFilter(
+        {
+            "last_score_timestamp__gt": last_score_timestamp__gt,
+            "last_score_timestamp__gte": last_score_timestamp__gte,
+        },
+        queryset=scores,
+    ).qs
+    return scores.order_by("last_score_timestamp", "id").values_list(
+        *SCORE_LISTING_FIELDS
+    )
+
+
+def get_scores_after(scores, last_score_timestamp: datetime, id_: int):
+    # The redundant `__gte` condition lets the database start an index range
+    # scan at the cursor, so that the cost of a page does not depend on its depth
+    return scores.filter(last_score_timestamp__gte=last_score_timestamp).filter(
+        Q(last_score_timestamp__gt=last_score_timestamp)
+        | Q(last_score_timestamp=last_score_timestamp, id__gt=id_)
+    )
+
+
+def score_listing_item(row) -> dict:
+    """
+    Same representation as `DetailedScoreResponse`, built without validating
+    each score through the schema
+    """
+    (
+        _,
+        address,
+        score,
+        status,
+        last_score_timestamp,
+        expiration_date,
+        evidence,
+        error,
+        stamp_scores,
+    ) = row
+    return {
+        "address": address,
+        "score": score,
+        "status": status,
+        "last_score_timestamp": last_score_timestamp.isoformat(),
+        "expiration_date": expiration_date.isoformat() if expiration_date else None,
+        "evidence": (
+            {
+                "type": evidence["type"],
+                "success": evidence["success"],
+                "rawScore": float(evidence["rawScore"]),
+                "threshold": float(evidence["threshold"]),
+            }
+            if evidence
+            else None
+        ),
+        "error": error,
+        "stamp_scores": stamp_scores or {},
+    }
+
+
+@router.get(
+    "/scores/{int:scorer_id}",
+    auth=ApiKey(),
+    response={
+        200: CursorPaginatedScoreResponse,
+        401: ErrorMessageResponse,
+        400: ErrorMessageResponse,
+        404: ErrorMessageResponse,
+    },
+    summary="Retrieve the Passport scores for all submitted addresses, with cursor pagination",
+    description="""Use this endpoint to fetch the scores for all addresses that are associated with a scorer, for example to keep them in sync
+
+This API will return a `CursorPaginatedScoreResponse` with a maximum of 1000 scores per request (`limit`), ordered by `last_score_timestamp` (oldest first).
+Follow the `next` URL to fetch the next page, until it is `null`. Unlike `offset` pagination, fetching a page takes the same time regardless of its position.
+
+Only scores that have been calculated (with a `last_score_timestamp`) are returned.
+The `last_score_timestamp__gt` and `last_score_timestamp__gte` query parameters are expected to be ISO 8601 formatted timestamps, and can be used to resume syncing from a given time.
+""",
+)
+@track_apikey_usage(track_response=False)
+def get_scores_by_cursor(
+    request,
+    scorer_id: int,
+    token: str = "",
+    limit: int = 1000,
+    last_score_timestamp__gt: str = "",
+    last_score_timestamp__gte: str = "",
+) -> CursorPaginatedScoreResponse:
+    check_rate_limit(request)
+    if limit > 1000 or limit < 1:
+        raise InvalidLimitException()
+
+    if not request.api_key.read_scores:
+        raise InvalidAPIKeyPermissions()
+
+    scores = get_scores_for_listing(
+        scorer_id, request.auth, last_score_timestamp__gt, last_score_timestamp__gte
+    )
+
+    if token:
+        try:
+            cursor = decode_cursor(token)
+            scores = get_scores_after(
+                scores, datetime.fromisoformat(cursor["ts"]), int(cursor["id"])
+            )
+        except Exception:
+            raise InvalidCursorException()
+
+    # Fetch one more score than needed, to know whether there is a next page
+    rows = list(scores[: limit + 1])
+    has_more_scores = len(rows) > limit
+    rows = rows[:limit]
+
+    next_url = None
+    if has_more_scores:
+        last_id, _, _, _, last_score_timestamp = rows[-1][:5]
+        query_kwargs = {
+            "token": encode_cursor(ts=last_score_timestamp.isoformat(), id=last_id),
+            "limit": limit,
+        }
+        if last_score_timestamp__gt:
+            query_kwargs["last_score_timestamp__gt"] = last_score_timestamp__gt
+        if last_score_timestamp__gte:
+            query_kwargs["last_score_timestamp__gte"] = last_score_timestamp__gte
+        domain = request.build_absolute_uri("/")[:-1]
+        next_url = f"""{domain}{
+            reverse_lazy_with_query(
+                "registry:get_scores_by_cursor",
+                args=[scorer_id],
+                query_kwargs=query_kwargs,
+            )
+        }"""
+
+    return CursorPaginatedScoreResponse(
+        next=next_url, prev=None, items=[score_listing_item(row) for row in rows]
+    )
+
+
+@router.get(
+    "/scores/{int:scorer_id}/export",
+    auth=ApiKey(),
+    response={
+        200: None,
+        401: ErrorMessageResponse,
+        400: ErrorMessageResponse,
+        404: ErrorMessageResponse,
+    },
+    summary="Export the Passport scores for all submitted addresses as NDJSON",
+    description="""Use this endpoint to download the scores of all the addresses that are associated with a scorer in a single request.
+
+The response is streamed as newline delimited JSON (`application/x-ndjson`): one score per line, with the same fields as `DetailedScoreResponse`, ordered by `last_score_timestamp` (oldest first).
+
+Only scores that have been calculated (with a `last_score_timestamp`) are returned.
+The `last_score_timestamp__gt` and `last_score_timestamp__gte` query parameters are expected to be ISO 8601 formatted timestamps.
+""",
+)
+@track_apikey_usage(track_response=False)
+def export_scores(
+    request,
+    scorer_id: int,
+    last_score_timestamp__gt: str = "",
+    last_score_timestamp__gte: str = "",
+):
+    check_rate_limit(request)
+
+    if not request.api_key.read_scores:
+        raise InvalidAPIKeyPermissions()
+
+    scores = get_scores_for_listing(
+        scorer_id, request.auth, last_score_timestamp__gt, last_score_timestamp__gte
+    )
+
+    # An async iterator is streamed by the ASGI handler as it is consumed,
+    # a sync one would be read entirely (see StreamingHttpResponse)
+    async def stream_scores() -> AsyncIterator[str]:
+        encoder = DjangoJSONEncoder()
+        page = scores
+        while True:
+            rows = [row async for row in page[:SCORE_EXPORT_CHUNK_SIZE]]
+            if not rows:
+                return
+            yield "".join(
+                encoder.encode(score_listing_item(row)) + "\n" for row in rows
+            )
+            if len(rows) < SCORE_EXPORT_CHUNK_SIZE:
+                return
+            last_id, _, _, _, last_score_timestamp = rows[-1][:5]
+            page = get_scores_after(scores, last_score_timestamp, last_id)
+
+    return StreamingHttpResponse(stream_scores(), content_type="application/x-ndjson")
+
+
+def score_change_item(address: str, data: dict) -> dict:
+    # Score update events hold the serialized score, either in the Django
+    # serialization format (under "fields") or directly
+    score = data.get("fields", data)
+    return {
+        "address": address,
+        "score": score.get("score"),
+        "last_score_timestamp": score.get("last_score_timestamp"),
+        "expiration_date": score.get("expiration_date"),
+        "evidence": score.get("evidence"),
+    }
+
+
+async def aget_score_update_events(
+    community_id: int, cursor: int, limit: int, wait: float
+) -> list:
+    """
+    Score update events of a community after the `cursor` event id, ordered by
+    id. Polls for up to `wait` seconds until there are new events.
+    """
+    events = with_read_db(Event).filter(
+        community_id=community_id,
+        action=Event.Action.SCORE_UPDATE,
+        id__gt=cursor,
+    )
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while True:
+        settled_at = timezone.now() - timedelta(
+            seconds=settings.SCORE_CHANGES_SETTLE_TIME
+        )
+        rows = [
+            row
+            async for row in events.filter(created_at__lte=settled_at)
+            .order_by("id")
+            .values_list("id", "address", "data")[: limit + 1]
+        ]
+        remaining = deadline - loop.time()
+        if rows or remaining <= 0:
+            return rows
+        await asyncio.sleep(min(settings.SCORE_CHANGES_POLL_INTERVAL, remaining))
+
+
+@router.get(
+    "/scores/{int:scorer_id}/changes",
+    auth=aapi_key,
+    response={
+        200: ScoreChangesResponse,
+        401: ErrorMessageResponse,
+        400: ErrorMessageResponse,
+        404: ErrorMessageResponse,
+    },
+    summary="Retrieve the score changes of a scorer since a cursor",
+    description=f"""Use this endpoint to follow the score updates of the addresses that are associated with a scorer, instead of polling the scores.
+
+Call it without a `cursor` to get the current `cursor`, then call it with the last returned `cursor` to get the scores that changed since (at most `limit` changes, up to 1000).
+Each address is listed once per response, with its latest score. If `has_more` is true, call it again right away to get the remaining changes.
+
+When there are no changes yet, the request waits up to `wait` seconds (at most {settings.SCORE_CHANGES_MAX_WAIT}) for new changes before returning an empty list.
+""",
+)
+@atrack_apikey_usage(track_response=False)
+async def a_get_score_changes(
+    request,
+    scorer_id: int,
+    cursor: Optional[int] = None,
+    limit: int = 1000,
+    wait: int = 0,
+) -> ScoreChangesResponse:
+    check_rate_limit(request)
+    if limit > 1000 or limit < 1:
+        raise InvalidLimitException()
+
+    if not request.api_key.read_scores:
+        raise InvalidAPIKeyPermissions()
+
+    community = await aget_scorer_by_id(scorer_id, request.auth)
+
+    if cursor is None:
+        latest_id = (
+            await with_read_db(Event)
+            .filter(community_id=community.pk, action=Event.Action.SCORE_UPDATE)
+            .order_by("-id")
+            .values_list("id", flat=True)
+            .afirst()
+        )
+        return ScoreChangesResponse(cursor=latest_id or 0, has_more=False, items=[])
+
+    wait = max(0, min(wait, settings.SCORE_CHANGES_MAX_WAIT))
+    rows = await aget_score_update_events(community.pk, cursor, limit, wait)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # Only keep the latest change of each address
+    changes = {}
+    for _, address, data in rows:
+        changes.pop(address, None)
+        changes[address] = score_change_item(address, data)
+
+    return ScoreChangesResponse(
+        cursor=rows[-1][0] if rows else cursor,
+        has_more=has_more,
+        items=list(changes.values()),
+    )
+
+
 @router.get(
     "/stamps/{str:address}",
     auth=ApiKey(),
@@ -624,34 +957,7 @@ def create_generic_scorer(request, payload: GenericCommunityPayload):
 
 
 def fetch_all_stamp_metadata() -> List[StampDisplayResponse]:
-    # Try to get the metadata from the cache
-    metadata = cache.get("metadata")
-
-    # If it's not in the cache, fetch it from the external API
-    if metadata is None:
-        try:
-            response = requests.get(METADATA_URL)
-            response.raise_for_status()
-
-            responseJson = response.json()
-
-            # Append base URL to icon URLs
-            metadata = [
-                StampDisplayResponse(
-                    **{
-                        **platformData,
-                        "icon": urljoin(
-                            settings.PASSPORT_PUBLIC_URL, platformData["icon"]
-                        ),
-                    }
-                )
-                for platformData in responseJson
-            ]
-
-            # Store the metadata in the cache, with a timeout of 1 hour
-            cache.set("metadata", metadata, 60 * 60)
-        except Exception:
-            log.exception("Error fetching external metadata")
+    metadata = stamp_metadata_store.get_all()
 
     if metadata is None:
         raise InternalServerErrorException("Error fetching external stamp metadata")
@@ -660,38 +966,13 @@ def fetch_all_stamp_metadata() -> List[StampDisplayResponse]:
 
 
 def fetch_stamp_metadata_for_provider(provider: str):
-    metadataByProvider = cache.get("metadataByProvider")
-
     try:
-        if metadataByProvider is None:
-            metadata = fetch_all_stamp_metadata()
-            metadataByProvider = {
-                stamp.name: {
-                    "name": stamp.name,
-                    "description": stamp.description,
-                    "hash": stamp.hash,
-                    "group": group.name,
-                    "platform": {
-                        "name": platform.name,
-                        "id": platform.id,
-                        "icon": platform.icon,
-                        "description": platform.description,
-                        "connectMessage": platform.connectMessage,
-                    },
-                }
-                for platform in metadata
-                for group in platform.groups
-                for stamp in group.stamps
-            }
-            cache.set("metadataByProvider", metadataByProvider, 60 * 60)
-    except Exception:
-        log.exception("Error fetching external metadata")
+        return stamp_metadata_store.get_for_provider(provider)
+    except LookupError:
         raise InternalServerErrorException(
             "Error fetching external stamp metadata for provider " + provider
         )
 
-    return metadataByProvider.get(provider)
-
 
 @router.get(
     "/stamp-metadata",
@@ -1,24 +1,24 @@
+import asyncio
 import copy
+import hashlib
+import json
+from contextlib import asynccontextmanager, nullcontext
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Dict, List, Set, TypedDict
+from typing import Dict, List, Optional, Set, TypedDict
 
 from django.conf import settings
+from django.core.cache import cache
 from ninja_extra.exceptions import APIException
 
 import api_logging as logging
 from account.deduplication.lifo import alifo
 
 # --- Deduplication Modules
-from account.models import AccountAPIKeyAnalytics, Community, Rules
+from account.models import AccountAPIKeyAnalytics, Community, Customization, Rules
 from reader.passport_reader import aget_passport, get_did
 from registry.exceptions import NoPassportException
-from registry.human_points_utils import (
-    acheck_and_award_misc_points,
-    acheck_and_award_scoring_bonus,
-    arecord_passing_score,
-    arecord_stamp_actions,
-)
+from registry.human_points_utils import aaward_human_points
 from registry.models import Passport, Score, Stamp
 from registry.utils import get_utc_time, validate_credential, verify_issuer
 
@@ -82,6 +82,105 @@ async def aload_passport_data(address: str) -> Dict:
     return passport_data
 
 
+async def aget_weights_version(scorer, community_id: int) -> str:
+    """
+    Returns a digest of everything that determines the weight of a stamp for
+    this scorer: the weight table, the threshold and the customization's
+    dynamic weights (allow lists, custom credentials)
+    """
+    weights = dict(scorer.weights or {})
+    try:
+        customization = await Customization.objects.aget(scorer_id=community_id)
+        weights.update(await customization.aget_customization_dynamic_weights())
+    except Customization.DoesNotExist:
+        pass
+
+    weights_table = {
+        "weights": {provider: str(weight) for provider, weight in weights.items()},
+        "threshold": str(scorer.threshold),
+    }
+    return hashlib.sha256(
+        json.dumps(weights_table, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def get_passport_fingerprint(passport_data: dict, weights_version: str) -> str:
+    """
+    Computes the fingerprint of the scoring inputs for a passport: the proof
+    values of the loaded stamps, the weights version and the earliest stamp
+    expiry. If the fingerprint did not change since the last score, re-running
+    the scoring pipeline would produce the same result.
+    """
+    proofs = sorted(
+        (
+            stamp["provider"],
+            # Fall back to the whole credential for stamps without a proof value
+            stamp["credential"].get("proof", {}).get("proofValue")
+            or json.dumps(stamp["credential"], sort_keys=True),
+        )
+        for stamp in passport_data.get("stamps", [])
+    )
+    expiration_dates = [
+        stamp["credential"].get("expirationDate", "")
+        for stamp in passport_data.get("stamps", [])
+    ]
+    fingerprint_data = {
+        "stamps": proofs,
+        "weights_version": weights_version,
+        "earliest_expiration_date": min(expiration_dates, default=None),
+    }
+    return hashlib.sha256(
+        json.dumps(fingerprint_data, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def get_fingerprint_cache_key(score: Score) -> str:
+    return f"passport_fingerprint:{score.pk}"
+
+
+async def aset_score_fingerprint(score: Score, fingerprint: str) -> None:
+    """
+    Stores the fingerprint of the inputs of the score that has just been
+    computed, in the cache rather than on the score, as it is internal to the
+    scoring. It is stored with the timestamp of the score, so that a score
+    computed since by another code path does not match it.
+    """
+    await cache.aset(
+        get_fingerprint_cache_key(score),
+        {
+            "fingerprint": fingerprint,
+            "last_score_timestamp": score.last_score_timestamp.isoformat(),
+        },
+        timeout=settings.PASSPORT_FINGERPRINT_CACHE_TTL,
+    )
+
+
+async def ais_score_fresh(score: Score, fingerprint: str) -> bool:
+    """
+    Checks whether the stored score can be returned without re-scoring.
+
+    Scores containing deduplicated stamps are never considered fresh, as the
+    outcome depends on hash links claimed by other addresses which might
+    have expired in the meantime.
+    """
+    if score.pk is None or score.status != Score.Status.DONE:
+        return False
+
+    if score.expiration_date and score.expiration_date <= get_utc_time():
+        return False
+
+    if any(stamp.get("dedup") for stamp in (score.stamps or {}).values()):
+        return False
+
+    stored = await cache.aget(get_fingerprint_cache_key(score))
+    return (
+        stored is not None
+        and score.last_score_timestamp is not None
+        and stored["fingerprint"] == fingerprint
+        and stored["last_score_timestamp"] == score.last_score_timestamp.isoformat()
+    )
+
+
 async def acalculate_score(
     passport: Passport,
     community_id: int,
@@ -234,9 +333,67 @@ async def aupdate_passport(passport: Passport, deduped_passport_data) -> None:
         )
 
 
+class ClaimOrder:
+    """
+    Lets passports that are scored concurrently run their deduplication one at
+    a time, in a fixed order, so that the stamp hashes are claimed as if the
+    passports had been scored sequentially in that order.
+    """
+
+    def __init__(self, addresses: List[str]):
+        self._order = list(addresses)
+        self._position = 0
+        self._finished = set()
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def turn(self, address: str):
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self._order[self._position] == address
+            )
+        try:
+            yield
+        finally:
+            await self.release(address)
+
+    async def release(self, address: str):
+        """
+        Gives the turn to the next address. Addresses that do not get to the
+        deduplication (e.g. on errors) must be released too.
+        """
+        async with self._condition:
+            self._finished.add(address)
+            while (
+                self._position < len(self._order)
+                and self._order[self._position] in self._finished
+            ):
+                self._position += 1
+            self._condition.notify_all()
+
+
 async def ascore_passport(
-    community: Community, passport: Passport, address: str, score: Score
-):
+    community: Community,
+    passport: Passport,
+    address: str,
+    score: Score,
+    skip_if_fresh: bool = False,
+    passport_data: Optional[Dict] = None,
+    claim_order: Optional[ClaimOrder] = None,
+) -> bool:
+    """
+    Runs the scoring pipeline for the passport and updates `score` in place.
+
+    When `skip_if_fresh` is set, the passport fingerprint is stored for the
+    score and if it matches the one from the previous run the pipeline is
+    skipped, leaving `score` untouched. A score computed without it has a new
+    timestamp, which does not match the stored fingerprint.
+
+    `passport_data` can be passed if it has already been loaded, and
+    `claim_order` to deduplicate in turn with passports scored concurrently.
+
+    Returns True if the score has been (re-)computed, False if it was skipped.
+    """
     log.info(
         "score_passport request for community_id=%s, address='%s'",
         community.pk,
@@ -244,13 +401,32 @@ async def ascore_passport(
     )
 
     try:
-        passport_data = await aload_passport_data(address)
+        if passport_data is None:
+            passport_data = await aload_passport_data(address)
+
+        fingerprint = None
+        if skip_if_fresh:
+            scorer = await community.aget_scorer()
+            weights_version = await aget_weights_version(scorer, community.pk)
+            fingerprint = get_passport_fingerprint(passport_data, weights_version)
+
+            if await ais_score_fresh(score, fingerprint):
+                log.info(
+                    "Passport unchanged since last score, skipping rescore. community_id=%s, address='%s'",
+                    community.pk,
+                    address,
+                )
+                return False
+
         validated_passport_data = await avalidate_credentials(passport, passport_data)
-        (deduped_passport_data, clashing_stamps) = await aprocess_deduplication(
-            passport, community, validated_passport_data, score
-        )
+        async with claim_order.turn(address) if claim_order else nullcontext():
+            (deduped_passport_data, clashing_stamps) = await aprocess_deduplication(
+                passport, community, validated_passport_data, score
+            )
         await aupdate_passport(passport, deduped_passport_data)
         await acalculate_score(passport, community.pk, score, clashing_stamps)
+        if fingerprint:
+            await aset_score_fingerprint(score, fingerprint)
 
         # Human Points Program integration
         # Check if score is passing (all scorers now return 1 for pass, 0 for fail)
@@ -261,20 +437,12 @@ async def ascore_passport(
             and datetime.now(timezone.utc).timestamp()
             >= settings.HUMAN_POINTS_START_TIMESTAMP
         ):
-            # Record passing score for this community
-            await arecord_passing_score(address, community.pk)
-
-            # Award human points for valid stamps
-            await arecord_stamp_actions(
-                address, deduped_passport_data.get("stamps", [])
+            # Record the passing score and award the human points (stamps,
+            # scoring bonus, MetaMask OG, etc.)
+            await aaward_human_points(
+                address, community.pk, deduped_passport_data.get("stamps", [])
             )
 
-            # Check and award scoring bonus if qualified
-            await acheck_and_award_scoring_bonus(address, community.pk)
-
-            # Check and award miscellaneous points (MetaMask OG, etc.)
-            await acheck_and_award_misc_points(address)
-
     except APIException as e:
         log.error(
             "APIException when handling passport submission. passport='%s' community='%s'",
@@ -293,3 +461,8 @@ async def ascore_passport(
         )
         if passport:
             score.clear_on_error(str(e))
+    finally:
+        if claim_order:
+            await claim_order.release(address)
+
+    return True
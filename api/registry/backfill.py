@@ -0,0 +1,279 @@
+"""
+Resumable, parallel backfills.
+
+A backfill command subclasses `BackfillCommand` and declares:
+
+- `get_queryset`: the source records, which must have an integer primary key
+- `transform`: what to write for a batch of source records (defaults to the
+  records themselves)
+- `write`: how to write a batch, typically a `bulk_create` or `bulk_update`
+
+Alternatively `process_batch` can be overridden, for example to run a single
+UPDATE statement over the primary key range of the batch.
+
+The primary key range of the source records is split into `--workers`
+partitions, processed in parallel (one thread per partition). Each partition
+is read in batches of `--batch-size` records ordered by primary key, and its
+progress (the last primary key processed) is stored in a `BackfillCheckpoint`
+in the same transaction as the writes of the batch. Running the command again
+(with the same options, see `get_backfill_key`) resumes the unfinished
+partitions and the last, open ended, partition, which picks up the records
+created since. `--restart` discards the checkpoints and starts over.
+
+Before each batch, the workers wait while the replication lag of one of the
+`BACKFILL_REPLICA_DATABASES` exceeds `BACKFILL_MAX_REPLICA_LAG` seconds.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.models import Max, Min, QuerySet
+from django.utils import timezone
+
+from registry.models import BackfillCheckpoint
+
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN pg_is_in_recovery() THEN
+        COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    ELSE 0
+END
+"""
+
+
+def get_replica_lag(alias: str) -> float:
+    """
+    Return the replication lag (in seconds) of the database `alias`, 0 if it is
+    not a postgres replica
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(REPLICA_LAG_QUERY)
+        return float(cursor.fetchone()[0])
+
+
+def split_range(start_id: int, end_id: int, num_partitions: int) -> List[tuple]:
+    """
+    Split the (inclusive) range [start_id, end_id] into at most `num_partitions`
+    contiguous ranges. The last range is open ended (its end is None).
+    """
+    size = max((end_id - start_id + 1) // num_partitions, 1)
+    ranges = []
+    for partition in range(num_partitions):
+        partition_start = start_id + partition * size
+        if partition_start > end_id:
+            break
+        ranges.append((partition_start, partition_start + size - 1))
+    ranges[-1] = (ranges[-1][0], None)
+    return ranges
+
+
+class BackfillCommand(BaseCommand):
+    batch_size = 1000
+    # Seconds to sleep between the batches of a worker
+    sleep = 0
+
+    @property
+    def backfill_name(self) -> str:
+        return self.__module__.rsplit(".", 1)[-1]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=self.batch_size,
+            help=f"Number of records processed in each batch (default: {self.batch_size})",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of partitions processed in parallel, when starting a backfill",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=self.sleep,
+            help="Seconds to sleep between batches",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Discard the checkpoints of a previous run and start over",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show what would be done without making changes",
+        )
+
+    def get_backfill_key(self, options) -> str:
+        """
+        Name of the checkpoints of a run. Commands with options that select the
+        backfilled records include them, so that a run with other options does
+        not resume the checkpoints of a previous one.
+        """
+        return self.backfill_name
+
+    def get_queryset(self, options) -> QuerySet:
+        raise NotImplementedError
+
+    def transform(self, objects: list) -> list:
+        return objects
+
+    def write(self, items: list):
+        raise NotImplementedError
+
+    def process_batch(self, objects: list):
+        self.write(self.transform(objects))
+
+    def wait_for_replicas(self):
+        while True:
+            lag = max(
+                (
+                    get_replica_lag(alias)
+                    for alias in settings.BACKFILL_REPLICA_DATABASES
+                ),
+                default=0,
+            )
+            if lag <= settings.BACKFILL_MAX_REPLICA_LAG:
+                return
+            self.report(
+                self.style.WARNING(
+                    f"Replication lag is {lag:.0f}s, pausing for "
+                    f"{settings.BACKFILL_REPLICA_LAG_WAIT}s"
+                )
+            )
+            time.sleep(settings.BACKFILL_REPLICA_LAG_WAIT)
+
+    def report(self, message: str):
+        with self._lock:
+            self.stdout.write(message)
+
+    def get_checkpoints(self, queryset, options) -> List[BackfillCheckpoint]:
+        backfill_key = self.get_backfill_key(options)
+        checkpoints = BackfillCheckpoint.objects.filter(name=backfill_key)
+        if options["restart"] and not options["dry_run"]:
+            checkpoints.delete()
+
+        existing = list(checkpoints.order_by("partition"))
+        if existing and not options["restart"]:
+            last_checkpoint = existing[-1]
+            if last_checkpoint.completed_at is not None:
+                # Records created since the backfill completed are after the
+                # last id of the open ended last partition
+                if all(checkpoint.completed_at for checkpoint in existing):
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"Backfill {backfill_key} already completed, only "
+                            f"processing the records after id {last_checkpoint.last_id} "
+                            "(use --restart to start over)"
+                        )
+                    )
+                last_checkpoint.completed_at = None
+            return existing
+
+        bounds = queryset.aggregate(start_id=Min("pk"), end_id=Max("pk"))
+        if bounds["start_id"] is None:
+            return []
+
+        new_checkpoints = [
+            BackfillCheckpoint(
+                name=backfill_key,
+                partition=partition,
+                start_id=start_id,
+                end_id=end_id,
+            )
+            for partition, (start_id, end_id) in enumerate(
+                split_range(bounds["start_id"], bounds["end_id"], options["workers"])
+            )
+        ]
+        if options["dry_run"]:
+            return new_checkpoints
+        return BackfillCheckpoint.objects.bulk_create(new_checkpoints)
+
+    def process_partition(self, queryset, checkpoint: BackfillCheckpoint, options):
+        try:
+            while True:
+                if checkpoint.last_id is None:
+                    batch_queryset = queryset.filter(pk__gte=checkpoint.start_id)
+                else:
+                    batch_queryset = queryset.filter(pk__gt=checkpoint.last_id)
+                if checkpoint.end_id is not None:
+                    batch_queryset = batch_queryset.filter(pk__lte=checkpoint.end_id)
+                objects = list(batch_queryset.order_by("pk")[: options["batch_size"]])
+                if not objects:
+                    break
+
+                checkpoint.last_id = objects[-1].pk
+                checkpoint.num_processed += len(objects)
+                if not options["dry_run"]:
+                    self.wait_for_replicas()
+                    with transaction.atomic():
+                        self.process_batch(objects)
+                        checkpoint.save()
+
+                with self._lock:
+                    self._num_processed += len(objects)
+                    rate = self._num_processed / (time.monotonic() - self._started_at)
+                    self.stdout.write(
+                        f"Partition {checkpoint.partition}: up to id {checkpoint.last_id}, "
+                        f"{self._num_processed} records processed ({rate:.0f} records/s)"
+                    )
+
+                if options["sleep"]:
+                    time.sleep(options["sleep"])
+
+            checkpoint.completed_at = timezone.now()
+            if not options["dry_run"]:
+                checkpoint.save()
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
+
+    def handle(self, *args, **options):
+        self._lock = threading.Lock()
+        self._num_processed = 0
+        self._started_at = time.monotonic()
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("DRY RUN - No changes will be made"))
+
+        backfill_key = self.get_backfill_key(options)
+        queryset = self.get_queryset(options)
+        pending = [
+            checkpoint
+            for checkpoint in self.get_checkpoints(queryset, options)
+            if checkpoint.completed_at is None
+        ]
+        self.stdout.write(
+            f"Backfill {backfill_key}: {len(pending)} partitions to process"
+        )
+
+        if len(pending) == 1:
+            self.process_partition(queryset, pending[0], options)
+        elif pending:
+            with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                futures = [
+                    executor.submit(
+                        self.process_partition, queryset, checkpoint, options
+                    )
+                    for checkpoint in pending
+                ]
+                for future in futures:
+                    future.result()
+
+        elapsed = time.monotonic() - self._started_at
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Backfill {backfill_key} complete: {self._num_processed} "
+                f"records processed in {elapsed:.0f}s"
+            )
+        )
@@ -53,6 +53,11 @@ class InvalidLimitException(APIException):
     default_detail = "Invalid limit."
 
 
+class InvalidCursorException(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = "Invalid pagination token."
+
+
 class CreatedAtIsRequiredException(APIException):
     status_code = status.HTTP_400_BAD_REQUEST
     default_detail = "You must provide created_at as a query param."
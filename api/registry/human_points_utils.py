@@ -1,18 +1,24 @@
 """Utility functions for Human Points functionality"""
 
-from typing import Dict
+import json
+import time
+from typing import Dict, List, Optional, Set, Tuple
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import connection
-from django.db.models import F
+from django.db import connection, transaction
 
-from account.models import AddressList
+import api_logging as logging
+from account.address_list_index import get_address_list_index
 from registry.models import (
     HumanPoints,
     HumanPointsCommunityQualifiedUsers,
     HumanPointsConfig,
+    HumanPointsSummary,
 )
 
+log = logging.getLogger(__name__)
+
 # Map stamp providers to Human Points actions
 STAMP_PROVIDER_TO_ACTION = {
     "SelfStakingBronze": HumanPoints.Action.IDENTITY_STAKING_BRONZE,
@@ -28,10 +34,10 @@ STAMP_PROVIDER_TO_ACTION = {
 }
 
 
-def get_user_points_data(address: str) -> Dict:
+def compute_points_summaries(addresses: List[str]) -> Dict[str, HumanPointsSummary]:
     """
-    Get user's total points with breakdown using raw SQL for efficiency.
-    Returns total points, eligibility status, multiplier, and points breakdown.
+    Compute the total points, eligibility status, multiplier and points breakdown
+    of addresses, using raw SQL for efficiency.
     """
     # Single query to get total points, multiplier, and breakdown
     query = """
@@ -46,57 +52,137 @@ def get_user_points_data(address: str) -> Dict:
             ON hp.action = hpc.action AND hpc.active = true
         LEFT JOIN registry_humanpointsmultiplier hpm
             ON hp.address = hpm.address
-        WHERE hp.address = %s
+        WHERE hp.address IN %s
             AND hp.action != 'HIM'
         GROUP BY hp.address, hp.action, hp.chain_id
     """
 
-    total_points = 0
-    multiplier = 1
-    breakdown = {}
+    summaries = {
+        address: HumanPointsSummary(address=address, total_points=0, breakdown={})
+        for address in addresses
+    }
+    if not summaries:
+        return summaries
 
     with connection.cursor() as cursor:
-        cursor.execute(query, [address])
+        cursor.execute(query, [tuple(summaries)])
         rows = cursor.fetchall()
-        multiplier = rows[0][4] if rows else 1
 
-        for row in rows:
-            points = row[3]
-            total_points += points
-            chain_id = row[2]
-            breakdown_key = row[1]
+    for address, breakdown_key, chain_id, points, multiplier in rows:
+        summary = summaries[address]
+        summary.multiplier = multiplier
+        summary.total_points += points
+        breakdown = summary.breakdown
 
-            if chain_id:
-                breakdown[f"{breakdown_key}_{chain_id}"] = points
+        if chain_id:
+            breakdown[f"{breakdown_key}_{chain_id}"] = points
 
-            breakdown[breakdown_key] = (
-                points
-                if breakdown_key not in breakdown
-                else breakdown[breakdown_key] + points
-            )
+        breakdown[breakdown_key] = (
+            points
+            if breakdown_key not in breakdown
+            else breakdown[breakdown_key] + points
+        )
 
     # Check eligibility separately (single query)
-    is_eligible = HumanPointsCommunityQualifiedUsers.objects.filter(
-        address=address
-    ).exists()
+    eligible_addresses = set(
+        HumanPointsCommunityQualifiedUsers.objects.filter(
+            address__in=list(summaries)
+        ).values_list("address", flat=True)
+    )
+    for address, summary in summaries.items():
+        summary.is_eligible = address in eligible_addresses
+
+    return summaries
+
+
+REFRESH_SUMMARIES_SQL = f"""
+    UPDATE {HumanPointsSummary._meta.db_table} AS summary
+    SET
+        total_points = refreshed.total_points,
+        multiplier = refreshed.multiplier,
+        breakdown = refreshed.breakdown,
+        is_eligible = refreshed.is_eligible,
+        stale = false,
+        updated_at = now()
+    FROM unnest(
+        %s::varchar[], %s::bigint[], %s::integer[], %s::integer[], %s::jsonb[], %s::boolean[]
+    ) AS refreshed(address, generation, total_points, multiplier, breakdown, is_eligible)
+    WHERE summary.address = refreshed.address
+        AND summary.generation = refreshed.generation
+"""
+
+
+def refresh_points_summaries(addresses: List[str]) -> Dict[str, HumanPointsSummary]:
+    """
+    Recompute and store the points summaries of addresses.
+
+    The generation of each summary is read before computing the totals (missing
+    summaries are first created as stale), and the totals are only stored if
+    the generation is unchanged. A summary marked stale by a trigger in the
+    meantime is left stale, for the next rebuild.
+    """
+    generations = dict(
+        HumanPointsSummary.objects.filter(address__in=addresses).values_list(
+            "address", "generation"
+        )
+    )
+    missing = [address for address in addresses if address not in generations]
+    if missing:
+        HumanPointsSummary.objects.bulk_create(
+            [HumanPointsSummary(address=address, stale=True) for address in missing],
+            ignore_conflicts=True,
+        )
+        generations.update((address, 0) for address in missing)
+
+    summaries = compute_points_summaries(addresses)
+    for address, summary in summaries.items():
+        summary.generation = generations[address]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            REFRESH_SUMMARIES_SQL,
+            [
+                list(summaries),
+                [summary.generation for summary in summaries.values()],
+                [summary.total_points for summary in summaries.values()],
+                [summary.multiplier for summary in summaries.values()],
+                [json.dumps(summary.breakdown) for summary in summaries.values()],
+                [summary.is_eligible for summary in summaries.values()],
+            ],
+        )
+    return summaries
+
+
+def get_user_points_data(address: str) -> Dict:
+    """
+    Get user's total points with breakdown, from the points summary of the
+    address. Missing or stale summaries are computed without being stored, they
+    are rebuilt by `rebuild_human_points_summaries --stale-only`.
+    Returns total points, eligibility status, multiplier, and points breakdown.
+    """
+    address = address.lower()
+    summary = HumanPointsSummary.objects.filter(address=address).first()
+    if summary is None or summary.stale:
+        summary = compute_points_summaries([address])[address]
 
     return {
-        "total_points": total_points,
-        "is_eligible": is_eligible,
-        "multiplier": multiplier,
-        "breakdown": breakdown,
+        "total_points": summary.total_points,
+        "is_eligible": summary.is_eligible,
+        "multiplier": summary.multiplier,
+        "breakdown": summary.breakdown,
     }
 
 
-async def arecord_stamp_actions(address: str, valid_stamps: list) -> None:
+def get_stamp_awards(
+    address: str, valid_stamps: list, existing: Set[Tuple[str, str]]
+) -> List[HumanPoints]:
     """
-    Record Human Points actions based on valid stamps - optimized bulk version
+    The HumanPoints actions awarded for the valid stamps, that are not in
+    `existing` yet ((action, provider) pairs of the address).
     Uses provider as key for deduplication since nullifiers can rotate after 6 months
     """
-    from asgiref.sync import sync_to_async
-
-    # Collect all HumanPoints objects to create
-    objects_to_create = []
+    awards = []
+    awarded = set(existing)
 
     for stamp in valid_stamps:
         # Check for Human Keys
@@ -107,74 +193,167 @@ async def arecord_stamp_actions(address: str, valid_stamps: list) -> None:
         # Process Human Keys if we have at least one valid nullifier and a provider
         if isinstance(nullifiers, list) and any(nullifiers):
             credential_provider = credential_subject.get("provider")
-
-            if credential_provider:
-                # Check if this provider already exists in the database
-                existing_record = await HumanPoints.objects.filter(
-                    address=address,
-                    action=HumanPoints.Action.HUMAN_KEYS,
-                    provider=credential_provider,
-                ).afirst()
-
-                # Only create if no existing record for this provider
-                if not existing_record:
-                    # Use the latest valid nullifier (last one in array)
-                    latest_nullifier = next(
-                        (n for n in reversed(nullifiers) if n), None
-                    )
-                    if latest_nullifier:
-                        objects_to_create.append(
-                            HumanPoints(
-                                address=address,
-                                action=HumanPoints.Action.HUMAN_KEYS,
-                                tx_hash=latest_nullifier,
-                                provider=credential_provider,
-                            )
+            key = (HumanPoints.Action.HUMAN_KEYS, credential_provider)
+
+            # Only create if no existing record for this provider
+            if credential_provider and key not in awarded:
+                # Use the latest valid nullifier (last one in array)
+                latest_nullifier = next((n for n in reversed(nullifiers) if n), None)
+                if latest_nullifier:
+                    awarded.add(key)
+                    awards.append(
+                        HumanPoints(
+                            address=address,
+                            action=HumanPoints.Action.HUMAN_KEYS,
+                            tx_hash=latest_nullifier,
+                            provider=credential_provider,
                         )
+                    )
 
         # Check for provider-based actions
-        stamp_provider = stamp.get("provider")
-        action = STAMP_PROVIDER_TO_ACTION.get(stamp_provider)
-        if action:
-            objects_to_create.append(
-                HumanPoints(address=address, action=action, tx_hash="")
-            )
+        action = STAMP_PROVIDER_TO_ACTION.get(stamp.get("provider"))
+        if action and (action, "") not in awarded:
+            awarded.add((action, ""))
+            awards.append(HumanPoints(address=address, action=action, tx_hash=""))
 
-    # Bulk create all at once, let DB handle conflicts
-    if objects_to_create:
-        # sync_to_async needed - Django doesn't provide async bulk_create
-        await sync_to_async(HumanPoints.objects.bulk_create)(
-            objects_to_create, ignore_conflicts=True
-        )
+    return awards
 
 
-async def acheck_and_award_scoring_bonus(address: str, community_id: int) -> bool:
+class CappedAward:
     """
-    Check if user qualifies for scoring bonus (4+ passing scores)
-    Returns True if bonus was newly awarded
+    An action awarded to at most `cap` addresses. The cap is enforced by the
+    database: awards of the action are counted and inserted under a
+    transaction-level advisory lock, so that concurrent processes cannot
+    overshoot it. Once the cap has been reached, the awards are refused
+    without querying for HUMAN_POINTS_CAP_RECOUNT_AFTER seconds.
     """
-    # Check current passing scores count
-    qualified_count = await HumanPointsCommunityQualifiedUsers.objects.filter(
-        address=address
-    ).acount()
 
-    # Award bonus if qualified (let DB handle conflicts)
-    if qualified_count >= 4:
-        _, created = await HumanPoints.objects.aget_or_create(
-            address=address, action=HumanPoints.Action.SCORING_BONUS
-        )
-        return created
+    def __init__(self, action: str, cap: int):
+        self.action = action
+        self.cap = cap
+        self._reached_at: Optional[float] = None
+
+    def award(self, address: str) -> bool:
+        """
+        Awards the action to the address, returns False if the cap has been
+        reached
+        """
+        if (
+            self._reached_at is not None
+            and time.monotonic() - self._reached_at
+            <= settings.HUMAN_POINTS_CAP_RECOUNT_AFTER
+        ):
+            return False
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(hashtext(%s))",
+                    [f"human_points_cap:{self.action}"],
+                )
+            if HumanPoints.objects.filter(action=self.action).count() >= self.cap:
+                self._reached_at = time.monotonic()
+                return False
+            HumanPoints.objects.bulk_create(
+                [HumanPoints(address=address, action=self.action)],
+                ignore_conflicts=True,
+            )
+        return True
 
-    return False
 
+# Points awarded to the members of address lists: (list name, action, capped award)
+ADDRESS_LIST_AWARDS = [
+    (
+        "MetaMaskOG2",
+        HumanPoints.Action.METAMASK_OG_2,
+        CappedAward(HumanPoints.Action.METAMASK_OG_2, 5000),
+    ),
+    ("SeasonedPassportOGs", HumanPoints.Action.SEASONED_PASSPORT_OG, None),
+    ("TheChosenOnes", HumanPoints.Action.THE_CHOSEN_ONE, None),
+]
 
-async def arecord_passing_score(address: str, community_id: int) -> None:
+
+def award_human_points(address: str, community_id: int, valid_stamps: list) -> None:
     """
-    Record that an address achieved a passing score in a community
+    Award the Human Points of an address that achieved a passing score in a
+    community:
+
+    - record the passing score in the community
+    - the actions for the valid stamps
+    - the scoring bonus, once passing in 4+ communities
+    - miscellaneous points for the members of address lists (MetaMask OG, etc.)
+
+    The existing points of the address are loaded with a single query, and the
+    new ones are written with a single bulk insert (letting the DB handle
+    conflicts with concurrent awards), apart from the capped awards (see
+    `CappedAward`). The points summary of the address is refreshed when
+    anything was written.
     """
-    await HumanPointsCommunityQualifiedUsers.objects.aget_or_create(
-        address=address, community_id=community_id
+    address = address.lower()
+
+    # Record that an address achieved a passing score in a community
+    qualified_communities = set(
+        HumanPointsCommunityQualifiedUsers.objects.filter(address=address).values_list(
+            "community_id", flat=True
+        )
+    )
+    if community_id not in qualified_communities:
+        HumanPointsCommunityQualifiedUsers.objects.bulk_create(
+            [
+                HumanPointsCommunityQualifiedUsers(
+                    address=address, community_id=community_id
+                )
+            ],
+            ignore_conflicts=True,
+        )
+        qualified_communities.add(community_id)
+        changed = True
+    else:
+        changed = False
+
+    existing = set(
+        HumanPoints.objects.filter(address=address).values_list("action", "provider")
     )
+    awards = get_stamp_awards(address, valid_stamps, existing)
+
+    # Scoring bonus for 4+ passing scores
+    if (
+        len(qualified_communities) >= 4
+        and (HumanPoints.Action.SCORING_BONUS, "") not in existing
+    ):
+        awards.append(
+            HumanPoints(address=address, action=HumanPoints.Action.SCORING_BONUS)
+        )
+
+    for list_name, action, capped_award in ADDRESS_LIST_AWARDS:
+        if (
+            action == HumanPoints.Action.METAMASK_OG_2
+            and not settings.HUMAN_POINTS_MTA_ENABLED
+        ):
+            continue
+        if (action, "") in existing or address not in get_address_list_index(list_name):
+            continue
+        if capped_award:
+            changed = capped_award.award(address) or changed
+        else:
+            awards.append(HumanPoints(address=address, action=action))
+
+    if awards:
+        HumanPoints.objects.bulk_create(awards, ignore_conflicts=True)
+        changed = True
+
+    if changed:
+        refresh_points_summaries([address])
+
+
+async def aaward_human_points(
+    address: str, community_id: int, valid_stamps: list
+) -> None:
+    """
+    Award the Human Points for a passing score (see `award_human_points`), in
+    a single call to the sync thread
+    """
+    await sync_to_async(award_human_points)(address, community_id, valid_stamps)
 
 
 def get_possible_points_data(multiplier: int) -> Dict:
@@ -192,57 +371,3 @@ def get_possible_points_data(multiplier: int) -> Dict:
         "multiplier": multiplier,
     }
     return possible_points_data
-
-
-async def acheck_and_award_misc_points(address: str):
-    """
-    Check and award miscellaneous points (MetaMask OG, etc.) for qualifying addresses.
-
-    Args:
-        address: The address to check for eligibility
-    """
-    # Award MetaMask OG points if on list (limit 5000)
-    if settings.HUMAN_POINTS_MTA_ENABLED:
-        try:
-            mta_list = await AddressList.objects.aget(name="MetaMaskOG2")
-            # Check if address is on the list (case-insensitive)
-            if await mta_list.addresses.filter(address=address.lower()).aexists():
-                # Check if we've already awarded 5000 MetaMask OG points
-                mta_count = await HumanPoints.objects.filter(
-                    action=HumanPoints.Action.METAMASK_OG_2
-                ).acount()
-
-                if mta_count < 5000:
-                    # Award MetaMask OG points (will create or get existing)
-                    await HumanPoints.objects.aget_or_create(
-                        address=address.lower(), action=HumanPoints.Action.METAMASK_OG_2
-                    )
-        except AddressList.DoesNotExist:
-            # MetaMask OG list doesn't exist yet, skip MetaMask OG points
-            pass
-
-    # Award Seasoned Passport OG points if on list (no limit)
-    try:
-        sog_list = await AddressList.objects.aget(name="SeasonedPassportOGs")
-        # Check if address is on the list (case-insensitive)
-        if await sog_list.addresses.filter(address=address.lower()).aexists():
-            # Award Seasoned Passport OG points (will create or get existing)
-            await HumanPoints.objects.aget_or_create(
-                address=address.lower(), action=HumanPoints.Action.SEASONED_PASSPORT_OG
-            )
-    except AddressList.DoesNotExist:
-        # Seasoned Passport OG list doesn't exist yet, skip
-        pass
-
-    # Award The Chosen One points if on list (no limit)
-    try:
-        tco_list = await AddressList.objects.aget(name="TheChosenOnes")
-        # Check if address is on the list (case-insensitive)
-        if await tco_list.addresses.filter(address=address.lower()).aexists():
-            # Award The Chosen One points (will create or get existing)
-            await HumanPoints.objects.aget_or_create(
-                address=address.lower(), action=HumanPoints.Action.THE_CHOSEN_ONE
-            )
-    except AddressList.DoesNotExist:
-        # The Chosen One list doesn't exist yet, skip
-        pass
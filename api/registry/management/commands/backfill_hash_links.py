@@ -1,71 +1,50 @@
 from datetime import datetime, timezone
 
-from django.core.management.base import BaseCommand
-from tqdm import tqdm
-
+from registry.backfill import BackfillCommand
 from registry.models import HashScorerLink, Stamp
 
 
-class Command(BaseCommand):
+class Command(BackfillCommand):
     help = "Backfill stamps into hash link table"
 
     def add_arguments(self, parser):
-        parser.add_argument(
-            "--last-id", required=False, help="Starting ID, defaults to 0", default=0
-        )
+        super().add_arguments(parser)
         parser.add_argument(
             "--iso-timestamp",
             required=False,
-            help="Only include stamps expiring after and issued before this ISO timestamp (defaults to now)",
+            help="Only include stamps expiring after and issued before this ISO timestamp "
+            "(defaults to now). Pass the same timestamp to resume a backfill",
             default=datetime.now(timezone.utc).isoformat(),
         )
 
-    def handle(self, *args, **options):
-        last_id = options["last_id"]
+    def get_backfill_key(self, options):
+        return f"{self.backfill_name}:{options['iso_timestamp']}"
+
+    def get_queryset(self, options):
         iso_timestamp = options["iso_timestamp"]
-        self.stdout.write(self.style.SUCCESS(f'Starting ID "{last_id}"'))
         self.stdout.write(self.style.SUCCESS(f'ISO Timestamp "{iso_timestamp}"'))
 
-        query = (
+        return (
             Stamp.objects.filter(
                 credential__expirationDate__gt=iso_timestamp,
                 credential__issuanceDate__lt=iso_timestamp,
             )
             .select_related("passport")
-            .order_by("id")
+            .using("read_replica_0")
         )
 
-        last_id = 0
-        chunk_size = 1000
-
-        try:
-            with tqdm(
-                unit="items", unit_scale=None, desc="Processing objects"
-            ) as progress_bar:
-                has_more = True
-                while has_more:
-                    objects = list(
-                        query.filter(id__gt=last_id).using("read_replica_0")[
-                            :chunk_size
-                        ]
-                    )
-                    if objects:
-                        last_id = objects[-1].id
-                        hash_links = [
-                            HashScorerLink(
-                                hash=stamp.hash,
-                                address=stamp.passport.address,
-                                community=stamp.passport.community,
-                                expires_at=stamp.credential["expirationDate"],
-                            )
-                            for stamp in objects
-                        ]
-                        HashScorerLink.objects.using("default").bulk_create(
-                            hash_links, ignore_conflicts=True
-                        )
-                        progress_bar.update(len(objects))
-                    else:
-                        has_more = False
+    def transform(self, stamps):
+        return [
+            HashScorerLink(
+                hash=stamp.hash,
+                address=stamp.passport.address,
+                community=stamp.passport.community,
+                expires_at=stamp.credential["expirationDate"],
+            )
+            for stamp in stamps
+        ]
 
-        finally:
-            self.stdout.write(self.style.SUCCESS(f'Last ID "{last_id}"'))
+    def write(self, hash_links):
+        HashScorerLink.objects.using("default").bulk_create(
+            hash_links, ignore_conflicts=True
+        )
@@ -1,15 +1,50 @@
 from datetime import datetime, timedelta, timezone
-from io import BytesIO
 from urllib.parse import urlparse
 
 import boto3
-from dateutil.parser import parse as dateutil_parse
-from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import connection
 from tqdm import tqdm
 
-from ceramic_cache.models import CeramicCache
-from registry.models import Event, HashScorerLink
+from registry.models import Event
+from scorer.export_utils import S3MultipartUploadWriter
+
+# Addresses holding a valid stamp flagged by a deduplication event of the
+# community: either the address of the event (the address whose stamp was
+# deduplicated) or the original holder of the stamp hash, for the provider of
+# the event
+DEDUPLICATED_ADDRESSES_QUERY = """
+WITH deduplication_event AS (
+    SELECT
+        address,
+        data->>'provider' AS provider,
+        data->>'hash' AS hash
+    FROM registry_event
+    WHERE
+        community_id = %(community_id)s
+        AND action = %(action)s
+        AND created_at > %(created_after)s
+),
+flagged AS (
+    SELECT address, provider
+    FROM deduplication_event
+    UNION
+    SELECT link.address, deduplication_event.provider
+    FROM deduplication_event
+    JOIN registry_hashscorerlink link
+        ON link.community_id = %(community_id)s
+        AND link.hash = deduplication_event.hash
+)
+SELECT DISTINCT stamp.address
+FROM flagged
+JOIN ceramic_cache_ceramiccache stamp
+    ON stamp.address = flagged.address
+    AND stamp.provider = flagged.provider
+WHERE
+    stamp.deleted_at IS NULL
+    AND stamp.expiration_date > %(now)s
+ORDER BY stamp.address
+"""
 
 
 def write_csv_row(file, row):
@@ -46,90 +81,31 @@ class Command(BaseCommand):
         s3_folder = parsed_uri.path.strip("/")
         s3_key = f"{s3_folder}/{output_file}"
 
-        temp_csv = BytesIO()
-        unique_addresses = []
-        with tqdm(
-            unit="records", unit_scale=True, desc="Processing deduplication records"
-        ) as progress_bar:
-            last_id = 0
-            while True:
-                # Fetch a batch of records
-                records = Event.objects.filter(
-                    community_id=community_id,
-                    id__gt=last_id,
-                    action=Event.Action.LIFO_DEDUPLICATION,
-                    # limit to the last 3 months assuming any record that may exist would be expired anyways
-                    created_at__gt=three_months_ago,
-                ).order_by("id")[:batch_size]
-
-                if not records:
-                    break
-
-                flagged_providers = set(
-                    record.data.get("provider") for record in records
-                )
-
-                relevant_hash_scorer_links = HashScorerLink.objects.filter(
-                    community_id=community_id,
-                    hash__in=[
-                        record.data.get("hash")
-                        for record in records
-                        if record.data.get("hash")
-                    ],
-                )
-
-                original_holder_for_hash = {
-                    link.hash: link.address for link in relevant_hash_scorer_links
-                }
-
-                flagged_address_provider_pairs = []
-                for record in records:
-                    flagged_address_provider_pairs.append(
-                        (record.address, record.data.get("provider"))
-                    )
-                    original_holder_address = original_holder_for_hash.get(
-                        record.data.get("hash")
-                    )
-                    flagged_address_provider_pairs.append(
-                        (original_holder_address, record.data.get("provider"))
-                    )
-
-                flagged_address_provider_pairs = set(flagged_address_provider_pairs)
-
-                flagged_addresses = set(
-                    address
-                    for address, _provider in flagged_address_provider_pairs
-                    if address
-                )
-
-                # bulk retrieve all stamps for the flagged addresses and providers
-                flagged_stamps = CeramicCache.objects.filter(
-                    address__in=flagged_addresses,
-                    provider__in=flagged_providers,
-                    deleted_at=None,
-                )
-
-                for stamp in flagged_stamps:
-                    if (
-                        stamp.address not in unique_addresses
-                        and (stamp.address, stamp.provider)
-                        in flagged_address_provider_pairs
-                        and dateutil_parse(stamp.stamp.get("expirationDate")) > now
-                    ):
-                        unique_addresses.append(stamp.address)
-                        write_csv_row(temp_csv, [stamp.address])
-
-                num_records = len(records)
-                last_id = records[num_records - 1].id
-                progress_bar.update(num_records)
-
-        temp_csv.seek(0)
         self.stdout.write(f"Writing file to s3: {s3_key}")
         s3 = boto3.client("s3")
 
-        s3.upload_fileobj(
-            temp_csv, s3_bucket_name, s3_key, ExtraArgs={"ContentType": "text/csv"}
-        )
+        with (
+            S3MultipartUploadWriter(
+                s3, s3_bucket_name, s3_key, {"ContentType": "text/csv"}
+            ) as output,
+            connection.chunked_cursor() as cursor,
+            tqdm(
+                unit="records", unit_scale=True, desc="Exporting deduplicated addresses"
+            ) as progress_bar,
+        ):
+            cursor.execute(
+                DEDUPLICATED_ADDRESSES_QUERY,
+                {
+                    "community_id": community_id,
+                    "action": Event.Action.LIFO_DEDUPLICATION.value,
+                    # limit to the last 3 months assuming any record that may exist would be expired anyways
+                    "created_after": three_months_ago,
+                    "now": now,
+                },
+            )
+            while rows := cursor.fetchmany(batch_size):
+                for (address,) in rows:
+                    write_csv_row(output, [address])
+                progress_bar.update(len(rows))
 
-        temp_csv.close()
         self.stdout.write(f"Uploaded to s3, bucket='{s3_bucket_name}', key='{s3_key}'")
@@ -1,17 +1,19 @@
 import asyncio
 import csv
+import io
 import json
+import tempfile
 import time
 from datetime import datetime, timezone
-from io import StringIO
 from typing import AsyncGenerator, Dict, List
 
 from asgiref.sync import sync_to_async
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.core.management.base import BaseCommand
 from eth_utils.address import to_checksum_address
 
 from passport.api import handle_get_analysis
+from passport.model_client import AdaptiveConcurrencyLimiter
 from registry.models import (
     BatchModelScoringRequest,
     BatchModelScoringRequestItem,
@@ -20,7 +22,11 @@ from registry.models import (
 )
 from scorer.settings import (
     BULK_MODEL_SCORE_BATCH_SIZE,
+    BULK_MODEL_SCORE_MAX_CONCURRENCY,
+    BULK_MODEL_SCORE_MIN_CONCURRENCY,
+    BULK_MODEL_SCORE_RESULTS_EXPORT_BATCH_SIZE,
     BULK_MODEL_SCORE_RETRY_SLEEP,
+    BULK_MODEL_SCORE_TARGET_LATENCY,
     S3_BUCKET,
     S3_OBJECT_KEY,
 )
@@ -92,36 +98,10 @@ class Command(BaseCommand):
             processed_items = await request.items.filter(
                 status=BatchRequestStatus.DONE
             ).acount()
-            self.stdout.write("initial processed_items: {processed_items}")
-            async for batch in self.process_request_in_batches(request):
-                try:
-                    batch_results = await self.get_analysis(batch.values(), model_list)
-
-                    for address, result in batch_results:
-                        scoring_reqeust_item = batch[address.lower()]
-                        if isinstance(result, dict):
-                            scoring_reqeust_item.result = result
-                            scoring_reqeust_item.status = BatchRequestItemStatus.DONE
-                        else:
-                            scoring_reqeust_item.result = str(result)
-                            scoring_reqeust_item.status = BatchRequestItemStatus.ERROR
-
-                    await BatchModelScoringRequestItem.objects.abulk_update(
-                        batch.values(), fields=("result", "status")
-                    )
-
-                    processed_items += len(batch_results)
-                    progress = int((processed_items / total_items) * 100)
-                    self.stdout.write(
-                        "progress {processed_items} / {total_items} => {progress}"
-                    )
-                    await self.update_progress(request, progress)
-                except Exception as e:
-                    self.stderr.write(
-                        self.style.ERROR(
-                            f"Error processing batch: {str(e)} - Processed rows: {processed_items}, Total Rows: {total_items}"
-                        )
-                    )
+            self.stdout.write(f"initial processed_items: {processed_items}")
+            await self.score_pending_items(
+                request, model_list, processed_items, total_items
+            )
 
             await self.create_and_upload_results_csv(request)
 
@@ -175,11 +155,100 @@ class Command(BaseCommand):
                 unique_fields=["batch_scoring_request", "address"],
             )
 
+    async def score_pending_items(
+        self,
+        request: BatchModelScoringRequest,
+        model_list: str,
+        processed_items: int,
+        total_items: int,
+        batch_size=BULK_MODEL_SCORE_BATCH_SIZE,
+    ):
+        """
+        Score the pending items with a pool of workers. The items are read in
+        batches and handed to the workers through a bounded queue, the number
+        of concurrent analyses adapts to their latency and error rate, and the
+        results are written back in bulk every `batch_size` items, so that the
+        memory used does not depend on the size of the request.
+        """
+        batch_size = int(batch_size)
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=min(batch_size, BULK_MODEL_SCORE_MAX_CONCURRENCY),
+            min_limit=BULK_MODEL_SCORE_MIN_CONCURRENCY,
+            max_limit=BULK_MODEL_SCORE_MAX_CONCURRENCY,
+            target_latency=BULK_MODEL_SCORE_TARGET_LATENCY,
+        )
+        queue = asyncio.Queue(maxsize=2 * batch_size)
+        scored_items: List[BatchModelScoringRequestItem] = []
+        flush_lock = asyncio.Lock()
+
+        async def flush():
+            nonlocal processed_items
+            async with flush_lock:
+                items = scored_items[:]
+                scored_items.clear()
+                if not items:
+                    return
+                try:
+                    await BatchModelScoringRequestItem.objects.abulk_update(
+                        items, fields=("result", "status")
+                    )
+                    processed_items += len(items)
+                    progress = min(int((processed_items / total_items) * 100), 100)
+                    await self.update_progress(request, progress)
+                    self.stdout.write(
+                        f"progress {processed_items} / {total_items} => {progress}% "
+                        f"(concurrency: {int(limiter.limit)})"
+                    )
+                except Exception as e:
+                    self.stderr.write(
+                        self.style.ERROR(
+                            f"Error processing batch: {str(e)} - Processed rows: {processed_items}, Total Rows: {total_items}"
+                        )
+                    )
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                await limiter.acquire()
+                start_time = time.time()
+                _, result = await self.process_item(item, model_list)
+                await limiter.release(
+                    time.time() - start_time, ok=isinstance(result, dict)
+                )
+
+                if isinstance(result, dict):
+                    item.result = result
+                    item.status = BatchRequestItemStatus.DONE
+                else:
+                    item.result = str(result)
+                    item.status = BatchRequestItemStatus.ERROR
+                scored_items.append(item)
+                if len(scored_items) >= batch_size:
+                    await flush()
+
+        num_workers = BULK_MODEL_SCORE_MAX_CONCURRENCY
+        workers = [asyncio.create_task(worker()) for _ in range(num_workers)]
+        try:
+            async for batch in self.process_request_in_batches(request, batch_size):
+                for item in batch.values():
+                    await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+        await flush()
+
     async def update_progress(self, request, progress):
         request.progress = progress
         request.last_progress_update = datetime.now(timezone.utc)
-        await sync_to_async(request.save)()
-        self.stdout.write(f"Updated progress for request {request.id}: {progress}%")
+        await BatchModelScoringRequest.objects.filter(id=request.id).aupdate(
+            progress=request.progress,
+            last_progress_update=request.last_progress_update,
+        )
 
     async def process_request_in_batches(
         self,
@@ -207,25 +276,18 @@ class Command(BaseCommand):
 
             yield batch
 
-    async def get_analysis(
-        self, batch_request_items: List[BatchModelScoringRequestItem], model_list: str
+    async def process_item(
+        self, batch_request_item: BatchModelScoringRequestItem, model_list: str
     ):
-        tasks = []
-        for batch_request_item in batch_request_items:
-            address = batch_request_item.address
-            if not address or address == "":
-                continue
-            try:
-                task = asyncio.create_task(
-                    self.process_address(to_checksum_address(address), model_list)
-                )
-                tasks.append(task)
-            except Exception as e:
-                self.stderr.write(
-                    self.style.ERROR(f"Error getting analysis for {address}: {str(e)}")
-                )
-        results = await asyncio.gather(*tasks)
-        return results
+        address = batch_request_item.address
+        try:
+            checksummed_address = to_checksum_address(address)
+        except Exception as e:
+            self.stderr.write(
+                self.style.ERROR(f"Error getting analysis for {address}: {str(e)}")
+            )
+            return address, e
+        return await self.process_address(checksummed_address, model_list)
 
     def update_average_duration(self, duration):
         self.total_lambda_calls += 1
@@ -281,16 +343,37 @@ class Command(BaseCommand):
 
         return address, result
 
-    async def create_and_upload_results_csv(self, request: BatchModelScoringRequest):
-        csv_buffer = StringIO()
-        csv_writer = csv.writer(csv_buffer)
-        csv_writer.writerow(["Address", "Result"])  # Header row
-        async for item in request.items.all():
-            csv_writer.writerow([item.address, json.dumps(item.result)])
-
-        filename = f"request_id_{request.id}.csv"
-
-        # Create a ContentFile
-        content_file = ContentFile(csv_buffer.getvalue(), name=filename)
-
-        request.results_file = content_file
+    async def create_and_upload_results_csv(
+        self,
+        request: BatchModelScoringRequest,
+        batch_size=BULK_MODEL_SCORE_RESULTS_EXPORT_BATCH_SIZE,
+    ):
+        # The results are written to a temporary file rather than kept in
+        # memory, and the storage uploads the file in parts
+        with tempfile.TemporaryFile("w+b") as f:
+            text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+            csv_writer = csv.writer(text)
+            csv_writer.writerow(["Address", "Result"])  # Header row
+
+            last_id = 0
+            while True:
+                rows = [
+                    row
+                    async for row in request.items.filter(id__gt=last_id)
+                    .order_by("id")
+                    .values_list("id", "address", "result")[:batch_size]
+                ]
+                if not rows:
+                    break
+                for _, address, result in rows:
+                    csv_writer.writerow([address, json.dumps(result)])
+                last_id = rows[-1][0]
+
+            text.flush()
+            text.detach()
+            f.seek(0)
+
+            filename = f"request_id_{request.id}.csv"
+            await sync_to_async(request.results_file.save)(
+                filename, File(f), save=False
+            )
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+
+from registry.human_points_utils import refresh_points_summaries
+from registry.models import (
+    HumanPoints,
+    HumanPointsCommunityQualifiedUsers,
+    HumanPointsSummary,
+)
+from registry.utils import iterate_distinct_values, iterate_merged_batches
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-address human points summaries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of addresses to process in each batch (default: 1000)",
+        )
+        parser.add_argument(
+            "--stale-only",
+            action="store_true",
+            help="Only rebuild the summaries marked as stale",
+        )
+
+    def iterate_addresses(self, batch_size: int, stale_only: bool):
+        if stale_only:
+            summaries = HumanPointsSummary.objects.filter(stale=True)
+            return iterate_merged_batches(
+                [iterate_distinct_values(summaries, "address", batch_size)],
+                batch_size,
+            )
+        # All addresses with points or a passing score, the distinct addresses
+        # of each table are paginated separately and merged
+        return iterate_merged_batches(
+            [
+                iterate_distinct_values(
+                    HumanPoints.objects.all(), "address", batch_size
+                ),
+                iterate_distinct_values(
+                    HumanPointsCommunityQualifiedUsers.objects.all(),
+                    "address",
+                    batch_size,
+                ),
+            ],
+            batch_size,
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        stale_only = options["stale_only"]
+
+        total = 0
+        for addresses in self.iterate_addresses(batch_size, stale_only):
+            refresh_points_summaries(addresses)
+            total += len(addresses)
+            self.stdout.write(f"Rebuilt {total} summaries (last: {addresses[-1]})")
+
+        self.stdout.write(self.style.SUCCESS(f"Done, rebuilt {total} summaries"))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.6 on 2026-10-19 09:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("registry", "0060_platformmetadata"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="score",
+            name="passport_fingerprint",
+            field=models.CharField(
+                blank=True,
+                default=None,
+                help_text="Digest of the stamps and weights used to compute this score. Used to skip re-scoring when nothing changed.",
+                max_length=64,
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.6 on 2026-10-19 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    registry_event is written on every score save, so the index is built
+    concurrently rather than locking the table for the duration of the build
+    """
+
+    atomic = False  # Required for CONCURRENTLY
+
+    dependencies = [
+        ("registry", "0061_score_passport_fingerprint"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="event",
+                    index=models.Index(
+                        condition=models.Q(("action", "SCU")),
+                        fields=["community", "id"],
+                        name="score_update_feed_index",
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql="CREATE INDEX CONCURRENTLY IF NOT EXISTS score_update_feed_index ON registry_event (community_id, id) WHERE action = 'SCU';",
+                    reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS score_update_feed_index;",
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 4.2.6 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+import account.models
+
+# Mark the summaries as stale when the points, multiplier or qualified communities
+# of an address change, including the writes that do not go through django
+# (indexer, rust scorer). A change of the points config marks all summaries stale.
+MARK_SUMMARY_STALE_SQL = """
+CREATE FUNCTION registry_humanpointssummary_mark_stale() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE registry_humanpointssummary SET stale = true
+        WHERE address = NEW.address AND NOT stale;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE registry_humanpointssummary SET stale = true
+        WHERE address = OLD.address AND NOT stale;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION registry_humanpointssummary_mark_all_stale() RETURNS trigger AS $$
+BEGIN
+    UPDATE registry_humanpointssummary SET stale = true WHERE NOT stale;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER registry_humanpoints_summary_stale
+AFTER INSERT OR UPDATE OR DELETE ON registry_humanpoints
+FOR EACH ROW EXECUTE FUNCTION registry_humanpointssummary_mark_stale();
+
+CREATE TRIGGER registry_humanpointsmultiplier_summary_stale
+AFTER INSERT OR UPDATE OR DELETE ON registry_humanpointsmultiplier
+FOR EACH ROW EXECUTE FUNCTION registry_humanpointssummary_mark_stale();
+
+CREATE TRIGGER registry_humanpointscommunityqualifiedusers_summary_stale
+AFTER INSERT OR UPDATE OR DELETE ON registry_humanpointscommunityqualifiedusers
+FOR EACH ROW EXECUTE FUNCTION registry_humanpointssummary_mark_stale();
+
+CREATE TRIGGER registry_humanpointsconfig_summary_stale
+AFTER INSERT OR UPDATE OR DELETE ON registry_humanpointsconfig
+FOR EACH STATEMENT EXECUTE FUNCTION registry_humanpointssummary_mark_all_stale();
+"""
+
+UNMARK_SUMMARY_STALE_SQL = """
+DROP TRIGGER IF EXISTS registry_humanpoints_summary_stale ON registry_humanpoints;
+DROP TRIGGER IF EXISTS registry_humanpointsmultiplier_summary_stale ON registry_humanpointsmultiplier;
+DROP TRIGGER IF EXISTS registry_humanpointscommunityqualifiedusers_summary_stale ON registry_humanpointscommunityqualifiedusers;
+DROP TRIGGER IF EXISTS registry_humanpointsconfig_summary_stale ON registry_humanpointsconfig;
+DROP FUNCTION IF EXISTS registry_humanpointssummary_mark_stale();
+DROP FUNCTION IF EXISTS registry_humanpointssummary_mark_all_stale();
+"""
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(MARK_SUMMARY_STALE_SQL)
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(UNMARK_SUMMARY_STALE_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("registry", "0062_event_score_update_feed_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HumanPointsSummary",
+            fields=[
+                (
+                    "address",
+                    account.models.EthAddressField(
+                        max_length=42, primary_key=True, serialize=False
+                    ),
+                ),
+                ("total_points", models.IntegerField(default=0)),
+                ("multiplier", models.IntegerField(default=1)),
+                ("breakdown", models.JSONField(default=dict)),
+                ("is_eligible", models.BooleanField(default=False)),
+                ("stale", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Human Points Summary",
+                "verbose_name_plural": "Human Points Summaries",
+            },
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.6 on 2026-10-19 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("registry", "0063_humanpointssummary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BackfillCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("partition", models.IntegerField()),
+                ("start_id", models.BigIntegerField()),
+                ("end_id", models.BigIntegerField(blank=True, null=True)),
+                ("last_id", models.BigIntegerField(blank=True, null=True)),
+                ("num_processed", models.BigIntegerField(default=0)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Backfill Checkpoint",
+                "verbose_name_plural": "Backfill Checkpoints",
+                "unique_together": {("name", "partition")},
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.6 on 2026-10-19 14:23
+
+from django.db import migrations, models
+
+# The triggers also increment the generation of the summaries, including the
+# summaries that are already stale (a refresh may be computing them)
+MARK_SUMMARY_STALE_SQL = """
+CREATE OR REPLACE FUNCTION registry_humanpointssummary_mark_stale() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE registry_humanpointssummary
+        SET stale = true, generation = generation + 1
+        WHERE address = NEW.address;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE registry_humanpointssummary
+        SET stale = true, generation = generation + 1
+        WHERE address = OLD.address;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION registry_humanpointssummary_mark_all_stale() RETURNS trigger AS $$
+BEGIN
+    UPDATE registry_humanpointssummary SET stale = true, generation = generation + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_MARK_SUMMARY_STALE_SQL = """
+CREATE OR REPLACE FUNCTION registry_humanpointssummary_mark_stale() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE registry_humanpointssummary SET stale = true
+        WHERE address = NEW.address AND NOT stale;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE registry_humanpointssummary SET stale = true
+        WHERE address = OLD.address AND NOT stale;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION registry_humanpointssummary_mark_all_stale() RETURNS trigger AS $$
+BEGIN
+    UPDATE registry_humanpointssummary SET stale = true WHERE NOT stale;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def update_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(MARK_SUMMARY_STALE_SQL)
+
+
+def restore_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(PREVIOUS_MARK_SUMMARY_STALE_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("registry", "0064_backfillcheckpoint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="humanpointssummary",
+            name="generation",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(update_triggers, restore_triggers),
+    ]
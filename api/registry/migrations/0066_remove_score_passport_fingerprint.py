@@ -0,0 +1,16 @@
+# Generated by Django 4.2.6 on 2026-10-19 14:59
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("registry", "0065_humanpointssummary_generation"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="score",
+            name="passport_fingerprint",
+        ),
+    ]
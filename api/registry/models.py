@@ -118,19 +118,25 @@ def serialize_score(score: Score):
     return json_score
 
 
+def score_update_event(score: Score) -> "Event":
+    """
+    The SCORE_UPDATE event recording `score`. Created when a score is saved, and
+    to be created explicitly when scores are saved with `bulk_update`.
+    """
+    return Event(
+        action=Event.Action.SCORE_UPDATE,
+        address=score.passport.address,
+        community_id=score.passport.community_id,
+        data=serialize_score(score),
+    )
+
+
 @receiver(pre_save, sender=Score)
 def score_updated(sender, instance, **kwargs):
     if instance.status != Score.Status.DONE:
         return instance
 
-    json_score = serialize_score(instance)
-
-    Event.objects.create(
-        action=Event.Action.SCORE_UPDATE,
-        address=instance.passport.address,
-        community=instance.passport.community,
-        data=json_score,
-    )
+    score_update_event(instance).save()
 
     return instance
 
@@ -189,6 +195,12 @@ The reason to have this field (and not use the `data` JSON field) is to be able
                 ],
                 name="score_history_index",
             ),
+            # Score change feed, see `registry.api.v1.a_get_score_changes`
+            models.Index(
+                fields=["community", "id"],
+                condition=models.Q(action="SCU"),
+                name="score_update_feed_index",
+            ),
         ]
 
 
@@ -445,6 +457,34 @@ class HumanPointsMultiplier(models.Model):
         return f"HumanPointsMultiplier - {self.address}: {self.multiplier}x"
 
 
+class HumanPointsSummary(models.Model):
+    """
+    Points totals of an address, as returned by `get_user_points_data`.
+    Maintained by the award path, and marked as stale by database triggers when
+    the points, multiplier or qualified communities of the address (or the
+    points config) change. Stale summaries are computed on read without being
+    stored, and rebuilt by `rebuild_human_points_summaries --stale-only`.
+    The triggers also increment the generation, so that a refresh only clears
+    the stale flag if nothing changed while it computed the totals.
+    """
+
+    address = EthAddressField(primary_key=True)
+    total_points = models.IntegerField(default=0)
+    multiplier = models.IntegerField(default=1)
+    breakdown = models.JSONField(default=dict)
+    is_eligible = models.BooleanField(default=False)
+    stale = models.BooleanField(default=False)
+    generation = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Human Points Summary"
+        verbose_name_plural = "Human Points Summaries"
+
+    def __str__(self):
+        return f"HumanPointsSummary - {self.address}: {self.total_points} points"
+
+
 class HumanPointsConfig(models.Model):
     """Configuration for point values per action type"""
 
@@ -463,3 +503,29 @@ class HumanPointsConfig(models.Model):
 
     def __str__(self):
         return f"HumanPointsConfig - {self.action}: {self.points} points {'(active)' if self.active else '(inactive)'}"
+
+
+class BackfillCheckpoint(models.Model):
+    """
+    Progress of a partition of a backfill command (see `registry.backfill`),
+    used to resume the backfill where it stopped.
+    """
+
+    name = models.CharField(max_length=100)
+    partition = models.IntegerField()
+    # Range of primary keys of the partition, `end_id` is null for the last
+    # partition (it includes the records created after the backfill started)
+    start_id = models.BigIntegerField()
+    end_id = models.BigIntegerField(null=True, blank=True)
+    last_id = models.BigIntegerField(null=True, blank=True)
+    num_processed = models.BigIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Backfill Checkpoint"
+        verbose_name_plural = "Backfill Checkpoints"
+        unique_together = ["name", "partition"]
+
+    def __str__(self):
+        return f"BackfillCheckpoint - {self.name} #{self.partition}: {self.last_id}"
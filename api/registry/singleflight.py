@@ -0,0 +1,139 @@
+"""
+Request coalescing ("singleflight") for async computations.
+
+Concurrent callers asking for the same key await a single in-flight
+computation instead of each running it. Optionally a short lived Redis lock
+(through the django cache) serializes the computation across processes: the
+callers that do not get the lock wait for it to be released and then run the
+computation themselves, which is expected to be cheap by then (for example
+the scoring fast path for an unchanged passport).
+"""
+
+import asyncio
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+import api_logging as logging
+
+log = logging.getLogger(__name__)
+
+# Deletes the lock only if it still holds our token: once our lock expired
+# another process may have taken it over
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        # In-flight tasks are tracked per event loop, as a task can only be
+        # awaited from the loop it was created in
+        self._in_flight: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self.stats = {"leaders": 0, "coalesced": 0, "lock_waits": 0}
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        use_lock: bool = False,
+    ) -> Any:
+        """
+        Run `fn` for `key`, or wait for the result of the `fn` already running
+        for that key in this process. Exceptions are propagated to all callers.
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+
+        task = self._in_flight.get(flight_key)
+        if task is None:
+            self.stats["leaders"] += 1
+            task = loop.create_task(self._run(key, fn, use_lock))
+            self._in_flight[flight_key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(flight_key, None))
+        else:
+            self.stats["coalesced"] += 1
+            log.info(
+                "Coalesced request into in-flight computation. name=%s key=%s stats=%s",
+                self.name,
+                key,
+                self.stats,
+            )
+
+        # Shield the shared task, so that a cancelled caller (e.g. a client
+        # disconnecting) does not cancel the computation for the others
+        return await asyncio.shield(task)
+
+    async def _run(self, key: Hashable, fn: Callable[[], Awaitable[Any]], use_lock):
+        if not use_lock:
+            return await fn()
+
+        lock_key = f"singleflight:{self.name}:{key}"
+        timeout = settings.SINGLEFLIGHT_LOCK_TIMEOUT
+        token = secrets.token_hex(16)
+        acquired = await self._aacquire_lock(lock_key, token, timeout)
+        try:
+            return await fn()
+        finally:
+            if acquired:
+                await self._arelease_lock(lock_key, token)
+
+    async def _aacquire_lock(self, lock_key: str, token: str, timeout: float) -> bool:
+        """
+        Try to acquire the lock, waiting for at most `timeout` seconds for it
+        to be released by another process. Returns whether the lock was acquired.
+        Failures to reach the cache are logged and treated as not acquired.
+        """
+        deadline = time.monotonic() + timeout
+        waited = False
+        try:
+            while not await cache.aadd(lock_key, token, timeout=timeout):
+                if not waited:
+                    waited = True
+                    self.stats["lock_waits"] += 1
+                if time.monotonic() >= deadline:
+                    log.warning(
+                        "Timed out waiting for lock, proceeding without it. lock_key=%s",
+                        lock_key,
+                    )
+                    return False
+                await asyncio.sleep(settings.SINGLEFLIGHT_LOCK_POLL_INTERVAL)
+        except Exception:
+            log.exception("Failed to acquire lock. lock_key=%s", lock_key)
+            return False
+
+        return True
+
+    async def _arelease_lock(self, lock_key: str, token: str):
+        """
+        Release the lock if it is still held with `token`. The cache API can
+        only delete unconditionally, so the compare and delete runs as a script
+        through the underlying redis client.
+        """
+        try:
+            await sync_to_async(self._release_lock)(lock_key, token)
+        except Exception:
+            log.exception("Failed to release lock. lock_key=%s", lock_key)
+
+    def _release_lock(self, lock_key: str, token: str):
+        redis_cache = cache._cache
+        client = redis_cache.get_client(lock_key, write=True)
+        released = client.eval(
+            RELEASE_LOCK_SCRIPT,
+            1,
+            cache.make_and_validate_key(lock_key),
+            redis_cache._serializer.dumps(token),
+        )
+        if not released:
+            log.warning(
+                "Lock expired before the computation finished. lock_key=%s",
+                lock_key,
+            )
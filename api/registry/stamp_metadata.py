@@ -0,0 +1,259 @@
+"""
+Stamp metadata store.
+
+The stamp metadata is published by the passport app as a JSON file
+(`stampMetadata.json`) and rarely changes. The store keeps it in memory,
+together with an index of the stamps by provider, and serves it as
+stale-while-revalidate:
+
+- requests are served from memory, and once the data is older than
+  `STAMP_METADATA_REFRESH_AFTER` a refresh is started in a background thread,
+  while requests keep being served the current data
+- the fetched data is shared with the other processes through the django
+  cache, so that a cold process does not need to fetch it again
+- the fetched data is also saved to an on-disk snapshot, used on cold starts
+  when neither the cache nor the external URL are available
+- failed loads and refreshes are retried at most every
+  `STAMP_METADATA_REFRESH_RETRY_INTERVAL`, in between requests are not blocked
+  on the external URL
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import urljoin
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+import api_logging as logging
+from registry.api.schema import StampDisplayResponse
+
+log = logging.getLogger(__name__)
+
+STAMP_METADATA_CACHE_KEY = "stamp_metadata"
+# The shared entry outlives the refresh interval, so that it can be served
+# stale while the external URL is not reachable
+STAMP_METADATA_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+
+
+@dataclass
+class StampMetadataSnapshot:
+    fetched_at: float
+    data: list[dict]
+    metadata: List[StampDisplayResponse]
+    by_provider: dict[str, dict]
+
+    @classmethod
+    def from_data(cls, data: list[dict], fetched_at: float) -> "StampMetadataSnapshot":
+        metadata = [StampDisplayResponse(**platform_data) for platform_data in data]
+        by_provider = {
+            stamp.name: {
+                "name": stamp.name,
+                "description": stamp.description,
+                "hash": stamp.hash,
+                "group": group.name,
+                "platform": {
+                    "name": platform.name,
+                    "id": platform.id,
+                    "icon": platform.icon,
+                    "description": platform.description,
+                    "connectMessage": platform.connectMessage,
+                },
+            }
+            for platform in metadata
+            for group in platform.groups
+            for stamp in group.stamps
+        }
+        return cls(
+            fetched_at=fetched_at, data=data, metadata=metadata, by_provider=by_provider
+        )
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class StampMetadataStore:
+    def __init__(self):
+        self._snapshot: Optional[StampMetadataSnapshot] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._last_refresh_attempt: Optional[float] = None
+
+    def get_all(self) -> Optional[List[StampDisplayResponse]]:
+        snapshot = self._get_snapshot()
+        return snapshot.metadata if snapshot else None
+
+    def get_for_provider(self, provider: str) -> Optional[dict]:
+        """
+        Raises LookupError if the metadata is not available.
+        """
+        snapshot = self._get_snapshot()
+        if snapshot is None:
+            raise LookupError("Stamp metadata is not available")
+        return snapshot.by_provider.get(provider)
+
+    def reset(self):
+        with self._lock:
+            self._snapshot = None
+            self._refreshing = False
+            self._last_refresh_attempt = None
+
+    def _get_snapshot(self) -> Optional[StampMetadataSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            # While the metadata is not available at all, do not make every
+            # request wait on the lock to retry the load
+            if self._in_retry_backoff():
+                return None
+            # Cold start: load once, other threads wait for it
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    if self._in_retry_backoff():
+                        return None
+                    snapshot = self._load()
+                    self._snapshot = snapshot
+                    if snapshot is None:
+                        self._last_refresh_attempt = time.monotonic()
+            if snapshot is None:
+                return None
+
+        if snapshot.age > settings.STAMP_METADATA_REFRESH_AFTER:
+            self._refresh_in_background()
+
+        return snapshot
+
+    def _load(self) -> Optional[StampMetadataSnapshot]:
+        snapshot = self._read_shared_cache()
+        if snapshot is not None:
+            return snapshot
+
+        try:
+            return self._fetch()
+        except Exception:
+            log.exception("Error fetching external metadata")
+
+        snapshot = self._read_disk_snapshot()
+        if snapshot is not None:
+            log.warning(
+                "Serving stamp metadata from the on-disk snapshot. fetched_at=%s",
+                snapshot.fetched_at,
+            )
+        return snapshot
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing or self._in_retry_backoff():
+                return
+            self._refreshing = True
+            self._last_refresh_attempt = time.monotonic()
+
+        threading.Thread(
+            target=self._refresh, name="stamp-metadata-refresh", daemon=True
+        ).start()
+
+    def _in_retry_backoff(self) -> bool:
+        return (
+            self._last_refresh_attempt is not None
+            and time.monotonic() - self._last_refresh_attempt
+            < settings.STAMP_METADATA_REFRESH_RETRY_INTERVAL
+        )
+
+    def _refresh(self):
+        try:
+            current = self._snapshot
+            # Another process may already have refreshed the shared entry
+            snapshot = self._read_shared_cache()
+            if snapshot is None or (
+                current is not None and snapshot.fetched_at <= current.fetched_at
+            ):
+                snapshot = self._fetch()
+            self._snapshot = snapshot
+        except Exception:
+            log.exception("Error refreshing external metadata, serving stale data")
+        finally:
+            self._refreshing = False
+
+    def _fetch(self) -> StampMetadataSnapshot:
+        response = requests.get(
+            self.metadata_url, timeout=settings.STAMP_METADATA_FETCH_TIMEOUT
+        )
+        response.raise_for_status()
+
+        # Append base URL to icon URLs
+        data = [
+            {
+                **platform_data,
+                "icon": urljoin(settings.PASSPORT_PUBLIC_URL, platform_data["icon"]),
+            }
+            for platform_data in response.json()
+        ]
+        snapshot = StampMetadataSnapshot.from_data(data, fetched_at=time.time())
+
+        self._write_shared_cache(snapshot)
+        self._write_disk_snapshot(snapshot)
+        return snapshot
+
+    @property
+    def metadata_url(self) -> str:
+        return urljoin(settings.PASSPORT_PUBLIC_URL, "stampMetadata.json")
+
+    def _read_shared_cache(self) -> Optional[StampMetadataSnapshot]:
+        try:
+            entry = cache.get(STAMP_METADATA_CACHE_KEY)
+            if entry is not None:
+                return StampMetadataSnapshot.from_data(
+                    entry["data"], fetched_at=entry["fetched_at"]
+                )
+        except Exception:
+            log.exception("Error reading stamp metadata from the cache")
+        return None
+
+    def _write_shared_cache(self, snapshot: StampMetadataSnapshot):
+        try:
+            cache.set(
+                STAMP_METADATA_CACHE_KEY,
+                {"fetched_at": snapshot.fetched_at, "data": snapshot.data},
+                STAMP_METADATA_CACHE_TIMEOUT,
+            )
+        except Exception:
+            log.exception("Error writing stamp metadata to the cache")
+
+    def _read_disk_snapshot(self) -> Optional[StampMetadataSnapshot]:
+        path = settings.STAMP_METADATA_SNAPSHOT_PATH
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            return StampMetadataSnapshot.from_data(
+                entry["data"], fetched_at=entry["fetched_at"]
+            )
+        except Exception:
+            log.exception("Error reading stamp metadata snapshot. path=%s", path)
+            return None
+
+    def _write_disk_snapshot(self, snapshot: StampMetadataSnapshot):
+        path = settings.STAMP_METADATA_SNAPSHOT_PATH
+        if not path:
+            return
+        try:
+            # Write to a temporary file first, so that readers never see a partial file
+            directory = os.path.dirname(path) or "."
+            with tempfile.NamedTemporaryFile(
+                "w", dir=directory, delete=False, encoding="utf-8"
+            ) as f:
+                json.dump({"fetched_at": snapshot.fetched_at, "data": snapshot.data}, f)
+            os.replace(f.name, path)
+        except Exception:
+            log.exception("Error writing stamp metadata snapshot. path=%s", path)
+
+
+stamp_metadata_store = StampMetadataStore()
@@ -0,0 +1,154 @@
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from account.models import Community
+from registry.backfill import split_range
+from registry.management.commands.backfill_event_communities import (
+    Command as BackfillEventCommunities,
+)
+from registry.models import (
+    BackfillCheckpoint,
+    Event,
+    HumanPointsMultiplier,
+    Passport,
+    Score,
+)
+
+pytestmark = pytest.mark.django_db
+
+addresses = [f"0x{i:040x}" for i in range(1, 6)]
+
+
+@pytest.fixture
+def ldp_events(scorer_community):
+    return [
+        Event.objects.create(
+            action=Event.Action.LIFO_DEDUPLICATION,
+            address=address,
+            data={"community_id": scorer_community.id},
+        )
+        for address in addresses
+    ]
+
+
+def test_split_range():
+    assert split_range(1, 10, 3) == [(1, 3), (4, 6), (7, None)]
+    assert split_range(5, 6, 4) == [(5, 5), (6, None)]
+    assert split_range(5, 5, 1) == [(5, None)]
+
+
+def test_backfill_human_points_multipliers(scorer_community):
+    for i, address in enumerate(addresses):
+        passport = Passport.objects.create(address=address, community=scorer_community)
+        Score.objects.create(passport=passport, score=Decimal(i % 2))
+
+    call_command(
+        "backfill_human_points_multipliers",
+        "--scorer-id",
+        str(scorer_community.id),
+        "--batch-size",
+        "2",
+    )
+
+    assert sorted(HumanPointsMultiplier.objects.values_list("address", flat=True)) == [
+        addresses[1],
+        addresses[3],
+    ]
+    checkpoint = BackfillCheckpoint.objects.get(
+        name=f"backfill_human_points_multipliers:{scorer_community.id}"
+    )
+    assert checkpoint.num_processed == 2
+    assert checkpoint.completed_at is not None
+
+
+def test_backfills_with_other_options_have_their_own_checkpoints(
+    scorer_account, scorer_community
+):
+    other_community = Community.objects.create(
+        name="Other community", account=scorer_account
+    )
+    for address, community in zip(addresses, [scorer_community, other_community]):
+        passport = Passport.objects.create(address=address, community=community)
+        Score.objects.create(passport=passport, score=Decimal(1))
+
+    for community in [scorer_community, other_community]:
+        call_command(
+            "backfill_human_points_multipliers", "--scorer-id", str(community.id)
+        )
+
+    assert HumanPointsMultiplier.objects.count() == 2
+    assert BackfillCheckpoint.objects.count() == 2
+
+
+def test_dry_run_makes_no_changes(ldp_events):
+    call_command("backfill_event_communities", "--dry-run")
+
+    assert not Event.objects.filter(community__isnull=False).exists()
+    assert not BackfillCheckpoint.objects.exists()
+
+
+def test_backfill_resumes_from_the_checkpoint(mocker, ldp_events):
+    write = BackfillEventCommunities.write
+    batches = []
+
+    def interrupted_write(self, events):
+        batches.append([event.id for event in events])
+        if len(batches) == 2:
+            raise RuntimeError("interrupted")
+        write(self, events)
+
+    mocker.patch.object(BackfillEventCommunities, "write", interrupted_write)
+    with pytest.raises(RuntimeError):
+        call_command("backfill_event_communities", "--batch-size", "2")
+    assert Event.objects.filter(community__isnull=False).count() == 2
+
+    call_command("backfill_event_communities", "--batch-size", "2")
+
+    # The failed batch is processed again, the completed one is not
+    assert batches[2:] == [batches[1], [ldp_events[-1].id]]
+    assert not Event.objects.filter(community__isnull=True).exists()
+
+
+def test_completed_backfill_processes_the_new_records(ldp_events, scorer_community):
+    call_command("backfill_event_communities", "--batch-size", "2")
+    new_event = Event.objects.create(
+        action=Event.Action.LIFO_DEDUPLICATION,
+        address=addresses[0],
+        data={"community_id": scorer_community.id},
+    )
+    stdout = StringIO()
+
+    call_command("backfill_event_communities", "--batch-size", "2", stdout=stdout)
+
+    new_event.refresh_from_db()
+    assert new_event.community_id == scorer_community.id
+    assert "already completed" in stdout.getvalue()
+    checkpoint = BackfillCheckpoint.objects.get()
+    assert (checkpoint.last_id, checkpoint.num_processed) == (new_event.id, 6)
+    assert checkpoint.completed_at is not None
+
+
+def test_backfill_waits_for_the_replicas(mocker, settings, ldp_events):
+    settings.BACKFILL_REPLICA_DATABASES = ["read_replica_0"]
+    get_replica_lag = mocker.patch(
+        "registry.backfill.get_replica_lag", side_effect=[60, 0]
+    )
+    sleep = mocker.patch("registry.backfill.time.sleep")
+
+    call_command("backfill_event_communities")
+
+    assert get_replica_lag.call_count == 2
+    sleep.assert_called_once_with(settings.BACKFILL_REPLICA_LAG_WAIT)
+    assert not Event.objects.filter(community__isnull=True).exists()
+
+
+def test_partitions_are_processed_in_parallel(transactional_db, ldp_events):
+    call_command("backfill_event_communities", "--workers", "3")
+
+    checkpoints = BackfillCheckpoint.objects.order_by("partition")
+    assert [c.num_processed for c in checkpoints] == [1, 1, 3]
+    assert all(c.completed_at for c in checkpoints)
+    assert not Event.objects.filter(community__isnull=True).exists()
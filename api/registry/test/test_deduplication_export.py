@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.core.management import call_command
+
+from ceramic_cache.models import CeramicCache
+from registry.models import Event, HashScorerLink
+from scorer.export_utils import S3MultipartUploadWriter
+
+pytestmark = pytest.mark.django_db
+
+flagged_address = "0x0000000000000000000000000000000000000001"
+original_holder = "0x0000000000000000000000000000000000000002"
+other_address = "0x0000000000000000000000000000000000000003"
+
+
+@pytest.fixture
+def s3(mocker):
+    s3 = mocker.patch(
+        "registry.management.commands.deduplication_export.boto3"
+    ).client.return_value
+    s3.create_multipart_upload.return_value = {"UploadId": "upload-id"}
+    s3.upload_part.side_effect = lambda **kwargs: {
+        "ETag": f"etag-{kwargs['PartNumber']}"
+    }
+    return s3
+
+
+def uploaded_data(s3):
+    return b"".join(call.kwargs["Body"] for call in s3.upload_part.call_args_list)
+
+
+def create_stamp(address, provider, expires_in=timedelta(days=30), **kwargs):
+    return CeramicCache.objects.create(
+        address=address,
+        provider=provider,
+        type=CeramicCache.StampType.V1,
+        stamp={},
+        expiration_date=datetime.now(timezone.utc) + expires_in,
+        **kwargs,
+    )
+
+
+def test_export_deduplicated_addresses(s3, scorer_community):
+    for address in (flagged_address, other_address):
+        Event.objects.create(
+            action=Event.Action.LIFO_DEDUPLICATION,
+            address=address,
+            community=scorer_community,
+            data={"provider": "Google", "hash": f"hash-{address}"},
+        )
+    HashScorerLink.objects.create(
+        hash=f"hash-{flagged_address}",
+        address=original_holder,
+        community=scorer_community,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=30),
+    )
+    create_stamp(flagged_address, "Google")
+    create_stamp(original_holder, "Google")
+    # Stamps of other providers, expired or deleted are not exported
+    create_stamp(original_holder, "Github")
+    create_stamp(other_address, "Github")
+    create_stamp(other_address, "Google", expires_in=-timedelta(days=1))
+    create_stamp(other_address, "Google", deleted_at=datetime.now(timezone.utc))
+
+    call_command(
+        "deduplication_export",
+        "--community-id",
+        str(scorer_community.id),
+        "--output-file",
+        "dedup.csv",
+        "--s3-uri",
+        "s3://bucket/exports",
+    )
+
+    s3.create_multipart_upload.assert_called_once_with(
+        Bucket="bucket", Key="exports/dedup.csv", ContentType="text/csv"
+    )
+    assert uploaded_data(s3) == f'"{flagged_address}"\n"{original_holder}"\n'.encode()
+    s3.complete_multipart_upload.assert_called_once()
+
+
+def test_multipart_upload_parts(s3):
+    with S3MultipartUploadWriter(s3, "bucket", "key", part_size=4) as output:
+        output.write(b"abc")
+        output.write(b"defghij")
+
+    assert [call.kwargs["Body"] for call in s3.upload_part.call_args_list] == [
+        b"abcd",
+        b"efgh",
+        b"ij",
+    ]
+    s3.complete_multipart_upload.assert_called_once_with(
+        Bucket="bucket",
+        Key="key",
+        UploadId="upload-id",
+        MultipartUpload={
+            "Parts": [{"ETag": f"etag-{n}", "PartNumber": n} for n in (1, 2, 3)]
+        },
+    )
+
+
+def test_multipart_upload_is_aborted_on_error(s3):
+    with pytest.raises(RuntimeError):
+        with S3MultipartUploadWriter(s3, "bucket", "key") as output:
+            output.write(b"abc")
+            raise RuntimeError("failed")
+
+    s3.abort_multipart_upload.assert_called_once_with(
+        Bucket="bucket", Key="key", UploadId="upload-id"
+    )
+    s3.complete_multipart_upload.assert_not_called()
@@ -0,0 +1,142 @@
+"""Tests for the batched Human Points award pipeline"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+
+from account.models import AddressList, Community
+from registry.human_points_utils import (
+    CappedAward,
+    aaward_human_points,
+    award_human_points,
+)
+from registry.models import HumanPoints, HumanPointsCommunityQualifiedUsers
+
+pytestmark = pytest.mark.django_db
+
+address = "0x1234567890123456789012345678901234567890"
+
+stamps = [
+    {
+        "provider": "SelfStakingBronze",
+        "credential": {"credentialSubject": {"provider": "SelfStakingBronze"}},
+    },
+    {
+        "provider": "Google",
+        "credential": {
+            "credentialSubject": {"provider": "Google", "nullifiers": ["v0:a", "v1:b"]}
+        },
+    },
+]
+
+
+@pytest.fixture
+def communities(scorer_account):
+    return [
+        Community.objects.create(name=f"Community {i}", account=scorer_account)
+        for i in range(4)
+    ]
+
+
+def awarded_actions():
+    return sorted(
+        HumanPoints.objects.filter(address=address).values_list("action", "provider")
+    )
+
+
+def test_award_human_points(communities, django_assert_max_num_queries):
+    for community in communities[:3]:
+        HumanPointsCommunityQualifiedUsers.objects.create(
+            address=address, community=community
+        )
+    AddressList.objects.create(name="SeasonedPassportOGs").addresses.create(
+        address=address
+    )
+
+    # Existing points and qualified communities are loaded once, and the new
+    # points are written with a single insert, before refreshing the summary
+    with django_assert_max_num_queries(11):
+        award_human_points(address, communities[3].id, stamps)
+
+    assert (
+        HumanPointsCommunityQualifiedUsers.objects.filter(address=address).count() == 4
+    )
+    assert awarded_actions() == sorted(
+        [
+            (HumanPoints.Action.HUMAN_KEYS, "Google"),
+            (HumanPoints.Action.IDENTITY_STAKING_BRONZE, ""),
+            (HumanPoints.Action.SCORING_BONUS, ""),
+            (HumanPoints.Action.SEASONED_PASSPORT_OG, ""),
+        ]
+    )
+    assert (
+        HumanPoints.objects.get(action=HumanPoints.Action.HUMAN_KEYS).tx_hash == "v1:b"
+    )
+
+
+def test_existing_points_are_not_written_again(communities, django_assert_num_queries):
+    award_human_points(address, communities[0].id, stamps)
+
+    # Only the reads of the qualified communities and existing points, the
+    # address lists are checked in memory and the summary is left as is
+    with django_assert_num_queries(2):
+        award_human_points(address, communities[0].id, stamps)
+
+    assert len(awarded_actions()) == 2
+
+
+def test_award_is_done_before_returning(communities):
+    async_to_sync(aaward_human_points)(address, communities[0].id, stamps)
+
+    assert len(awarded_actions()) == 2
+
+
+def test_capped_award(settings, django_assert_num_queries):
+    settings.HUMAN_POINTS_CAP_RECOUNT_AFTER = 300
+    HumanPoints.objects.bulk_create(
+        HumanPoints(address=f"0x{i:040x}", action=HumanPoints.Action.METAMASK_OG_2)
+        for i in range(8)
+    )
+    capped_award = CappedAward(HumanPoints.Action.METAMASK_OG_2, 10)
+
+    assert [capped_award.award(f"0x{i:040x}") for i in range(8, 12)] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+    assert (
+        HumanPoints.objects.filter(action=HumanPoints.Action.METAMASK_OG_2).count()
+        == 10
+    )
+
+    # Once reached, the cap is not counted again
+    with django_assert_num_queries(0):
+        assert not capped_award.award(f"0x{12:040x}")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_capped_award_across_processes():
+    # Each thread has its own database connection and award state, like
+    # separate processes
+    num_workers = 8
+    barrier = threading.Barrier(num_workers)
+
+    def award(i):
+        try:
+            capped_award = CappedAward(HumanPoints.Action.METAMASK_OG_2, 5)
+            barrier.wait()
+            return sum(capped_award.award(f"0x{i * 100 + j:040x}") for j in range(3))
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        awarded = sum(executor.map(award, range(num_workers)))
+
+    assert awarded == 5
+    assert (
+        HumanPoints.objects.filter(action=HumanPoints.Action.METAMASK_OG_2).count() == 5
+    )
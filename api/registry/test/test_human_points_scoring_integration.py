@@ -15,7 +15,7 @@ import pytest
 from account.models import Community
 from ceramic_cache.models import CeramicCache
 from registry.atasks import ascore_passport
-from registry.human_points_utils import arecord_stamp_actions
+from registry.human_points_utils import aaward_human_points
 from registry.models import (
     HumanPoints,
     HumanPointsCommunityQualifiedUsers,
@@ -58,7 +58,7 @@ class TestHumanPointsScoringIntegration:
 
     @pytest.mark.django_db(transaction=True)
     @patch("registry.atasks.settings.HUMAN_POINTS_START_TIMESTAMP", 0)
-    async def test_human_keys_detection(self):
+    async def test_human_keys_detection(self, human_points_community):
         """Test that v0 and v1 nullifiers are correctly detected as Human Keys"""
         # Create config for Human Keys
         await HumanPointsConfig.objects.aget_or_create(
@@ -97,7 +97,7 @@ class TestHumanPointsScoringIntegration:
         ]
 
         # Process stamps
-        await arecord_stamp_actions(address, test_stamps)
+        await aaward_human_points(address, human_points_community.id, test_stamps)
 
         # Check that two Human Keys actions were recorded (one for v1, one for v0)
         human_keys_actions = await HumanPoints.objects.filter(
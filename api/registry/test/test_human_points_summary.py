@@ -0,0 +1,175 @@
+"""Tests for the materialized Human Points summaries"""
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from account.models import Community
+from registry import human_points_utils
+from registry.human_points_utils import (
+    get_user_points_data,
+    refresh_points_summaries,
+)
+from registry.models import (
+    HumanPoints,
+    HumanPointsCommunityQualifiedUsers,
+    HumanPointsConfig,
+    HumanPointsMultiplier,
+    HumanPointsSummary,
+)
+
+pytestmark = pytest.mark.django_db
+
+address = "0x1234567890123456789012345678901234567890"
+
+requires_triggers = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="stale triggers require PostgreSQL"
+)
+
+
+@pytest.fixture
+def points_config():
+    for action in [
+        HumanPoints.Action.HUMAN_KEYS,
+        HumanPoints.Action.IDENTITY_STAKING_BRONZE,
+    ]:
+        HumanPointsConfig.objects.update_or_create(
+            action=action, defaults={"points": 100, "active": True}
+        )
+
+
+def test_missing_summary_is_computed_on_read(points_config, scorer_account):
+    HumanPoints.objects.create(
+        address=address, action=HumanPoints.Action.HUMAN_KEYS, provider="Google"
+    )
+    HumanPointsCommunityQualifiedUsers.objects.create(
+        address=address,
+        community=Community.objects.create(name="Community", account=scorer_account),
+    )
+
+    data = get_user_points_data(address.upper().replace("0X", "0x"))
+
+    assert data == {
+        "total_points": 100,
+        "is_eligible": True,
+        "multiplier": 1,
+        "breakdown": {"HKY": 100},
+    }
+    # Reads do not write, the summaries are created by the awards and rebuilds
+    assert not HumanPointsSummary.objects.exists()
+
+
+def test_refreshed_summary_is_stored(points_config):
+    HumanPoints.objects.create(address=address, action=HumanPoints.Action.HUMAN_KEYS)
+
+    refresh_points_summaries([address])
+
+    summary = HumanPointsSummary.objects.get(address=address)
+    assert (summary.total_points, summary.stale) == (100, False)
+
+
+def test_fresh_summary_is_read_with_a_single_query(
+    points_config, django_assert_num_queries
+):
+    HumanPoints.objects.create(address=address, action=HumanPoints.Action.HUMAN_KEYS)
+    refresh_points_summaries([address])
+
+    with django_assert_num_queries(1):
+        assert get_user_points_data(address)["total_points"] == 100
+
+
+@requires_triggers
+def test_new_points_mark_the_summary_stale(points_config):
+    refresh_points_summaries([address])
+
+    # Written like the indexer does, bypassing the app
+    HumanPoints.objects.create(
+        address=address, action=HumanPoints.Action.IDENTITY_STAKING_BRONZE
+    )
+
+    assert HumanPointsSummary.objects.get(address=address).stale
+    assert get_user_points_data(address)["total_points"] == 100
+    # The stale summary is served computed, and left for the next rebuild
+    summary = HumanPointsSummary.objects.get(address=address)
+    assert (summary.total_points, summary.stale) == (0, True)
+
+
+@requires_triggers
+def test_multiplier_changes_mark_the_summary_stale(points_config):
+    HumanPoints.objects.create(address=address, action=HumanPoints.Action.HUMAN_KEYS)
+    refresh_points_summaries([address])
+
+    HumanPointsMultiplier.objects.create(address=address, multiplier=2)
+
+    assert HumanPointsSummary.objects.get(address=address).stale
+    assert get_user_points_data(address)["multiplier"] == 2
+
+
+@requires_triggers
+def test_config_changes_mark_all_summaries_stale(points_config):
+    HumanPoints.objects.create(address=address, action=HumanPoints.Action.HUMAN_KEYS)
+    refresh_points_summaries([address])
+
+    HumanPointsConfig.objects.filter(action=HumanPoints.Action.HUMAN_KEYS).update(
+        points=50
+    )
+
+    assert HumanPointsSummary.objects.get(address=address).stale
+    assert get_user_points_data(address)["total_points"] == 50
+
+
+@requires_triggers
+def test_changes_during_a_refresh_leave_the_summary_stale(points_config, mocker):
+    HumanPoints.objects.create(address=address, action=HumanPoints.Action.HUMAN_KEYS)
+    refresh_points_summaries([address])
+    HumanPointsMultiplier.objects.create(address=address, multiplier=2)
+    compute_points_summaries = human_points_utils.compute_points_summaries
+
+    def compute_then_award(addresses):
+        summaries = compute_points_summaries(addresses)
+        # Points written while the totals are computed
+        HumanPoints.objects.create(
+            address=address, action=HumanPoints.Action.IDENTITY_STAKING_BRONZE
+        )
+        return summaries
+
+    mocker.patch(
+        "registry.human_points_utils.compute_points_summaries",
+        side_effect=compute_then_award,
+    )
+    refresh_points_summaries([address])
+
+    summary = HumanPointsSummary.objects.get(address=address)
+    assert summary.stale
+    mocker.stopall()
+    call_command("rebuild_human_points_summaries", stale_only=True)
+    summary.refresh_from_db()
+    assert (summary.total_points, summary.stale) == (200, False)
+
+
+def test_rebuild_human_points_summaries(points_config, scorer_account):
+    addresses = [f"0x{i:040x}" for i in range(5)]
+    HumanPoints.objects.bulk_create(
+        HumanPoints(address=a, action=HumanPoints.Action.HUMAN_KEYS) for a in addresses
+    )
+    # Addresses with a passing score, with and without points
+    community = Community.objects.create(name="Community", account=scorer_account)
+    qualified_address = f"0x{5:040x}"
+    HumanPointsCommunityQualifiedUsers.objects.bulk_create(
+        HumanPointsCommunityQualifiedUsers(address=a, community=community)
+        for a in [addresses[1], qualified_address]
+    )
+
+    call_command("rebuild_human_points_summaries", batch_size=2)
+
+    assert sorted(
+        HumanPointsSummary.objects.values_list("address", "total_points")
+    ) == [(a, 100) for a in addresses] + [(qualified_address, 0)]
+
+    HumanPointsSummary.objects.filter(address=addresses[0]).update(
+        total_points=0, stale=True
+    )
+    call_command("rebuild_human_points_summaries", stale_only=True)
+
+    summary = HumanPointsSummary.objects.get(address=addresses[0])
+    assert (summary.total_points, summary.stale) == (100, False)
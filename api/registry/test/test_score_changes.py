@@ -0,0 +1,105 @@
+import datetime
+
+import pytest
+from django.test import Client
+
+from registry.models import Passport, Score
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def score_changes_settings(settings):
+    settings.SCORE_CHANGES_SETTLE_TIME = 0
+    settings.SCORE_CHANGES_POLL_INTERVAL = 0.05
+
+
+def score_address(community, address, score):
+    passport, _ = Passport.objects.get_or_create(address=address, community=community)
+    Score.objects.update_or_create(
+        passport=passport,
+        defaults=dict(
+            status=Score.Status.DONE,
+            score=score,
+            last_score_timestamp=datetime.datetime.now(datetime.timezone.utc),
+            evidence={
+                "type": "ThresholdScoreCheck",
+                "success": True,
+                "rawScore": score,
+                "threshold": "20",
+            },
+        ),
+    )
+
+
+def get_changes(scorer_api_key, scorer_community, **params):
+    response = Client().get(
+        f"/registry/scores/{scorer_community.id}/changes",
+        params,
+        HTTP_AUTHORIZATION="Token " + scorer_api_key,
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_follow_changes(scorer_api_key, scorer_community):
+    score_address(scorer_community, "0xa", "1")
+
+    # Without a cursor, the feed starts from the current changes
+    start = get_changes(scorer_api_key, scorer_community)
+    assert start["items"] == []
+
+    score_address(scorer_community, "0xb", "2")
+    score_address(scorer_community, "0xc", "3")
+    score_address(scorer_community, "0xb", "22")
+
+    page = get_changes(
+        scorer_api_key, scorer_community, cursor=start["cursor"], limit=2
+    )
+    assert page["has_more"]
+    assert [(c["address"], c["score"]) for c in page["items"]] == [
+        ("0xb", "2"),
+        ("0xc", "3"),
+    ]
+
+    page = get_changes(scorer_api_key, scorer_community, cursor=page["cursor"])
+    assert not page["has_more"]
+    assert [(c["address"], c["score"]) for c in page["items"]] == [("0xb", "22")]
+    assert page["items"][0]["evidence"]["rawScore"] == 22
+
+    assert get_changes(scorer_api_key, scorer_community, cursor=page["cursor"]) == {
+        "cursor": page["cursor"],
+        "has_more": False,
+        "items": [],
+    }
+
+
+def test_changes_are_deduplicated_per_address(scorer_api_key, scorer_community):
+    cursor = get_changes(scorer_api_key, scorer_community)["cursor"]
+    for score in ["1", "2", "3"]:
+        score_address(scorer_community, "0xa", score)
+
+    page = get_changes(scorer_api_key, scorer_community, cursor=cursor)
+
+    assert [(c["address"], c["score"]) for c in page["items"]] == [("0xa", "3")]
+
+
+def test_long_poll_waits_for_changes(settings, scorer_api_key, scorer_community):
+    cursor = get_changes(scorer_api_key, scorer_community)["cursor"]
+    # The change is only visible once settled, after a few polls
+    settings.SCORE_CHANGES_SETTLE_TIME = 0.2
+    score_address(scorer_community, "0xa", "1")
+
+    assert get_changes(scorer_api_key, scorer_community, cursor=cursor)["items"] == []
+    page = get_changes(scorer_api_key, scorer_community, cursor=cursor, wait=5)
+
+    assert [c["address"] for c in page["items"]] == ["0xa"]
+
+
+def test_changes_require_read_scores(scorer_api_key_no_permissions, scorer_community):
+    response = Client().get(
+        f"/registry/scores/{scorer_community.id}/changes",
+        HTTP_AUTHORIZATION="Token " + scorer_api_key_no_permissions,
+    )
+
+    assert response.status_code == 403
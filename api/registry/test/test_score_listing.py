@@ -0,0 +1,118 @@
+import datetime
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import Client
+
+from registry.models import Passport, Score
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def community_scores(scorer_community):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    scores = []
+    for i in range(7):
+        passport = Passport.objects.create(
+            address=f"0x{i:040x}", community=scorer_community
+        )
+        scores.append(
+            Score.objects.create(
+                status="DONE",
+                passport=passport,
+                score="1",
+                # Several scores share the same timestamp
+                last_score_timestamp=now - datetime.timedelta(days=i // 2),
+                evidence={
+                    "type": "ThresholdScoreCheck",
+                    "success": True,
+                    "rawScore": "21.5",
+                    "threshold": "20",
+                },
+                stamp_scores={"Google": 1},
+            )
+        )
+    # Not scored yet, not listed
+    Score.objects.create(
+        status="PROCESSING",
+        passport=Passport.objects.create(
+            address="0xpending", community=scorer_community
+        ),
+    )
+    return sorted(scores, key=lambda s: (s.last_score_timestamp, s.id))
+
+
+def test_follow_cursor_pages(scorer_api_key, scorer_community, community_scores):
+    client = Client()
+    url = f"/registry/scores/{scorer_community.id}?limit=3"
+    addresses = []
+    pages = 0
+    while url:
+        response = client.get(url, HTTP_AUTHORIZATION="Token " + scorer_api_key)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["prev"] is None
+        assert len(data["items"]) <= 3
+        addresses.extend(item["address"] for item in data["items"])
+        url = data["next"]
+        pages += 1
+
+    assert pages == 3
+    assert addresses == [score.passport.address for score in community_scores]
+
+
+def test_items_match_the_offset_listing(
+    scorer_api_key, scorer_community, community_scores
+):
+    client = Client()
+    cursor_items = client.get(
+        f"/registry/scores/{scorer_community.id}",
+        HTTP_AUTHORIZATION="Token " + scorer_api_key,
+    ).json()["items"]
+    offset_items = client.get(
+        f"/registry/score/{scorer_community.id}?order_by=last_score_timestamp",
+        HTTP_AUTHORIZATION="Token " + scorer_api_key,
+    ).json()["items"]
+
+    offset_items = {item["address"]: item for item in offset_items}
+    for item in cursor_items:
+        assert item == offset_items[item["address"]]
+
+
+def test_invalid_token(scorer_api_key, scorer_community, community_scores):
+    response = Client().get(
+        f"/registry/scores/{scorer_community.id}?token=invalid",
+        HTTP_AUTHORIZATION="Token " + scorer_api_key,
+    )
+
+    assert response.status_code == 400
+
+
+def test_export_scores_as_ndjson(
+    scorer_api_key, scorer_community, community_scores, monkeypatch
+):
+    monkeypatch.setattr("registry.api.v1.SCORE_EXPORT_CHUNK_SIZE", 2)
+    client = Client()
+
+    response = client.get(
+        f"/registry/scores/{scorer_community.id}/export",
+        HTTP_AUTHORIZATION="Token " + scorer_api_key,
+    )
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+    # The scores are streamed from an async iterator, as under ASGI
+    assert response.is_async
+
+    async def read_content():
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    lines = async_to_sync(read_content)().decode().splitlines()
+    exported = [json.loads(line) for line in lines]
+    listed = client.get(
+        f"/registry/scores/{scorer_community.id}",
+        HTTP_AUTHORIZATION="Token " + scorer_api_key,
+    ).json()["items"]
+    assert exported == listed
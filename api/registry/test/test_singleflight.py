@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from django.core.cache import cache
+
+from registry.singleflight import SingleFlight
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_computation():
+    singleflight = SingleFlight("test")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"score": 1}
+
+    results = await asyncio.gather(*[singleflight.do("key", compute) for _ in range(5)])
+
+    assert len(calls) == 1
+    assert results == [{"score": 1}] * 5
+    assert singleflight.stats["leaders"] == 1
+    assert singleflight.stats["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_different_keys_are_not_coalesced():
+    singleflight = SingleFlight("test")
+    calls = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    results = await asyncio.gather(
+        singleflight.do("a", lambda: compute("a")),
+        singleflight.do("b", lambda: compute("b")),
+    )
+
+    assert results == ["a", "b"]
+    assert sorted(calls) == ["a", "b"]
+    assert singleflight.stats["coalesced"] == 0
+
+
+@pytest.mark.asyncio
+async def test_exceptions_are_propagated_to_all_callers():
+    singleflight = SingleFlight("test")
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *[singleflight.do("key", compute) for _ in range(3)],
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_next_call_after_completion_recomputes():
+    singleflight = SingleFlight("test")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert await singleflight.do("key", compute) == 1
+    assert await singleflight.do("key", compute) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_computation():
+    singleflight = SingleFlight("test")
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.ensure_future(singleflight.do("key", compute))
+    second = asyncio.ensure_future(singleflight.do("key", compute))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "done"
+
+
+@pytest.mark.asyncio
+async def test_lock_is_released_after_computation(settings):
+    settings.SINGLEFLIGHT_LOCK_TIMEOUT = 1
+    singleflight = SingleFlight("test_lock")
+
+    async def compute():
+        assert await cache.aget("singleflight:test_lock:key") is not None
+        return "done"
+
+    assert await singleflight.do("key", compute, use_lock=True) == "done"
+    assert await cache.aget("singleflight:test_lock:key") is None
+
+
+@pytest.mark.asyncio
+async def test_waits_for_lock_held_by_other_process(settings):
+    settings.SINGLEFLIGHT_LOCK_TIMEOUT = 1
+    settings.SINGLEFLIGHT_LOCK_POLL_INTERVAL = 0.01
+    singleflight = SingleFlight("test_wait")
+    lock_key = "singleflight:test_wait:key"
+    # Simulate another process holding the lock
+    await cache.aset(lock_key, 1, timeout=1)
+
+    async def release_lock():
+        await asyncio.sleep(0.05)
+        await cache.adelete(lock_key)
+
+    async def compute():
+        return "done"
+
+    release = asyncio.ensure_future(release_lock())
+    assert await singleflight.do("key", compute, use_lock=True) == "done"
+    await release
+
+    assert singleflight.stats["lock_waits"] == 1
+    assert await cache.aget(lock_key) is None
+
+
+@pytest.mark.asyncio
+async def test_expired_lock_taken_over_by_other_process_is_not_released(settings):
+    settings.SINGLEFLIGHT_LOCK_TIMEOUT = 1
+    singleflight = SingleFlight("test_takeover")
+    lock_key = "singleflight:test_takeover:key"
+
+    async def compute():
+        # Simulate our lock expiring and another process acquiring it
+        await cache.adelete(lock_key)
+        await cache.aadd(lock_key, "other-token", timeout=1)
+        return "done"
+
+    assert await singleflight.do("key", compute, use_lock=True) == "done"
+    assert await cache.aget(lock_key) == "other-token"
+    await cache.adelete(lock_key)
@@ -0,0 +1,144 @@
+import json
+import time
+
+import pytest
+from django.core.cache import cache
+
+from registry.api.v1 import fetch_stamp_metadata_for_provider
+from registry.exceptions import InternalServerErrorException
+from registry.stamp_metadata import STAMP_METADATA_CACHE_KEY, stamp_metadata_store
+
+pytestmark = pytest.mark.django_db
+
+
+def stamp_metadata(provider):
+    return [
+        {
+            "id": "TestPlatform",
+            "name": "Test Platform",
+            "icon": "assets/test.svg",
+            "description": "Platform for testing",
+            "connectMessage": "Verify Account",
+            "groups": [
+                {
+                    "name": "Test",
+                    "stamps": [
+                        {
+                            "name": provider,
+                            "description": "Tested",
+                            "hash": "0xb03cac9e8f0914ebb46e62ddee5a8337dcf4cdf6284173ebfb4aa777d5f481be",
+                        }
+                    ],
+                }
+            ],
+        }
+    ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.delete(STAMP_METADATA_CACHE_KEY)
+
+
+def wait_for_refresh():
+    deadline = time.monotonic() + 5
+    while stamp_metadata_store._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_metadata_is_fetched_once(mocker):
+    get = mocker.patch(
+        "requests.get",
+        return_value=mocker.Mock(json=lambda: stamp_metadata("Provider1")),
+    )
+
+    for _ in range(3):
+        metadata = fetch_stamp_metadata_for_provider("Provider1")
+
+    assert metadata["platform"]["id"] == "TestPlatform"
+    assert metadata["group"] == "Test"
+    assert get.call_count == 1
+
+
+def test_stale_metadata_is_served_while_refreshing(mocker, settings):
+    settings.STAMP_METADATA_REFRESH_AFTER = 60
+    mocker.patch(
+        "requests.get",
+        return_value=mocker.Mock(json=lambda: stamp_metadata("Provider1")),
+    )
+    assert fetch_stamp_metadata_for_provider("Provider1") is not None
+
+    # Make the metadata stale, and change what the external URL serves
+    stamp_metadata_store._snapshot.fetched_at -= 120
+    cache.delete(STAMP_METADATA_CACHE_KEY)
+    mocker.patch(
+        "requests.get",
+        return_value=mocker.Mock(json=lambda: stamp_metadata("Provider2")),
+    )
+
+    assert fetch_stamp_metadata_for_provider("Provider1") is not None
+
+    wait_for_refresh()
+    assert fetch_stamp_metadata_for_provider("Provider1") is None
+    assert fetch_stamp_metadata_for_provider("Provider2") is not None
+
+
+def test_cold_start_uses_shared_cache(mocker):
+    mocker.patch(
+        "requests.get",
+        return_value=mocker.Mock(json=lambda: stamp_metadata("Provider1")),
+    )
+    fetch_stamp_metadata_for_provider("Provider1")
+
+    # Another process starting up
+    stamp_metadata_store.reset()
+    get = mocker.patch("requests.get", side_effect=Exception("should not be called"))
+
+    assert fetch_stamp_metadata_for_provider("Provider1") is not None
+    assert get.call_count == 0
+
+
+def test_cold_start_falls_back_to_disk_snapshot(mocker, settings):
+    with open(settings.STAMP_METADATA_SNAPSHOT_PATH, "w") as f:
+        json.dump({"fetched_at": time.time(), "data": stamp_metadata("Provider1")}, f)
+    mocker.patch("requests.get", side_effect=Exception("outage"))
+
+    assert fetch_stamp_metadata_for_provider("Provider1") is not None
+
+
+def test_fetched_metadata_is_saved_to_disk(mocker, settings):
+    mocker.patch(
+        "requests.get",
+        return_value=mocker.Mock(json=lambda: stamp_metadata("Provider1")),
+    )
+    fetch_stamp_metadata_for_provider("Provider1")
+
+    with open(settings.STAMP_METADATA_SNAPSHOT_PATH) as f:
+        snapshot = json.load(f)
+
+    assert snapshot["data"][0]["groups"][0]["stamps"][0]["name"] == "Provider1"
+
+
+def test_unavailable_metadata_raises(mocker):
+    mocker.patch("requests.get", side_effect=Exception("outage"))
+
+    with pytest.raises(InternalServerErrorException):
+        fetch_stamp_metadata_for_provider("Provider1")
+
+
+def test_failed_cold_start_is_not_retried_within_the_retry_interval(mocker, settings):
+    settings.STAMP_METADATA_SNAPSHOT_PATH = None
+    settings.STAMP_METADATA_REFRESH_RETRY_INTERVAL = 60
+    get = mocker.patch("requests.get", side_effect=Exception("outage"))
+
+    for _ in range(3):
+        assert stamp_metadata_store.get_all() is None
+    assert get.call_count == 1
+
+    # Once the retry interval has passed the load is retried
+    stamp_metadata_store._last_refresh_attempt -= 60
+    mocker.patch(
+        "requests.get",
+        return_value=mocker.Mock(json=lambda: stamp_metadata("Provider1")),
+    )
+    assert fetch_stamp_metadata_for_provider("Provider1") is not None
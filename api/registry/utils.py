@@ -1,8 +1,9 @@
 import base64
+import heapq
 import json
 from datetime import datetime, timezone
 from functools import wraps
-from typing import List
+from typing import Iterable, Iterator, List
 from urllib.parse import urlencode
 
 from didkit import verify_credential
@@ -281,3 +282,44 @@ def get_cursor_query_condition(cursor, sort_fields):
     field_ordering = [f"{'-' if is_next else ''}{field}" for field in sort_fields]
 
     return (filter_condition, field_ordering)
+
+
+def iterate_distinct_values(queryset, field: str, batch_size: int) -> Iterator[str]:
+    """
+    Iterate over the distinct (non empty) values of a text `field` of
+    `queryset` in order, reading `batch_size` of them at a time with keyset
+    pagination, so that each page is a range scan of the index on the field
+    """
+    last_value = ""
+    while True:
+        batch = list(
+            queryset.filter(**{f"{field}__gt": last_value})
+            .order_by(field)
+            .values_list(field, flat=True)
+            .distinct()[:batch_size]
+        )
+        if not batch:
+            return
+        yield from batch
+        last_value = batch[-1]
+
+
+def iterate_merged_batches(
+    iterators: Iterable[Iterator], batch_size: int
+) -> Iterator[List]:
+    """
+    Merge sorted iterators of distinct values, dropping the values found in
+    several of them, into batches of `batch_size` values
+    """
+    batch = []
+    last_value = None
+    for value in heapq.merge(*iterators):
+        if value == last_value:
+            continue
+        last_value = value
+        batch.append(value)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -6,6 +6,8 @@ from typing import Optional
 import boto3
 import pyarrow as pa
 import pyarrow.parquet as pq
+from django.db.models import TextField
+from django.db.models.functions import Cast
 from tqdm import tqdm
 
 log = getLogger(__name__)
@@ -119,6 +121,85 @@ def export_data_for_model(
                     else:
                         has_more = False
 
+    return progress_bar.n
+
+
+def export_queryset_to_parquet(
+    queryset,
+    output_file,
+    sort_field="id",
+    chunk_size=10000,
+    compression="zstd",
+    compression_level=None,
+):
+    """
+    Export all the fields of the model of `queryset` to a Parquet file, with
+    the schema from `get_pa_schema`. Returns the number of exported rows.
+
+    Unlike `export_data_for_model`, this reads the rows with a single query,
+    streamed from a server-side cursor (on PostgreSQL, see
+    `QuerySet.iterator`) `chunk_size` rows at a time, as tuples rather than
+    dicts. JSON fields are cast to text by the database instead of being
+    decoded and dumped again. Each chunk is converted to an Arrow record batch
+    column by column and written right away as one row group, so memory use
+    is bounded by `chunk_size` rather than by the number of exported rows.
+    """
+    model = queryset.model
+    schema = get_pa_schema(model)
+    columns = [
+        (
+            Cast(field.attname, output_field=TextField())
+            if field.get_internal_type() == "JSONField"
+            else field.attname
+        )
+        for field in model._meta.fields
+    ]
+    rows = (
+        queryset.order_by(sort_field)
+        .values_list(*columns)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    def to_record_batch(chunk):
+        return pa.RecordBatch.from_arrays(
+            [
+                pa.array(column, type=field.type)
+                for column, field in zip(zip(*chunk), schema)
+            ],
+            schema=schema,
+        )
+
+    num_rows = 0
+    with (
+        tqdm(
+            unit="records",
+            unit_scale=True,
+            desc=f"Exporting records of {model._meta.db_table}",
+        ) as progress_bar,
+        pq.ParquetWriter(
+            output_file,
+            schema,
+            compression=compression,
+            compression_level=compression_level,
+        ) as writer,
+    ):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) < chunk_size:
+                continue
+            writer.write_batch(to_record_batch(chunk))
+            num_rows += len(chunk)
+            progress_bar.update(len(chunk))
+            chunk = []
+
+        if chunk:
+            writer.write_batch(to_record_batch(chunk))
+            num_rows += len(chunk)
+            progress_bar.update(len(chunk))
+
+    return num_rows
+
 
 class AWSOverrideCredentials:
     def __init__(self, aws_access_key_id, aws_secret_access_key, aws_endpoint_url):
@@ -127,6 +208,82 @@ class AWSOverrideCredentials:
         self.aws_endpoint_url = aws_endpoint_url
 
 
+# Size of the parts of the S3 multipart uploads, S3 requires at least 5MB for
+# all the parts but the last one
+S3_MULTIPART_PART_SIZE = 8 * 1024 * 1024
+
+
+class S3MultipartUploadWriter:
+    """
+    Binary file-like object uploading the data written to it to S3 with a
+    multipart upload, one part every `part_size` bytes, so that the file is
+    never held in memory as a whole.
+
+    Used as a context manager: the upload is completed on exit, or aborted if an
+    exception was raised.
+    """
+
+    def __init__(
+        self,
+        s3,
+        s3_bucket_name,
+        s3_key,
+        extra_args=None,
+        part_size=S3_MULTIPART_PART_SIZE,
+    ):
+        self.s3 = s3
+        self.s3_bucket_name = s3_bucket_name
+        self.s3_key = s3_key
+        self.extra_args = extra_args or {}
+        self.part_size = part_size
+        self.upload_id = None
+        self.parts = []
+        self.buffer = bytearray()
+
+    def __enter__(self):
+        response = self.s3.create_multipart_upload(
+            Bucket=self.s3_bucket_name, Key=self.s3_key, **self.extra_args
+        )
+        self.upload_id = response["UploadId"]
+        return self
+
+    def write(self, data: bytes):
+        self.buffer += data
+        while len(self.buffer) >= self.part_size:
+            self._upload_part(self.buffer[: self.part_size])
+            del self.buffer[: self.part_size]
+
+    def _upload_part(self, body):
+        part_number = len(self.parts) + 1
+        response = self.s3.upload_part(
+            Bucket=self.s3_bucket_name,
+            Key=self.s3_key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=bytes(body),
+        )
+        self.parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.s3.abort_multipart_upload(
+                Bucket=self.s3_bucket_name, Key=self.s3_key, UploadId=self.upload_id
+            )
+            return False
+
+        # The last part may be smaller than `part_size` (or empty, if nothing
+        # was written)
+        if self.buffer or not self.parts:
+            self._upload_part(self.buffer)
+        self.s3.complete_multipart_upload(
+            Bucket=self.s3_bucket_name,
+            Key=self.s3_key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": self.parts},
+        )
+        return False
+
+
 def upload_to_s3(
     output_file,
     s3_folder,
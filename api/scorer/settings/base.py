@@ -439,6 +439,19 @@ CERAMIC_CACHE_CACAO_VALIDATION_URL = env(
 
 MAX_BULK_CACHE_SIZE = 100
 
+# Max age (in seconds) of the in-memory ban index, after which it is reloaded
+# even if no ban change has been signalled
+BAN_INDEX_MAX_AGE = env.int("BAN_INDEX_MAX_AGE", default=300)
+
+# Max age (in seconds) of the in-memory address list indexes, after which they
+# are reloaded even if no list change has been signalled
+ADDRESS_LIST_INDEX_MAX_AGE = env.int("ADDRESS_LIST_INDEX_MAX_AGE", default=300)
+
+# The in-memory stake cache keeps the stakes of up to STAKE_CACHE_MAX_SIZE
+# addresses, and checks for stake updates every STAKE_CACHE_VERSION_TTL seconds
+STAKE_CACHE_MAX_SIZE = env.int("STAKE_CACHE_MAX_SIZE", default=10000)
+STAKE_CACHE_VERSION_TTL = env.float("STAKE_CACHE_VERSION_TTL", default=5)
+
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.redis.RedisCache",
@@ -509,6 +522,25 @@ BULK_MODEL_SCORE_REQUESTS_TRIGGER_FOLDER = env(
 )
 BULK_MODEL_SCORE_BATCH_SIZE = env("BULK_MODEL_SCORE_BATCH_SIZE", default=50)
 BULK_MODEL_SCORE_RETRY_SLEEP = env("BULK_MODEL_SCORE_RETRY_SLEEP", default=10)
+# Bounds of the adaptive number of addresses scored concurrently by
+# process_batch_model_address_upload, and the analysis duration (in seconds)
+# above which the concurrency is reduced
+BULK_MODEL_SCORE_MIN_CONCURRENCY = env.int(
+    "BULK_MODEL_SCORE_MIN_CONCURRENCY", default=1
+)
+BULK_MODEL_SCORE_MAX_CONCURRENCY = env.int(
+    "BULK_MODEL_SCORE_MAX_CONCURRENCY", default=100
+)
+BULK_MODEL_SCORE_TARGET_LATENCY = env.float(
+    "BULK_MODEL_SCORE_TARGET_LATENCY", default=10
+)
+BULK_MODEL_SCORE_RESULTS_EXPORT_BATCH_SIZE = env.int(
+    "BULK_MODEL_SCORE_RESULTS_EXPORT_BATCH_SIZE", default=1000
+)
+
+# Incremental exports only export records older than this (in seconds), see
+# ceramic_cache/incremental_exports.py
+INCREMENTAL_EXPORT_LAG = env.int("INCREMENTAL_EXPORT_LAG", default=300)
 
 S3_BUCKET = env("S3_BUCKET", default="bulk-score-requests")
 S3_OBJECT_KEY = env(
@@ -533,6 +565,18 @@ FF_V2_API = env("FF_V2_API", default="off")
 FF_MULTI_NULLIFIER = env("FF_MULTI_NULLIFIER", default="off")
 MEDIA_ROOT = env("MEDIA_ROOT", default="")
 
+# Overlap (in seconds) of the notification generation runs for an address, so
+# that events and stamps committed late are not missed
+NOTIFICATION_GENERATION_OVERLAP = env.int("NOTIFICATION_GENERATION_OVERLAP", default=60)
+
+# Backfill commands pause while the replication lag (in seconds) of one of the
+# BACKFILL_REPLICA_DATABASES exceeds BACKFILL_MAX_REPLICA_LAG
+BACKFILL_REPLICA_DATABASES = env.list(
+    "BACKFILL_REPLICA_DATABASES", default=["read_replica_0", "read_replica_analytics"]
+)
+BACKFILL_MAX_REPLICA_LAG = env.float("BACKFILL_MAX_REPLICA_LAG", default=30)
+BACKFILL_REPLICA_LAG_WAIT = env.float("BACKFILL_REPLICA_LAG_WAIT", default=10)
+
 # Max age of the system tests before we consider them outdated in seconds
 # This affects the return of the server status
 SYSTEM_TESTS_MAX_AGE_BEFORE_OUTDATED = env.float(
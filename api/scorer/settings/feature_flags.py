@@ -15,3 +15,8 @@ HUMAN_POINTS_START_TIMESTAMP = env.int("HUMAN_POINTS_START_TIMESTAMP", default=0
 
 # MetaMask OG points feature flag
 HUMAN_POINTS_MTA_ENABLED = env.bool("HUMAN_POINTS_MTA_ENABLED", default=False)
+
+# Serve model responses for the analysis API from the model score cache
+# (in-process LRU, django cache and the data_model cache table), see
+# passport/model_score_cache.py
+MODEL_SCORE_CACHE_ENABLED = env.bool("MODEL_SCORE_CACHE_ENABLED", default=False)
@@ -54,3 +54,31 @@ MODEL_ENDPOINTS_DEFAULT = "aggregate"
 # while the single-model restriction is in place. Once lifted,
 # this can be removed
 ONLY_ONE_MODEL = True
+
+# Requests to the model endpoints, see passport/model_client.py
+MODEL_REQUEST_TIMEOUT = env.float("MODEL_REQUEST_TIMEOUT", default=30.0)
+# Per model overrides of MODEL_REQUEST_TIMEOUT, e.g. {"aggregate": 10}
+MODEL_REQUEST_TIMEOUTS = env.json("MODEL_REQUEST_TIMEOUTS", default={})
+MODEL_MAX_CONCURRENT_REQUESTS = env.int("MODEL_MAX_CONCURRENT_REQUESTS", default=50)
+MODEL_CLIENT_MAX_CONNECTIONS = env.int("MODEL_CLIENT_MAX_CONNECTIONS", default=200)
+MODEL_CLIENT_KEEPALIVE_TIMEOUT = env.float(
+    "MODEL_CLIENT_KEEPALIVE_TIMEOUT", default=60.0
+)
+MODEL_CIRCUIT_BREAKER_FAILURE_THRESHOLD = env.int(
+    "MODEL_CIRCUIT_BREAKER_FAILURE_THRESHOLD", default=5
+)
+MODEL_CIRCUIT_BREAKER_RESET_TIMEOUT = env.float(
+    "MODEL_CIRCUIT_BREAKER_RESET_TIMEOUT", default=30.0
+)
+
+# Freshness of cached model responses (in seconds), see passport/model_score_cache.py
+MODEL_SCORE_CACHE_TTL = env.int("MODEL_SCORE_CACHE_TTL", default=24 * 60 * 60)
+# Per model overrides of MODEL_SCORE_CACHE_TTL, e.g. {"aggregate": 3600}
+MODEL_SCORE_CACHE_TTLS = env.json("MODEL_SCORE_CACHE_TTLS", default={})
+MODEL_SCORE_CACHE_LRU_SIZE = env.int("MODEL_SCORE_CACHE_LRU_SIZE", default=10000)
+# Key (`key_0`) of each model's entries in the data_model cache table, for
+# models not using their name as key
+MODEL_SCORE_CACHE_KEYS = env.json(
+    "MODEL_SCORE_CACHE_KEYS",
+    default={"ethereum_activity": "predict", "nft": "predict_nft"},
+)
@@ -1,3 +1,43 @@
 from .env import env
 
 REGISTRY_API_READ_DB = env("REGISTRY_API_READ_DB", default="default")
+
+# Score change feed: maximum time a request may wait for new changes (long-poll),
+# and how often the events are polled meanwhile. Events younger than
+# SCORE_CHANGES_SETTLE_TIME seconds are held back, so that an event committed
+# late by a concurrent transaction (with a lower id) is not skipped by the cursor
+SCORE_CHANGES_MAX_WAIT = env.int("SCORE_CHANGES_MAX_WAIT", default=30)
+SCORE_CHANGES_POLL_INTERVAL = env.float("SCORE_CHANGES_POLL_INTERVAL", default=1.0)
+SCORE_CHANGES_SETTLE_TIME = env.float("SCORE_CHANGES_SETTLE_TIME", default=2.0)
+
+# The fingerprint of the inputs of a score (stamps and weights), used to skip
+# rescoring an unchanged passport, is kept in the cache for this many seconds
+PASSPORT_FINGERPRINT_CACHE_TTL = env.int(
+    "PASSPORT_FINGERPRINT_CACHE_TTL", default=7 * 24 * 60 * 60
+)
+
+# Serialize scoring of the same (scorer, address) across processes with a short
+# lived lock in the cache. Concurrent requests within a process are always coalesced.
+SCORE_COALESCING_LOCK_ENABLED = env.bool("SCORE_COALESCING_LOCK_ENABLED", default=False)
+SINGLEFLIGHT_LOCK_TIMEOUT = env.float("SINGLEFLIGHT_LOCK_TIMEOUT", default=10.0)
+SINGLEFLIGHT_LOCK_POLL_INTERVAL = env.float(
+    "SINGLEFLIGHT_LOCK_POLL_INTERVAL", default=0.05
+)
+
+# Stamp metadata is served from memory and refreshed in the background once it
+# is older than STAMP_METADATA_REFRESH_AFTER seconds. The last fetched metadata
+# is saved to STAMP_METADATA_SNAPSHOT_PATH (if set) for cold starts during outages
+STAMP_METADATA_REFRESH_AFTER = env.int("STAMP_METADATA_REFRESH_AFTER", default=60 * 60)
+STAMP_METADATA_REFRESH_RETRY_INTERVAL = env.int(
+    "STAMP_METADATA_REFRESH_RETRY_INTERVAL", default=60
+)
+STAMP_METADATA_FETCH_TIMEOUT = env.float("STAMP_METADATA_FETCH_TIMEOUT", default=10.0)
+STAMP_METADATA_SNAPSHOT_PATH = env(
+    "STAMP_METADATA_SNAPSHOT_PATH", default="/tmp/stamp_metadata.json"
+)
+
+# Once the cap of a capped human points award has been reached, the awards are
+# refused without counting them again for this many seconds
+HUMAN_POINTS_CAP_RECOUNT_AFTER = env.int(
+    "HUMAN_POINTS_CAP_RECOUNT_AFTER", default=5 * 60
+)
@@ -1,12 +1,11 @@
 from typing import List
 
-from django.db.models import Q
-
 import api_logging as logging
 from registry.api.utils import is_valid_address, with_read_db
 from registry.exceptions import InvalidAddressException, StakingRequestError
 from stake.models import Stake
 from stake.schema import StakeResponse, StakeSchema
+from stake.stake_cache import get_cached_stakes
 
 log = logging.getLogger(__name__)
 
@@ -20,24 +19,35 @@ def handle_get_gtc_stake(address: str) -> StakeResponse:
     return StakeResponse(items=items)
 
 
+def get_stakes_from_db(address: str) -> List[StakeSchema]:
+    """
+    Load the stakes of the (lowercase) address, as staker or stakee. The two
+    lookups are combined with UNION ALL so that each one can use its index.
+    """
+    stakes = with_read_db(Stake)
+    return [
+        StakeSchema(
+            chain=stake.chain,
+            staker=stake.staker,
+            stakee=stake.stakee,
+            amount=stake.current_amount,
+            lock_time=stake.lock_time.isoformat(),
+            unlock_time=stake.unlock_time.isoformat(),
+            last_updated_in_block=stake.last_updated_in_block,
+        )
+        for stake in stakes.filter(staker=address).union(
+            # Self stakes are already selected as staker
+            stakes.filter(stakee=address).exclude(staker=address),
+            all=True,
+        )
+    ]
+
+
 def get_gtc_stake_for_address(address: str) -> List[StakeSchema]:
     address = address.lower()
 
     try:
-        return [
-            StakeSchema(
-                chain=stake.chain,
-                staker=stake.staker,
-                stakee=stake.stakee,
-                amount=stake.current_amount,
-                lock_time=stake.lock_time.isoformat(),
-                unlock_time=stake.unlock_time.isoformat(),
-                last_updated_in_block=stake.last_updated_in_block,
-            )
-            for stake in with_read_db(Stake).filter(
-                Q(staker=address) | Q(stakee=address)
-            )
-        ]
+        return get_cached_stakes(address, get_stakes_from_db)
     except Exception:
         log.exception("Error getting GTC stakes")
         raise StakingRequestError()
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.6 on 2026-10-19 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stake", "0007_lastblock"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="stake",
+            index=models.Index(
+                fields=["chain", "last_updated_in_block"],
+                name="stake_chain_last_block_idx",
+            ),
+        ),
+    ]
@@ -34,6 +34,13 @@ class Stake(models.Model):
 
     class Meta:
         unique_together = ["staker", "stakee", "chain"]
+        indexes = [
+            # Latest stake update of each chain (see stake.stake_cache)
+            models.Index(
+                fields=["chain", "last_updated_in_block"],
+                name="stake_chain_last_block_idx",
+            ),
+        ]
 
 
 # Stores raw staking events, for analysis and debugging
@@ -0,0 +1,178 @@
+"""
+In-memory cache of the stakes of addresses, used to serve the GTC stake
+lookups (stamp issuance, passport app) without querying the database for every
+request.
+
+Stakes are written by the indexer, outside of this app, and always record the
+block in which they were last updated. The cache is invalidated by block
+height: the stake version is the highest block in which a stake was updated on
+each chain, and is read from the database at most every
+`STAKE_CACHE_VERSION_TTL` seconds (this bounds the staleness of the cache).
+When the version moves, only the addresses of the stakes updated after the
+previous version are dropped, the other entries are carried over to the new
+version. Entries loaded at an older version are reloaded.
+
+At most `STAKE_CACHE_MAX_SIZE` addresses are kept, the least recently used
+ones are dropped first.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+
+from registry.api.utils import with_read_db
+from stake.models import Stake
+from stake.schema import StakeSchema
+
+StakeVersion = Tuple[Tuple[int, int], ...]
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, Tuple[StakeVersion, List[StakeSchema]]]" = OrderedDict()
+_version: Optional[StakeVersion] = None
+_version_read_at: float = 0
+
+
+# Postgres has no skip scan, so a GROUP BY chain reads the whole index. The
+# chains are walked instead, with one index lookup for the next chain and one
+# for its latest update (an ORDER BY ... DESC LIMIT 1 on the
+# (chain, last_updated_in_block) index).
+STAKE_VERSION_QUERY = """
+WITH RECURSIVE chains AS (
+    (SELECT chain FROM stake_stake ORDER BY chain LIMIT 1)
+    UNION ALL
+    SELECT (
+        SELECT chain FROM stake_stake WHERE chain > chains.chain
+        ORDER BY chain LIMIT 1
+    )
+    FROM chains
+    WHERE chains.chain IS NOT NULL
+)
+SELECT chain, (
+    SELECT last_updated_in_block FROM stake_stake
+    WHERE stake_stake.chain = chains.chain
+    ORDER BY last_updated_in_block DESC LIMIT 1
+)
+FROM chains
+WHERE chain IS NOT NULL
+ORDER BY chain
+"""
+
+
+def _read_stake_version() -> StakeVersion:
+    with connections[settings.REGISTRY_API_READ_DB].cursor() as cursor:
+        cursor.execute(STAKE_VERSION_QUERY)
+        return tuple(cursor.fetchall())
+
+
+def _read_updated_addresses(
+    previous: StakeVersion, version: StakeVersion
+) -> Optional[Set[str]]:
+    """
+    Return the addresses of the stakes updated between the two versions, or
+    None if they cannot be read from the updated blocks (a chain was added,
+    removed or reindexed, or there are more updates than the cache can hold)
+    and the whole cache has to be dropped
+    """
+    previous_blocks = dict(previous)
+    if set(previous_blocks) != {chain for chain, _ in version}:
+        return None
+
+    updated = Q()
+    for chain, block in version:
+        if block < previous_blocks[chain]:
+            return None
+        if block > previous_blocks[chain]:
+            updated |= Q(chain=chain, last_updated_in_block__gt=previous_blocks[chain])
+
+    limit = settings.STAKE_CACHE_MAX_SIZE
+    rows = list(
+        with_read_db(Stake).filter(updated).values_list("staker", "stakee")[: limit + 1]
+    )
+    if len(rows) > limit:
+        return None
+    return {address for row in rows for address in row}
+
+
+def _carry_over_entries(
+    previous: StakeVersion, version: StakeVersion, updated: Optional[Set[str]]
+):
+    """
+    Tag the entries loaded at `previous` with `version`, apart from the
+    updated addresses which are dropped. Must be called with `_lock` held.
+    """
+    if updated is None:
+        _entries.clear()
+        return
+    for address in updated:
+        _entries.pop(address, None)
+    for address, (entry_version, items) in list(_entries.items()):
+        if entry_version == previous:
+            _entries[address] = (version, items)
+
+
+def get_stake_version() -> StakeVersion:
+    """
+    Return the current stake version, read from the database if older than
+    STAKE_CACHE_VERSION_TTL seconds
+    """
+    global _version, _version_read_at
+
+    with _lock:
+        if (
+            _version is not None
+            and time.monotonic() - _version_read_at < settings.STAKE_CACHE_VERSION_TTL
+        ):
+            return _version
+        previous = _version
+
+    version = _read_stake_version()
+    updated = None
+    if previous is not None and version != previous:
+        updated = _read_updated_addresses(previous, version)
+
+    with _lock:
+        # Another thread may have moved the version in the meantime, its
+        # entries are then reloaded
+        if previous is not None and version != previous and _version == previous:
+            _carry_over_entries(previous, version, updated)
+        _version = version
+        _version_read_at = time.monotonic()
+    return version
+
+
+def get_cached_stakes(
+    address: str, load: Callable[[str], List[StakeSchema]]
+) -> List[StakeSchema]:
+    """
+    Return the stakes of the (lowercase) address, calling `load` if they are not
+    cached at the current stake version
+    """
+    version = get_stake_version()
+    with _lock:
+        entry = _entries.get(address)
+        if entry is not None and entry[0] == version:
+            _entries.move_to_end(address)
+            return entry[1]
+
+    items = load(address)
+    with _lock:
+        _entries[address] = (version, items)
+        _entries.move_to_end(address)
+        while len(_entries) > settings.STAKE_CACHE_MAX_SIZE:
+            _entries.popitem(last=False)
+    return items
+
+
+def reset_stake_cache():
+    """
+    Drop the stake cache of this process
+    """
+    global _version
+    with _lock:
+        _entries.clear()
+        _version = None
@@ -187,6 +187,12 @@ class TestGetStakingResults:
 
         class QueryMock:
             def filter(self, *args, **kwargs):
+                return self
+
+            def exclude(self, *args, **kwargs):
+                return self
+
+            def union(self, *args, **kwargs):
                 return [
                     Stake.objects.create(
                         chain="1",
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from stake.api import get_gtc_stake_for_address
+from stake.models import Stake
+from stake.stake_cache import _entries
+
+pytestmark = pytest.mark.django_db
+
+address = "0x976ea74026e726554db657fa54763abd0c3a0aa9"
+other_address = "0x14dc79964da2c08b23698b3d3cc7ca32193d9955"
+
+
+def create_stake(staker, stakee, block, chain=10):
+    return Stake.objects.create(
+        chain=chain,
+        staker=staker,
+        stakee=stakee,
+        current_amount=Decimal("100"),
+        last_updated_in_block=block,
+        lock_time=datetime.now(timezone.utc),
+        unlock_time=datetime.now(timezone.utc) + timedelta(days=90),
+    )
+
+
+def stakes(address):
+    return sorted(
+        (s.chain, s.staker, s.stakee) for s in get_gtc_stake_for_address(address)
+    )
+
+
+def test_stakes_as_staker_and_stakee():
+    create_stake(address, address, 1)
+    create_stake(address, other_address, 2)
+    create_stake(other_address, address, 3, chain=1)
+    create_stake(other_address, other_address, 4)
+
+    assert stakes(address.upper().replace("0X", "0x")) == [
+        (1, other_address, address),
+        (10, address, other_address),
+        (10, address, address),
+    ]
+
+
+def test_stakes_are_cached(django_assert_num_queries):
+    create_stake(address, address, 1)
+    expected = stakes(address)
+
+    with django_assert_num_queries(0):
+        assert stakes(address) == expected
+
+
+def test_stake_updates_invalidate_the_cache(settings, django_assert_num_queries):
+    settings.STAKE_CACHE_VERSION_TTL = 0
+    stake = create_stake(address, address, 1)
+    create_stake(other_address, other_address, 2, chain=1)
+    stakes(address)
+
+    # Only the stake version is read while there are no updates
+    with django_assert_num_queries(1):
+        stakes(address)
+
+    # Updates on another chain with lower block numbers are seen
+    stake.stakee = other_address
+    stake.last_updated_in_block = 2
+    stake.save()
+
+    assert stakes(address) == [(10, address, other_address)]
+
+
+def test_stake_updates_only_invalidate_the_updated_addresses(
+    settings, django_assert_num_queries
+):
+    settings.STAKE_CACHE_VERSION_TTL = 0
+    create_stake(address, address, 1)
+    stake = create_stake(other_address, other_address, 2)
+    expected = stakes(address)
+    stakes(other_address)
+
+    stake.current_amount = Decimal("200")
+    stake.last_updated_in_block = 3
+    stake.save()
+
+    # The stake version and the updated addresses are read, the stakes of the
+    # address are not reloaded
+    with django_assert_num_queries(2):
+        assert stakes(address) == expected
+    assert other_address not in _entries
+
+
+def test_stakes_on_a_new_chain_invalidate_the_cache(settings):
+    settings.STAKE_CACHE_VERSION_TTL = 0
+    create_stake(address, address, 1)
+    stakes(address)
+
+    create_stake(other_address, address, 1, chain=1)
+
+    assert stakes(address) == [(1, other_address, address), (10, address, address)]
+
+
+def test_least_recently_used_addresses_are_dropped(settings):
+    settings.STAKE_CACHE_MAX_SIZE = 1
+    stakes(address)
+    stakes(other_address)
+
+    assert list(_entries) == [other_address]
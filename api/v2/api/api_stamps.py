@@ -1,11 +1,12 @@
+import asyncio
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
-from urllib.parse import urljoin
 
 import django_filters
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.core.cache import cache
+from django.db import transaction
 from ninja_extra.exceptions import APIException
 
 import api_logging as logging
@@ -17,6 +18,7 @@ from account.models import (
     WalletGroupCommunityClaim,
 )
 from ceramic_cache.models import CeramicCache
+from reader.passport_reader import aget_passports
 from registry.api.schema import (
     CursorPaginatedStampCredentialResponse,
     ErrorMessageResponse,
@@ -35,8 +37,9 @@ from registry.api.utils import (
 from registry.api.v1 import (
     aget_scorer_by_id,
     fetch_all_stamp_metadata,
+    fetch_stamp_metadata_for_provider,
 )
-from registry.atasks import ascore_passport
+from registry.atasks import ClaimOrder, ascore_passport
 from registry.exceptions import (
     CreatedAtIsRequiredException,
     InternalServerErrorException,
@@ -45,7 +48,8 @@ from registry.exceptions import (
     InvalidLimitException,
     api_get_object_or_404,
 )
-from registry.models import Event, Passport, Score
+from registry.models import Event, Passport, Score, score_update_event
+from registry.singleflight import SingleFlight
 from registry.utils import (
     decode_cursor,
     encode_cursor,
@@ -58,10 +62,12 @@ from v2.schema import LinkedScoreResponse, PointsData, V2ScoreResponse
 from ..exceptions import ScoreDoesNotExist
 from .router import api_router
 
-METADATA_URL = urljoin(settings.PASSPORT_PUBLIC_URL, "stampMetadata.json")
-
 log = logging.getLogger(__name__)
 
+# Concurrent requests to the score endpoint for the same (scorer, address) share
+# one computation
+score_singleflight = SingleFlight("score")
+
 
 def _parse_expiration(exp_date) -> Optional[datetime]:
     """Parse an expiration date (string or datetime) into a timezone-aware datetime."""
@@ -170,54 +176,133 @@ async def _score_single_address(address: str, community: Community) -> V2ScoreRe
     scorer = await community.aget_scorer()
     scorer_type = scorer.type
 
-    db_passport, _ = await Passport.objects.aupdate_or_create(
-        address=address,
-        community=community,
+    # Repeat lookups hit an existing score, in which case we can skip creating
+    # the passport & score records
+    score = (
+        await Score.objects.select_related("passport")
+        .filter(passport__address=address, passport__community=community)
+        .afirst()
     )
 
-    score, _ = await Score.objects.select_related("passport").aget_or_create(
-        passport=db_passport,
-        defaults=dict(score=None, status=Score.Status.PROCESSING),
-    )
+    if score:
+        db_passport = score.passport
+    else:
+        db_passport, _ = await Passport.objects.aupdate_or_create(
+            address=address,
+            community=community,
+        )
 
-    await ascore_passport(community, db_passport, address, score)
-    await score.asave()
+        score, _ = await Score.objects.select_related("passport").aget_or_create(
+            passport=db_passport,
+            defaults=dict(score=None, status=Score.Status.PROCESSING),
+        )
+
+    rescored = await ascore_passport(
+        community, db_passport, address, score, skip_if_fresh=True
+    )
+    if rescored:
+        await score.asave()
 
     return format_v2_score_response(score, scorer_type)
 
 
+WALLET_GROUP_SCORE_FIELDS = [
+    "score",
+    "status",
+    "last_score_timestamp",
+    "expiration_date",
+    "evidence",
+    "error",
+    "stamp_scores",
+    "stamps",
+]
+
+
+async def _aget_wallet_group_scores(
+    addresses: list[str], community: Community
+) -> dict[str, Score]:
+    """Get (or create) the passports and scores of all wallets in a group, in a few set-based queries."""
+    passports = Passport.objects.filter(address__in=addresses, community=community)
+    existing = {addr async for addr in passports.values_list("address", flat=True)}
+    missing = [addr for addr in addresses if addr not in existing]
+    if missing:
+        await Passport.objects.abulk_create(
+            [Passport(address=addr, community=community) for addr in missing],
+            ignore_conflicts=True,
+        )
+
+    scores = Score.objects.select_related("passport").filter(
+        passport__address__in=addresses, passport__community=community
+    )
+    existing = {s.passport_id async for s in scores.only("passport_id")}
+    missing = [p async for p in passports if p.id not in existing]
+    if missing:
+        await Score.objects.abulk_create(
+            [
+                Score(passport=p, score=None, status=Score.Status.PROCESSING)
+                for p in missing
+            ],
+            ignore_conflicts=True,
+        )
+
+    return {s.passport.address: s async for s in scores}
+
+
+async def _asave_wallet_group_scores(scores: list[Score]) -> None:
+    """Save the scores of all wallets in a group with a single batched write.
+
+    ``bulk_update`` does not send the ``pre_save`` signal, so the SCORE_UPDATE
+    events are created here.
+    """
+
+    def save():
+        with transaction.atomic():
+            Score.objects.bulk_update(scores, WALLET_GROUP_SCORE_FIELDS)
+            Event.objects.bulk_create(
+                score_update_event(score)
+                for score in scores
+                if score.status == Score.Status.DONE
+            )
+
+    await sync_to_async(save)()
+
+
 async def _score_wallet_group(
     canonical_address: str,
     group_addresses: list[str],
     community: Community,
 ) -> V2ScoreResponse:
-    """Score all wallets in a group individually, then merge by provider for the canonical wallet."""
+    """Score all wallets in a group concurrently, then merge by provider for the canonical wallet."""
     scorer = await community.aget_scorer()
     scorer_type = scorer.type
 
-    # Score each wallet through the existing pipeline
-    wallet_scores: dict[str, Score] = {}
-    for addr in group_addresses:
-        db_passport, _ = await Passport.objects.aupdate_or_create(
-            address=addr, community=community
-        )
-        score, _ = await Score.objects.select_related("passport").aget_or_create(
-            passport=db_passport,
-            defaults=dict(score=None, status=Score.Status.PROCESSING),
+    # Deterministic order: the canonical wallet first so its stamps take
+    # priority, both when claiming stamp hashes (deduplication) and when merging
+    ordered_addresses = [canonical_address] + sorted(
+        {a for a in group_addresses if a != canonical_address}
+    )
+
+    wallet_scores = await _aget_wallet_group_scores(ordered_addresses, community)
+    passports_data = await aget_passports(ordered_addresses)
+
+    # Score each wallet through the existing pipeline. Credentials are validated
+    # concurrently, the deduplication runs in turn in the claim order
+    claim_order = ClaimOrder(ordered_addresses)
+    await asyncio.gather(
+        *(
+            ascore_passport(
+                community,
+                wallet_scores[addr].passport,
+                addr,
+                wallet_scores[addr],
+                passport_data=passports_data[addr],
+                claim_order=claim_order,
+            )
+            for addr in ordered_addresses
         )
-        await ascore_passport(community, db_passport, addr, score)
-        # Save non-canonical wallets immediately; defer canonical save until after merge
-        # to avoid a spurious SCORE_UPDATE event with pre-merge data
-        if addr != canonical_address:
-            await score.asave()
-        wallet_scores[addr] = score
+    )
 
     # Merge stamps by provider: take first valid (non-deduped) stamp per provider
-    # Process canonical wallet first so its stamps take priority
-    ordered_addresses = [canonical_address] + [
-        a for a in group_addresses if a != canonical_address
-    ]
-
     merged_stamps: Dict[str, Any] = {}
     for addr in ordered_addresses:
         score = wallet_scores[addr]
@@ -267,7 +352,10 @@ async def _score_wallet_group(
     canonical_score.last_score_timestamp = get_utc_time()
     if earliest_expiration:
         canonical_score.expiration_date = earliest_expiration
-    await canonical_score.asave()
+
+    # Saving the canonical wallet's score only after the merge avoids a spurious
+    # SCORE_UPDATE event with pre-merge data
+    await _asave_wallet_group_scores(list(wallet_scores.values()))
 
     # Build per-wallet stamp breakdown for UI visibility
     wallet_stamps: Dict[str, Dict[str, Any]] = {}
@@ -387,7 +475,13 @@ async def a_submit_passport(request, scorer_id: int, address: str) -> V2ScoreRes
         pass
 
     try:
-        return await handle_scoring_for_account(address, str(scorer_id), request.auth)
+        # The account is part of the key, so that requests are only coalesced with
+        # requests that passed the same scorer ownership check
+        return await score_singleflight.do(
+            (request.auth.pk, str(scorer_id), address.lower()),
+            lambda: handle_scoring_for_account(address, str(scorer_id), request.auth),
+            use_lock=settings.SCORE_COALESCING_LOCK_ENABLED,
+        )
     except APIException as e:
         raise e
     except Exception as e:
@@ -646,37 +740,3 @@ def get_passport_stamps(
     )
 
     return response
-
-
-def fetch_stamp_metadata_for_provider(provider: str):
-    metadataByProvider = cache.get("metadataByProvider")
-
-    try:
-        if metadataByProvider is None:
-            metadata = fetch_all_stamp_metadata()
-            metadataByProvider = {
-                stamp.name: {
-                    "name": stamp.name,
-                    "description": stamp.description,
-                    "hash": stamp.hash,
-                    "group": group.name,
-                    "platform": {
-                        "name": platform.name,
-                        "id": platform.id,
-                        "icon": platform.icon,
-                        "description": platform.description,
-                        "connectMessage": platform.connectMessage,
-                    },
-                }
-                for platform in metadata
-                for group in platform.groups
-                for stamp in group.stamps
-            }
-            cache.set("metadataByProvider", metadataByProvider, 60 * 60)
-    except Exception:
-        log.exception("Error fetching external metadata")
-        raise InternalServerErrorException(
-            "Error fetching external stamp metadata for provider " + provider
-        )
-
-    return metadataByProvider.get(provider)
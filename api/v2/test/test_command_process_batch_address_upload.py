@@ -1,3 +1,4 @@
+import csv
 import json
 from io import StringIO
 from typing import Dict
@@ -104,6 +105,14 @@ class TestProcessBatchModelAddressUploads(TransactionTestCase):
                     f"Expected {expected_calls} calls to handle_get_analysis, but got {mock_handle_get_analysis.call_count}",
                 )
 
+                with updated_request.results_file.open("r") as results_file:
+                    rows = list(csv.reader(results_file))
+                self.assertEqual(rows[0], ["Address", "Result"])
+                self.assertEqual(len(rows), 4)
+                self.assertEqual(
+                    json.loads(rows[1][1])["models"]["optimism"]["score"], 75
+                )
+
     def test_process_pending_requests_with_errors(self):
         success_response = MockPassportAnalysisResponse(
             address="0x0",
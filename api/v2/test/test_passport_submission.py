@@ -12,7 +12,7 @@ from web3 import Web3
 
 from account.models import Account, AccountAPIKey, Community, Nonce
 from ceramic_cache.models import CeramicCache
-from registry.models import Passport, Stamp
+from registry.models import Event, Passport, Score, Stamp, serialize_score
 from registry.tasks import score_passport
 from registry.utils import get_signing_message, verify_issuer
 from scorer_weighted.models import BinaryWeightedScorer, Scorer, WeightedScorer
@@ -607,6 +607,103 @@ class ValidatePassportTestCase(TransactionTestCase):
             stamp_google.provider, google_credential["credentialSubject"]["provider"]
         )
 
+    @patch("registry.atasks.validate_credential", side_effect=[[], []])
+    @patch(
+        "registry.atasks.aget_passport",
+        side_effect=[copy.deepcopy(mock_passport), copy.deepcopy(mock_passport)],
+    )
+    def test_resubmitting_unchanged_passport_skips_rescore(
+        self, aget_passport, validate_credential
+    ):
+        """Verify that the stored score is returned when neither stamps nor weights changed"""
+        responses = [
+            self.client.get(
+                f"{self.base_url}/{self.community.pk}/score/{self.account.address}",
+                HTTP_AUTHORIZATION=f"Token {self.secret}",
+            )
+            for _ in range(2)
+        ]
+
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(responses[1].status_code, 200)
+        self.assertEqual(responses[0].json(), responses[1].json())
+
+        # Credentials have only been validated for the 1st submission
+        self.assertEqual(validate_credential.call_count, 2)
+        self.assertEqual(
+            Event.objects.filter(action=Event.Action.SCORE_UPDATE).count(), 1
+        )
+        # The fingerprint is internal, it is not stored on the score
+        self.assertNotIn("passport_fingerprint", serialize_score(Score.objects.get()))
+
+    @patch("registry.atasks.validate_credential", side_effect=[[], [], [], []])
+    @patch(
+        "registry.atasks.aget_passport",
+        side_effect=[copy.deepcopy(mock_passport), copy.deepcopy(mock_passport_2)],
+    )
+    def test_resubmitting_changed_passport_rescores(
+        self, aget_passport, validate_credential
+    ):
+        """Verify that a changed stamp invalidates the stored score"""
+        for _ in range(2):
+            response = self.client.get(
+                f"{self.base_url}/{self.community.pk}/score/{self.account.address}",
+                HTTP_AUTHORIZATION=f"Token {self.secret}",
+            )
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(validate_credential.call_count, 4)
+        self.assertEqual(
+            Event.objects.filter(action=Event.Action.SCORE_UPDATE).count(), 2
+        )
+
+    @patch("registry.atasks.validate_credential", side_effect=[[], [], [], []])
+    @patch(
+        "registry.atasks.aget_passport",
+        side_effect=[copy.deepcopy(mock_passport), copy.deepcopy(mock_passport)],
+    )
+    def test_resubmitting_passport_rescores_when_weights_change(
+        self, aget_passport, validate_credential
+    ):
+        """Verify that updating the scorer weights invalidates the stored score"""
+        response = self.client.get(
+            f"{self.base_url}/{self.community.pk}/score/{self.account.address}",
+            HTTP_AUTHORIZATION=f"Token {self.secret}",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        scorer = self.community.get_scorer()
+        scorer.weights["Google"] = 10
+        scorer.save()
+
+        response = self.client.get(
+            f"{self.base_url}/{self.community.pk}/score/{self.account.address}",
+            HTTP_AUTHORIZATION=f"Token {self.secret}",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["stamps"]["Google"]["score"], "10.00000")
+        self.assertEqual(validate_credential.call_count, 4)
+
+    @patch("registry.atasks.validate_credential", side_effect=[[], [], [], []])
+    @patch(
+        "registry.atasks.aget_passport",
+        side_effect=[copy.deepcopy(mock_passport), copy.deepcopy(mock_passport)],
+    )
+    def test_resubmitting_passport_rescores_when_scored_elsewhere(
+        self, aget_passport, validate_credential
+    ):
+        """Verify that the fingerprint only matches the score it was computed for"""
+        for _ in range(2):
+            response = self.client.get(
+                f"{self.base_url}/{self.community.pk}/score/{self.account.address}",
+                HTTP_AUTHORIZATION=f"Token {self.secret}",
+            )
+            self.assertEqual(response.status_code, 200)
+            # Scored by another code path, which does not store a fingerprint
+            Score.objects.update(last_score_timestamp=datetime.now(timezone.utc))
+
+        self.assertEqual(validate_credential.call_count, 4)
+
     @patch("registry.atasks.validate_credential", side_effect=[[], [], [], []])
     @patch(
         "registry.atasks.get_utc_time",